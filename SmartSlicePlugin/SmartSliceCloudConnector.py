@@ -5,15 +5,15 @@ import uuid
 import json
 import time
 import tempfile
+import threading
 import datetime
+from collections import namedtuple
 from enum import Enum
 from pathlib import Path
 from urllib.parse import urlparse
 
-import pywim  # @UnresolvedImport
-
 from PyQt5.QtCore import pyqtSignal, pyqtProperty, pyqtSlot
-from PyQt5.QtCore import QTime, QUrl, QObject, QStandardPaths
+from PyQt5.QtCore import QTime, QTimer, QUrl, QObject, QStandardPaths
 from PyQt5.QtGui import QDesktopServices
 from PyQt5.QtQml import qmlRegisterSingletonType
 
@@ -30,8 +30,9 @@ from UM.Signal import Signal
 from .SmartSliceCloudStatus import SmartSliceCloudStatus
 from .SmartSliceCloudProxy import SmartSliceCloudProxy
 from .SmartSlicePropertyHandler import SmartSlicePropertyHandler
-from .SmartSliceJobHandler import SmartSliceJobHandler
-from .stage.ui.ResultTable import ResultTableData
+from .SmartSliceJobMetrics import JobMetrics, JobMetricsStore
+from .SmartSlicePerformanceReport import PerformanceReport, RollingProfiler
+from .stage.ui.ResultTable import ResultTableData, LazyAnalyses
 
 from .requirements_tool.SmartSliceRequirements import SmartSliceRequirements
 from .select_tool.SmartSliceSelectTool import SmartSliceSelectTool
@@ -39,6 +40,10 @@ from .select_tool.SmartSliceSelectTool import SmartSliceSelectTool
 from .utils import getPrintableNodes
 from .utils import getModifierMeshes
 from .utils import getNodeActiveExtruder
+from .utils import Tracing
+from .utils import SystemUtils
+
+pywim = SystemUtils.lazyImport("pywim")
 
 i18n_catalog = i18nCatalog("smartslice")
 
@@ -62,6 +67,9 @@ class SmartSliceCloudJob(Job):
 
         self.canceled = False
 
+        # Lifecycle timings, only collected for jobs which are run
+        self.metrics = None # JobMetrics
+
         self._job_status = None
         self._wait_time = 1.0
 
@@ -135,6 +143,12 @@ class SmartSliceCloudJob(Job):
         if len(mesh_nodes) != 1:
             Logger.log("d", "Found {} meshes!".format(["no", "too many"][len(mesh_nodes) > 1]))
             return None
+        if self.metrics:
+            mesh_data = mesh_nodes[0].getMeshData()
+            extruder = getNodeActiveExtruder(mesh_nodes[0])
+            self.metrics.triangles = mesh_data.getFaceCount() if mesh_data else 0
+            self.metrics.material = extruder.material.getName() if extruder else None
+
         for node in mod_mesh:
             Logger.log("d", "Adding modifier mesh {} to validation".format(node.getName()))
             mesh_nodes.append(node)
@@ -147,7 +161,7 @@ class SmartSliceCloudJob(Job):
 
         job.type = self.job_type
 
-        if not SmartSliceJobHandler.write3mf(filepath, mesh_nodes, job):
+        if not self.connector.smartSliceJobHandle.write3mf(filepath, mesh_nodes, job):
             raise SmartSliceCloudJob.JobException(
                 "The Smart Slice job cannot be submitted because\nthe 3MFWriter Plugin is disabled."
             )
@@ -164,7 +178,8 @@ class SmartSliceCloudJob(Job):
         threemf_fd.close()
 
         # Submit the 3MF data for a new task
-        job = self._client.submitSmartSliceJob(self, threemf_data)
+        with Tracing.span("job.submit", upload_bytes=len(threemf_data)):
+            job = self._client.submitSmartSliceJob(self, threemf_data)
         return job
 
     def run(self) -> None:
@@ -177,8 +192,13 @@ class SmartSliceCloudJob(Job):
 
         Job.yieldThread()  # Should allow the UI to update earlier
 
+        self.metrics = JobMetrics(self.job_type.name if self.job_type else None)
+
         try:
-            job = self.prepareJob()
+            prepare_start = time.perf_counter()
+            with Tracing.span("job.prepare", job_type=str(self.job_type)):
+                job = self.prepareJob()
+            self.metrics.prepare_time = time.perf_counter() - prepare_start
             Logger.log("i", "Smart Slice job prepared")
         except SmartSliceCloudJob.JobException as exc:
             Logger.log("w", "Smart Slice job cannot be prepared: {}".format(exc.problem))
@@ -186,7 +206,8 @@ class SmartSliceCloudJob(Job):
             self.setError(exc)
             return
 
-        task = self.processCloudJob(job)
+        with Tracing.span("job.process", job_type=str(self.job_type)):
+            task = self.processCloudJob(job)
 
         try:
             os.remove(job)
@@ -194,7 +215,15 @@ class SmartSliceCloudJob(Job):
             Logger.log("w", "Unable to remove temporary 3MF {}".format(job))
 
         if task and task.result:
+            # The API client has already decoded the analyses, so nothing is saved on decoding here. The
+            # wrapper is shared by the results table and the workspace writer, which encodes each analysis once.
             self._result = task.result
+            self._result.analyses = LazyAnalyses(self._result.analyses)
+            self.metrics.result_analyses = len(self._result.analyses)
+
+        if self.canceled:
+            self.metrics.status = "canceled"
+        self.connector.job_metrics.append(self.metrics)
 
 class SmartSliceCloudVerificationJob(SmartSliceCloudJob):
 
@@ -212,24 +241,182 @@ class SmartSliceCloudOptimizeJob(SmartSliceCloudJob):
         self.job_type = pywim.smartslice.job.JobType.optimization
 
 
+class JobProgressChannel(QObject):
+    """
+    Carries the status and progress of the running job from the job status tracker, which
+    runs in the job thread, to the proxy. Updates are coalesced to at most updates_per_second
+    and applied on the Qt thread, where properties which did not change are not set.
+    """
+
+    # Weight of the latest remaining time reported by the API in the smoothed estimate
+    REMAINING_TIME_SMOOTHING = 0.3
+
+    _updatePosted = pyqtSignal()
+
+    def __init__(self, connector, updates_per_second: float = 2.):
+        super().__init__()
+
+        self.connector = connector
+
+        self._lock = threading.Lock()
+        self._pending = None    # (JobInfo.Status, progress, remaining time, SmartSliceCloudStatus)
+        self._posted = False
+        self._remaining = None  # (smoothed remaining time, time of the estimate)
+        self._last_applied = 0.
+        self._interval = 0.
+
+        self.setUpdatesPerSecond(updates_per_second)
+
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._apply)
+
+        # The channel lives on the Qt thread, so the signal is queued when posted from the job thread
+        self._updatePosted.connect(self._onUpdatePosted)
+
+    def setUpdatesPerSecond(self, updates_per_second: float):
+        self._interval = 1. / updates_per_second if updates_per_second > 0 else 0.
+
+    def reset(self):
+        """
+        Drops any update which has not been applied yet, and the remaining time estimate
+        """
+        with self._lock:
+            self._pending = None
+            self._posted = False
+            self._remaining = None
+
+    def cancel(self):
+        """
+        Drops the pending update when the job is cancelled, before the status is changed
+        """
+        self._timer.stop()
+        self.reset()
+
+    def post(self, api_status, progress, remaining, busy_status: SmartSliceCloudStatus):
+        with self._lock:
+            self._pending = (api_status, progress, self._smoothRemaining(remaining), busy_status)
+            if self._posted:
+                return
+            self._posted = True
+
+        self._updatePosted.emit()
+
+    def _smoothRemaining(self, remaining):
+        if remaining is None:
+            return None
+
+        now = time.perf_counter()
+        if self._remaining is None:
+            estimate = float(remaining)
+        else:
+            # What the last estimate predicts for now, blended with the new value
+            previous, estimated_at = self._remaining
+            predicted = max(previous - (now - estimated_at), 0.)
+            estimate = self.REMAINING_TIME_SMOOTHING * remaining + (1. - self.REMAINING_TIME_SMOOTHING) * predicted
+
+        self._remaining = (estimate, now)
+        return estimate
+
+    def _onUpdatePosted(self):
+        with self._lock:
+            pending = self._pending
+
+        if pending is None or self._timer.isActive():
+            return
+
+        # Status changes are shown right away, progress waits for the end of the interval
+        wait = self._last_applied + self._interval - time.perf_counter()
+        if wait > 0 and not self._changesStatus(pending):
+            self._timer.start(int(wait * 1000))
+        else:
+            self._apply()
+
+    def _changesStatus(self, pending) -> bool:
+        api_status, progress, remaining, busy_status = pending
+        status = self.connector.status
+
+        if api_status == pywim.http.thor.JobInfo.Status.queued:
+            return status is not SmartSliceCloudStatus.Queued
+        if api_status == pywim.http.thor.JobInfo.Status.running:
+            return status not in (SmartSliceCloudStatus.BusyOptimizing, SmartSliceCloudStatus.BusyValidating)
+        return False
+
+    def _apply(self):
+        with self._lock:
+            pending = self._pending
+            self._pending = None
+            self._posted = False
+
+        if pending is None:
+            return
+
+        # The job thread may still post an update while the job is being cancelled
+        job = self.connector.cloudJob
+        if job is None or job.canceled:
+            return
+
+        self._last_applied = time.perf_counter()
+
+        api_status, progress, remaining, busy_status = pending
+        connector = self.connector
+        proxy = connector._proxy
+
+        connector.api_connection.clearErrorMessage()
+        proxy.jobProgress = progress
+
+        if self._changesStatus(pending):
+            if api_status == pywim.http.thor.JobInfo.Status.queued:
+                connector.status = SmartSliceCloudStatus.Queued
+            else:
+                connector.status = busy_status
+
+        if api_status == pywim.http.thor.JobInfo.Status.running and connector.status is SmartSliceCloudStatus.BusyOptimizing and remaining is not None:
+            slice_status = "Optimizing...&nbsp;&nbsp;&nbsp;&nbsp;(<i>Remaining Time: {}</i>)".format(Duration(int(round(remaining))).getDisplayString())
+            if proxy.sliceStatus != slice_status:
+                proxy.sliceStatus = slice_status
+
+
 class JobStatusTracker:
-    def __init__(self, connector, status) -> None:
+    def __init__(self, connector, status, metrics: JobMetrics = None) -> None:
         self._previous_status = status
         self.connector = connector
+        self.metrics = metrics
 
-    def __call__(self, job: pywim.http.thor.JobInfo) -> bool:
+        self.connector.progress_channel.reset()
+
+        # The API job status we last saw, and when we first saw it
+        self._api_status = None
+        self._api_status_start = None
+
+    def _trackApiStatus(self, status):
+        if status == self._api_status:
+            return
+
+        now = time.perf_counter()
+        if self._api_status is not None:
+            Tracing.record("api.status.{}".format(self._api_status.name), now - self._api_status_start)
+
+        self._api_status = status
+        self._api_status_start = now
+
+    def finish(self, status):
+        """
+        Called with the final status of the job, closes the time spent in the last status
+        """
+        self._trackApiStatus(status)
+        self.connector.progress_channel.reset()
+        if self.metrics:
+            self.metrics.finish(status.name if status else None)
+
+    def __call__(self, job: 'pywim.http.thor.JobInfo') -> bool:
         Logger.log("d", "Current job status: {}".format(job.status))
-        self.connector.api_connection.clearErrorMessage()
-        self.connector._proxy.jobProgress = job.progress
-        if job.status == pywim.http.thor.JobInfo.Status.queued and self.connector.status is not SmartSliceCloudStatus.Queued:
-            self.connector.status = SmartSliceCloudStatus.Queued
-            self.connector.updateSliceWidget()
-        elif job.status == pywim.http.thor.JobInfo.Status.running and self.connector.status not in (SmartSliceCloudStatus.BusyOptimizing, SmartSliceCloudStatus.BusyValidating):
-            self.connector.status = self._previous_status
-            self.connector.updateSliceWidget()
-
-        if job.status == pywim.http.thor.JobInfo.Status.running and self.connector.status is SmartSliceCloudStatus.BusyOptimizing:
-            self.connector._proxy.sliceStatus = "Optimizing...&nbsp;&nbsp;&nbsp;&nbsp;(<i>Remaining Time: {}</i>)".format(Duration(job.runtime_remaining).getDisplayString())
+        self._trackApiStatus(job.status)
+        if self.metrics:
+            self.metrics.trackStatus(job.status.name)
+
+        # The proxy is updated on the Qt thread
+        self.connector.progress_channel.post(job.status, job.progress, job.runtime_remaining, self._previous_status)
 
         return self.connector.cloudJob.canceled if self.connector.cloudJob else True
 
@@ -324,6 +511,7 @@ class SmartSliceAPIClient(QObject):
 
         Logger.log("d", "SmartSlice HTTP Client: {}".format(self._client.address))
 
+    @Tracing.traced("api.connectionCheck")
     def _connectionCheck(self):
         try:
             self._client.info()
@@ -344,17 +532,21 @@ class SmartSliceAPIClient(QObject):
         if api_code is not None:
             return api_code, None
 
-        while api_code is None and timeout_counter < self._number_of_timeouts:
-            try:
-                api_code, api_result = endpoint()
-            except Exception as error:
-                # If this error occurs, there was a connection issue
-                Logger.log("e", "An error has occured with an API call: {}".format(error))
-                timeout_counter += 1
-                time.sleep(self._timeout_sleep)
+        with Tracing.span("api.call") as span:
+            while api_code is None and timeout_counter < self._number_of_timeouts:
+                try:
+                    api_code, api_result = endpoint()
+                except Exception as error:
+                    # If this error occurs, there was a connection issue
+                    Logger.log("e", "An error has occured with an API call: {}".format(error))
+                    timeout_counter += 1
+                    time.sleep(self._timeout_sleep)
 
-            if timeout_counter == self._number_of_timeouts:
-                return failure_code, None
+                if timeout_counter == self._number_of_timeouts:
+                    span.set(retries=timeout_counter, status=str(failure_code))
+                    return failure_code, None
+
+            span.set(retries=timeout_counter, status=api_code)
 
         self.clearErrorMessage()
 
@@ -466,12 +658,18 @@ class SmartSliceAPIClient(QObject):
     # If the user is correctly logged in, and has a valid token, we can use the 3mf data from
     #    the plugin to submit a job to the API, and the results will be handled when they are returned.
     def submitSmartSliceJob(self, cloud_job, threemf_data):
-        thor_status_code, task = self.executeApiCall(
-            lambda: self._client.new_smartslice_job(threemf_data),
-            self.ConnectionErrorCodes.genericInternetConnectionError
-        )
+        upload_start = time.perf_counter()
+        with Tracing.span("api.upload", upload_bytes=len(threemf_data)):
+            thor_status_code, task = self.executeApiCall(
+                lambda: self._client.new_smartslice_job(threemf_data),
+                self.ConnectionErrorCodes.genericInternetConnectionError
+            )
+
+        if cloud_job.metrics:
+            cloud_job.metrics.upload_time = time.perf_counter() - upload_start
+            cloud_job.metrics.upload_bytes = len(threemf_data)
 
-        job_status_tracker = JobStatusTracker(self.connector, self.connector.status)
+        job_status_tracker = JobStatusTracker(self.connector, self.connector.status, cloud_job.metrics)
 
         Logger.log("d", "API Status after posting: {}".format(thor_status_code))
 
@@ -484,31 +682,35 @@ class SmartSliceAPIClient(QObject):
 
         # While the task status is not finished/failed/crashed/aborted continue to
         # wait on the status using the API.
-        thor_status_code = None
-        while thor_status_code != self.ConnectionErrorCodes.genericInternetConnectionError and not cloud_job.canceled and task.status not in (
-            pywim.http.thor.JobInfo.Status.failed,
-            pywim.http.thor.JobInfo.Status.crashed,
-            pywim.http.thor.JobInfo.Status.aborted,
-            pywim.http.thor.JobInfo.Status.finished
-        ):
+        with Tracing.span("api.wait") as wait_span:
+            thor_status_code = None
+            while thor_status_code != self.ConnectionErrorCodes.genericInternetConnectionError and not cloud_job.canceled and task.status not in (
+                pywim.http.thor.JobInfo.Status.failed,
+                pywim.http.thor.JobInfo.Status.crashed,
+                pywim.http.thor.JobInfo.Status.aborted,
+                pywim.http.thor.JobInfo.Status.finished
+            ):
+
+                self.job_status = task.status
+                cloud_job.api_job_id = task.id
 
-            self.job_status = task.status
-            cloud_job.api_job_id = task.id
-
-            thor_status_code, task = self.executeApiCall(
-                lambda: self._client.smartslice_job_wait(task.id, callback=job_status_tracker),
-                self.ConnectionErrorCodes.genericInternetConnectionError
-            )
-
-            if thor_status_code == 200:
                 thor_status_code, task = self.executeApiCall(
                     lambda: self._client.smartslice_job_wait(task.id, callback=job_status_tracker),
                     self.ConnectionErrorCodes.genericInternetConnectionError
                 )
 
-            if thor_status_code not in (200, None):
-                self._handleThorErrors(thor_status_code, task)
-                self.connector.cancelCurrentJob()
+                if thor_status_code == 200:
+                    thor_status_code, task = self.executeApiCall(
+                        lambda: self._client.smartslice_job_wait(task.id, callback=job_status_tracker),
+                        self.ConnectionErrorCodes.genericInternetConnectionError
+                    )
+
+                if thor_status_code not in (200, None):
+                    self._handleThorErrors(thor_status_code, task)
+                    self.connector.cancelCurrentJob()
+
+            job_status_tracker.finish(getattr(task, 'status', None))
+            wait_span.set(status=str(getattr(task, 'status', None)), canceled=cloud_job.canceled)
 
         if not cloud_job.canceled:
             self.connector.propertyHandler._cancelChanges = False
@@ -634,9 +836,135 @@ class SmartSliceAPIClient(QObject):
         self.badCredentialsChanged.emit()
 
 
+"""
+  SliceWidgetState
+    The values of the slice widget properties of the proxy for one cloud status.
+      Properties which are None are left as they are.
+"""
+SliceWidgetState = namedtuple('SliceWidgetState', [
+    'sliceStatus',
+    'sliceHint',
+    'sliceButtonText',
+    'secondaryButtonText',
+    'sliceButtonEnabled',
+    'sliceButtonVisible',
+    'sliceButtonFillWidth',
+    'secondaryButtonVisible',
+    'secondaryButtonFillWidth',
+    'sliceInfoOpen',
+    'progressBarVisible',
+    'jobProgress',
+    'sliceIconImage',
+    'sliceIconVisible'
+])
+
+_IDLE_SLICE_WIDGET_STATE = SliceWidgetState(
+    sliceStatus="",
+    sliceHint="",
+    sliceButtonText=None,
+    secondaryButtonText=None,
+    sliceButtonEnabled=None,
+    sliceButtonVisible=None,
+    sliceButtonFillWidth=None,
+    secondaryButtonVisible=None,
+    secondaryButtonFillWidth=None,
+    sliceInfoOpen=False,
+    progressBarVisible=False,
+    jobProgress=0,
+    sliceIconImage="done_green",
+    sliceIconVisible=False
+)
+
+_BUSY_SLICE_WIDGET_STATE = _IDLE_SLICE_WIDGET_STATE._replace(
+    secondaryButtonText="Cancel",
+    sliceButtonVisible=False,
+    secondaryButtonVisible=True,
+    secondaryButtonFillWidth=True
+)
+
+_RESULT_SLICE_WIDGET_STATE = _IDLE_SLICE_WIDGET_STATE._replace(
+    sliceButtonText="Optimize",
+    secondaryButtonText="Preview",
+    sliceButtonEnabled=True,
+    sliceButtonVisible=True,
+    sliceButtonFillWidth=False,
+    secondaryButtonVisible=True,
+    secondaryButtonFillWidth=False,
+    sliceInfoOpen=True,
+    sliceIconVisible=True
+)
+
+SLICE_WIDGET_STATES = {
+    SmartSliceCloudStatus.Errors: _IDLE_SLICE_WIDGET_STATE._replace(
+        sliceButtonText="Validate",
+        sliceButtonEnabled=False,
+        sliceButtonVisible=True,
+        sliceButtonFillWidth=True,
+        secondaryButtonVisible=False
+    ),
+    SmartSliceCloudStatus.Cancelling: _IDLE_SLICE_WIDGET_STATE._replace(
+        sliceButtonText="Cancelling",
+        sliceButtonEnabled=False,
+        sliceButtonVisible=True,
+        sliceButtonFillWidth=True,
+        secondaryButtonVisible=False
+    ),
+    SmartSliceCloudStatus.ReadyToVerify: _IDLE_SLICE_WIDGET_STATE._replace(
+        sliceButtonText="Validate",
+        sliceButtonEnabled=True,
+        sliceButtonVisible=True,
+        sliceButtonFillWidth=True,
+        secondaryButtonVisible=False
+    ),
+    SmartSliceCloudStatus.BusyValidating: _BUSY_SLICE_WIDGET_STATE._replace(
+        sliceStatus="Validating..."
+    ),
+    SmartSliceCloudStatus.Underdimensioned: _RESULT_SLICE_WIDGET_STATE._replace(
+        sliceStatus="Requirements not met!",
+        sliceHint="Optimize to meet requirements?",
+        sliceIconImage="error_red"
+    ),
+    SmartSliceCloudStatus.Overdimensioned: _RESULT_SLICE_WIDGET_STATE._replace(
+        sliceStatus="Part appears overdesigned",
+        sliceHint="Optimize to reduce print time and material?",
+        sliceIconImage="warning_yellow"
+    ),
+    # The progress is left to the job status tracker
+    SmartSliceCloudStatus.BusyOptimizing: _BUSY_SLICE_WIDGET_STATE._replace(
+        sliceStatus="Optimizing...&nbsp;&nbsp;&nbsp;&nbsp;(<i>Remaining Time: calculating</i>)",
+        progressBarVisible=True,
+        jobProgress=None
+    ),
+    SmartSliceCloudStatus.Optimized: _BUSY_SLICE_WIDGET_STATE._replace(
+        secondaryButtonText="Preview",
+        sliceInfoOpen=True,
+        sliceIconVisible=True
+    ),
+    SmartSliceCloudStatus.Queued: _BUSY_SLICE_WIDGET_STATE._replace(
+        sliceStatus="Queued..."
+    ),
+    SmartSliceCloudStatus.RemoveModMesh: _BUSY_SLICE_WIDGET_STATE._replace(
+        sliceIconVisible=True
+    )
+}
+
+UNKNOWN_SLICE_WIDGET_STATE = _IDLE_SLICE_WIDGET_STATE._replace(
+    sliceStatus="Unknown status",
+    sliceHint="Sorry, something went wrong!",
+    sliceButtonText="...",
+    sliceButtonEnabled=False,
+    sliceButtonVisible=True,
+    secondaryButtonVisible=False,
+    secondaryButtonFillWidth=False
+)
+
+
 class SmartSliceCloudConnector(QObject):
     debug_save_smartslice_package_preference = "smartslice/debug_save_smartslice_package"
     debug_save_smartslice_package_location = "smartslice/debug_save_smartslice_package_location"
+    debug_tracing_preference = "smartslice/debug_tracing"
+    debug_profile_seconds_preference = "smartslice/debug_profile_seconds"
+    progress_updates_preference = "smartslice/progress_updates_per_second"
 
     class SubscriptionTypes(Enum):
         subscriptionExpired = 0
@@ -666,13 +994,29 @@ class SmartSliceCloudConnector(QObject):
         self.app_preferences.addPreference(self.debug_save_smartslice_package_location, default_save_smartslice_package_location)
         self.debug_save_smartslice_package_message = None
 
+        # Timing spans of the hot paths, off unless debugging
+        self.app_preferences.addPreference(self.debug_tracing_preference, False)
+        Tracing.tracer.enabled = bool(self.app_preferences.getValue(self.debug_tracing_preference))
+        self.app_preferences.preferenceChanged.connect(self._onPreferenceChanged)
+
+        # Optional profile of the last seconds of activity for the debug package, 0 turns it off
+        self.app_preferences.addPreference(self.debug_profile_seconds_preference, 0)
+        self._profiler = None
+        self._profiler_timer = QTimer()
+        self._profiler_timer.timeout.connect(self._rotateProfiler)
+        self._updateProfiler()
+
+        # Progress of the running job, shown at most this many times per second
+        self.app_preferences.addPreference(self.progress_updates_preference, 2)
+        self.progress_channel = JobProgressChannel(self, float(self.app_preferences.getValue(self.progress_updates_preference)))
+
         # Executing a set of function when some activitiy has changed
         Application.getInstance().activityChanged.connect(self._onApplicationActivityChanged)
 
         #  Machines / Extruders
         self.activeMachine = None
         self.propertyHandler = None # SmartSlicePropertyHandler
-        self.smartSliceJobHandle = None
+        self.smartSliceJobHandle = None # SmartSliceJobHandler, created by prepareSmartSlice
 
         Application.getInstance().engineCreatedSignal.connect(self._onEngineCreated)
 
@@ -683,6 +1027,15 @@ class SmartSliceCloudConnector(QObject):
 
         self.api_connection = SmartSliceAPIClient(self)
 
+        # Icons of the slice widget, and the status it was last updated for
+        self._slice_icons = None # Dict[str, QUrl]
+        self._slice_widget_status = None
+
+        # Lifecycle timings of the jobs, for finding out where the wall-clock time goes
+        self.job_metrics = JobMetricsStore(os.path.join(
+            QStandardPaths.writableLocation(QStandardPaths.GenericConfigLocation), "smartslice", "job_metrics.jsonl"
+        ))
+
     onSmartSlicePrepared = pyqtSignal()
 
     @property
@@ -692,7 +1045,7 @@ class SmartSliceCloudConnector(QObject):
 
         return None
 
-    def addJob(self, job_type: pywim.smartslice.job.JobType):
+    def addJob(self, job_type: 'pywim.smartslice.job.JobType'):
 
         self.propertyHandler._cancelChanges = False
         self._current_job += 1
@@ -712,6 +1065,9 @@ class SmartSliceCloudConnector(QObject):
             if self._jobs[self._current_job].api_job_id:
                 self.api_connection.cancelJob(self._jobs[self._current_job].api_job_id)
 
+            # A throttled progress update must not set the busy status again
+            self.progress_channel.cancel()
+
             if not self._jobs[self._current_job].canceled:
                 self.status = SmartSliceCloudStatus.Cancelling
                 self.updateStatus()
@@ -732,7 +1088,52 @@ class SmartSliceCloudConnector(QObject):
         self._current_job = 0
         self._jobs[self._current_job] = None
 
+    def _onPreferenceChanged(self, preference: str):
+        if preference == self.debug_tracing_preference:
+            Tracing.tracer.enabled = bool(self.app_preferences.getValue(self.debug_tracing_preference))
+        elif preference == self.debug_profile_seconds_preference:
+            self._updateProfiler()
+        elif preference == self.progress_updates_preference:
+            self.progress_channel.setUpdatesPerSecond(float(self.app_preferences.getValue(self.progress_updates_preference)))
+
+    def _updateProfiler(self):
+        seconds = float(self.app_preferences.getValue(self.debug_profile_seconds_preference) or 0)
+
+        if self._profiler:
+            self._profiler_timer.stop()
+            self._profiler.stop()
+            self._profiler = None
+
+        if seconds > 0:
+            self._profiler = RollingProfiler(seconds)
+            self._profiler.start()
+            self._profiler_timer.start(int(seconds * 1000))
+
+    def _rotateProfiler(self):
+        if self._profiler:
+            self._profiler.rotate()
+
+    def dumpTimings(self):
+        """
+        Writes the span timings collected so far to the log and next to the debug packages
+        """
+        Tracing.tracer.dumpToLog()
+
+        jobname = Application.getInstance().getPrintInformation().jobName
+        filedir = self.app_preferences.getValue(self.debug_save_smartslice_package_location)
+        filepath = os.path.join(filedir, "{}_smartslice_timings.json".format(jobname))
+
+        try:
+            Tracing.tracer.dumpToFile(filepath)
+            Logger.log("i", "Smart Slice timings written to {}".format(filepath))
+        except OSError as exc:
+            Logger.log("w", "Unable to write the Smart Slice timings: {}".format(exc))
+
     def _onSaveDebugPackage(self, messageId: str, actionId: str) -> None:
+        if actionId == "dump_timings":
+            self.dumpTimings()
+            return
+
         dummy_job = SmartSliceCloudVerificationJob(self)
         if self.status == SmartSliceCloudStatus.ReadyToVerify:
             dummy_job.job_type = pywim.smartslice.job.JobType.validation
@@ -745,7 +1146,12 @@ class SmartSliceCloudConnector(QObject):
         jobname = Application.getInstance().getPrintInformation().jobName
         debug_filename = "{}_smartslice.3mf".format(jobname)
         debug_filedir = self.app_preferences.getValue(self.debug_save_smartslice_package_location)
-        dummy_job = dummy_job.prepareJob(filename=debug_filename, filedir=debug_filedir)
+        debug_package = dummy_job.prepareJob(filename=debug_filename, filedir=debug_filedir)
+
+        # Add how the session performed, so slow setups can be looked into
+        if debug_package:
+            report = PerformanceReport(self.extension.metadata.version, self.job_metrics)
+            report.writeToPackage(debug_package, self._profiler)
 
     def getProxy(self, engine=None, script_engine=None):
         return self._proxy
@@ -755,11 +1161,6 @@ class SmartSliceCloudConnector(QObject):
 
     def _onEngineCreated(self):
         self.activeMachine = Application.getInstance().getMachineManager().activeMachine
-        self.propertyHandler = SmartSlicePropertyHandler(self)
-        self.smartSliceJobHandle = SmartSliceJobHandler(self.propertyHandler)
-
-        self.onSmartSlicePrepared.emit()
-        self.propertyHandler.cacheChanges() # Setup Cache
 
         Application.getInstance().getMachineManager().printerConnectedStatusChanged.connect(self._refreshMachine)
 
@@ -770,154 +1171,62 @@ class SmartSliceCloudConnector(QObject):
                 lifetime= 0,
             )
             self.debug_save_smartslice_package_message.addAction("", i18n_catalog.i18nc("@action", "Save package"), "", "")
+            if Tracing.tracer.enabled:
+                self.debug_save_smartslice_package_message.addAction("dump_timings", i18n_catalog.i18nc("@action", "Save timings"), "", "")
             self.debug_save_smartslice_package_message.actionTriggered.connect(self._onSaveDebugPackage)
             self.debug_save_smartslice_package_message.show()
 
+    def prepareSmartSlice(self):
+        """
+        Loads pywim and threemf and creates the property and job handlers. This is left until
+        Smart Slice is first used, the stage is selected or a project with a job is loaded, so
+        the plugin does not slow down the Cura startup for everyone.
+        """
+        if self.smartSliceJobHandle:
+            return
+
+        start = time.perf_counter()
+
+        from .SmartSliceJobHandler import SmartSliceJobHandler
+
+        self.propertyHandler = SmartSlicePropertyHandler(self)
+        self.smartSliceJobHandle = SmartSliceJobHandler(self.propertyHandler)
+
+        self.onSmartSlicePrepared.emit()
+        self.propertyHandler.cacheChanges() # Setup Cache
+
+        SystemUtils.recordLoadTime("prepare", time.perf_counter() - start)
+
     def _refreshMachine(self):
         self.activeMachine = Application.getInstance().getMachineManager().activeMachine
 
-    def updateSliceWidget(self):
-        if self.status is SmartSliceCloudStatus.Errors:
-            self._proxy.sliceStatus = ""
-            self._proxy.sliceHint = ""
-            self._proxy.sliceButtonText = "Validate"
-            self._proxy.sliceButtonEnabled = False
-            self._proxy.sliceButtonVisible = True
-            self._proxy.sliceButtonFillWidth = True
-            self._proxy.secondaryButtonVisible = False
-            self._proxy.sliceInfoOpen = False
-            self._proxy.progressBarVisible = False
-            self._proxy.jobProgress = 0
-        elif self.status is SmartSliceCloudStatus.Cancelling:
-            self._proxy.sliceStatus = ""
-            self._proxy.sliceHint = ""
-            self._proxy.sliceButtonText = "Cancelling"
-            self._proxy.sliceButtonEnabled = False
-            self._proxy.sliceButtonVisible = True
-            self._proxy.sliceButtonFillWidth = True
-            self._proxy.secondaryButtonVisible = False
-            self._proxy.sliceInfoOpen = False
-            self._proxy.progressBarVisible = False
-            self._proxy.jobProgress = 0
-        elif self.status is SmartSliceCloudStatus.ReadyToVerify:
-            self._proxy.sliceStatus = ""
-            self._proxy.sliceHint = ""
-            self._proxy.sliceButtonText = "Validate"
-            self._proxy.sliceButtonEnabled = True
-            self._proxy.sliceButtonVisible = True
-            self._proxy.sliceButtonFillWidth = True
-            self._proxy.secondaryButtonVisible = False
-            self._proxy.sliceInfoOpen = False
-            self._proxy.progressBarVisible = False
-            self._proxy.jobProgress = 0
-        elif self.status is SmartSliceCloudStatus.BusyValidating:
-            self._proxy.sliceStatus = "Validating..."
-            self._proxy.sliceHint = ""
-            self._proxy.secondaryButtonText = "Cancel"
-            self._proxy.sliceButtonVisible = False
-            self._proxy.secondaryButtonVisible = True
-            self._proxy.secondaryButtonFillWidth = True
-            self._proxy.sliceInfoOpen = False
-            self._proxy.progressBarVisible = False
-            self._proxy.jobProgress = 0
-        elif self.status is SmartSliceCloudStatus.Underdimensioned:
-            self._proxy.sliceStatus = "Requirements not met!"
-            self._proxy.sliceHint = "Optimize to meet requirements?"
-            self._proxy.sliceButtonText = "Optimize"
-            self._proxy.secondaryButtonText = "Preview"
-            self._proxy.sliceButtonEnabled = True
-            self._proxy.sliceButtonVisible = True
-            self._proxy.sliceButtonFillWidth = False
-            self._proxy.secondaryButtonVisible = True
-            self._proxy.secondaryButtonFillWidth = False
-            self._proxy.sliceInfoOpen = True
-            self._proxy.progressBarVisible = False
-            self._proxy.jobProgress = 0
-        elif self.status is SmartSliceCloudStatus.Overdimensioned:
-            self._proxy.sliceStatus = "Part appears overdesigned"
-            self._proxy.sliceHint = "Optimize to reduce print time and material?"
-            self._proxy.sliceButtonText = "Optimize"
-            self._proxy.secondaryButtonText = "Preview"
-            self._proxy.sliceButtonEnabled = True
-            self._proxy.sliceButtonVisible = True
-            self._proxy.sliceButtonFillWidth = False
-            self._proxy.secondaryButtonVisible = True
-            self._proxy.secondaryButtonFillWidth = False
-            self._proxy.sliceInfoOpen = True
-            self._proxy.progressBarVisible = False
-            self._proxy.jobProgress = 0
-        elif self.status is SmartSliceCloudStatus.BusyOptimizing:
-            self._proxy.sliceStatus = "Optimizing...&nbsp;&nbsp;&nbsp;&nbsp;(<i>Remaining Time: calculating</i>)"
-            self._proxy.sliceHint = ""
-            self._proxy.secondaryButtonText = "Cancel"
-            self._proxy.sliceButtonVisible = False
-            self._proxy.secondaryButtonVisible = True
-            self._proxy.secondaryButtonFillWidth = True
-            self._proxy.sliceInfoOpen = False
-            self._proxy.progressBarVisible = True
-        elif self.status is SmartSliceCloudStatus.Optimized:
-            self._proxy.sliceStatus = ""
-            self._proxy.sliceHint = ""
-            self._proxy.secondaryButtonText = "Preview"
-            self._proxy.sliceButtonVisible = False
-            self._proxy.secondaryButtonVisible = True
-            self._proxy.secondaryButtonFillWidth = True
-            self._proxy.sliceInfoOpen = True
-            self._proxy.progressBarVisible = False
-            self._proxy.jobProgress = 0
-        elif self.status is SmartSliceCloudStatus.Queued:
-            self._proxy.sliceStatus = "Queued..."
-            self._proxy.sliceHint = ""
-            self._proxy.secondaryButtonText = "Cancel"
-            self._proxy.sliceButtonVisible = False
-            self._proxy.secondaryButtonVisible = True
-            self._proxy.secondaryButtonFillWidth = True
-            self._proxy.sliceInfoOpen = False
-            self._proxy.progressBarVisible = False
-            self._proxy.jobProgress = 0
-        elif self.status is SmartSliceCloudStatus.RemoveModMesh:
-            self._proxy.sliceStatus = ""
-            self._proxy.sliceHint = ""
-            self._proxy.secondaryButtonText = "Cancel"
-            self._proxy.sliceButtonVisible = False
-            self._proxy.secondaryButtonVisible = True
-            self._proxy.secondaryButtonFillWidth = True
-            self._proxy.sliceInfoOpen = False
-            self._proxy.progressBarVisible = False
-            self._proxy.jobProgress = 0
-        else:
-            self._proxy.sliceStatus = "Unknown status"
-            self._proxy.sliceHint = "Sorry, something went wrong!"
-            self._proxy.sliceButtonText = "..."
-            self._proxy.sliceButtonEnabled = False
-            self._proxy.sliceButtonVisible = True
-            self._proxy.secondaryButtonVisible = False
-            self._proxy.secondaryButtonFillWidth = False
-            self._proxy.sliceInfoOpen = False
-            self._proxy.progressBarVisible = False
-            self._proxy.jobProgress = 0
-
-        # Setting icon path
-        stage_path = PluginRegistry.getInstance().getPluginPath("SmartSlicePlugin")
-        stage_images_path = os.path.join(stage_path, "stage", "images")
-        icon_done_green = os.path.join(stage_images_path, "done_green.png")
-        icon_error_red = os.path.join(stage_images_path, "error_red.png")
-        icon_warning_yellow = os.path.join(stage_images_path, "warning_yellow.png")
-        current_icon = icon_done_green
-        if self.status is SmartSliceCloudStatus.Overdimensioned:
-            current_icon = icon_warning_yellow
-        elif self.status is SmartSliceCloudStatus.Underdimensioned:
-            current_icon = icon_error_red
-        current_icon = QUrl.fromLocalFile(current_icon)
-        self._proxy.sliceIconImage = current_icon
-
-        # Setting icon visibiltiy
-        if self.status in (SmartSliceCloudStatus.Optimized,) + SmartSliceCloudStatus.optimizable():
-            self._proxy.sliceIconVisible = True
-        else:
-            self._proxy.sliceIconVisible = False
+    def _sliceIcons(self) -> Dict[str, QUrl]:
+        if self._slice_icons is None:
+            stage_path = PluginRegistry.getInstance().getPluginPath("SmartSlicePlugin")
+            stage_images_path = os.path.join(stage_path, "stage", "images")
+            self._slice_icons = {
+                name: QUrl.fromLocalFile(os.path.join(stage_images_path, "{}.png".format(name)))
+                for name in ("done_green", "error_red", "warning_yellow")
+            }
+        return self._slice_icons
 
-        self._proxy.updateColorUI()
+    def updateSliceWidget(self):
+        state = SLICE_WIDGET_STATES.get(self.status, UNKNOWN_SLICE_WIDGET_STATE)
+
+        # Only the proxy properties which change are set, every set property makes QML re-evaluate its bindings
+        for name, value in zip(state._fields, state):
+            if value is None:
+                continue
+            if name == "sliceIconImage":
+                value = self._sliceIcons()[value]
+            if getattr(self._proxy, name) != value:
+                setattr(self._proxy, name, value)
+
+        # The colors depend on the status, the requirements and the results. The places which
+        # change the requirements or results update them, here only a status change does.
+        if self.status is not self._slice_widget_status:
+            self._slice_widget_status = self.status
+            self._proxy.updateColorUI()
 
     @property
     def status(self):
@@ -988,6 +1297,7 @@ class SmartSliceCloudConnector(QObject):
                         dismissable=True
                     ).show()
 
+    @Tracing.traced("results.process")
     def processAnalysisResult(self, selectedRow=0):
         job = self._jobs[self._current_job]
         active_extruder = getNodeActiveExtruder(getPrintableNodes()[0])
@@ -1024,6 +1334,7 @@ class SmartSliceCloudConnector(QObject):
 
     def prepareOptimization(self):
         self._proxy.optimizationStatus()
+        self._proxy.updateColorUI()
         self.updateSliceWidget()
 
     def doOptimization(self):
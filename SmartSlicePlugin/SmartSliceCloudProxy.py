@@ -1,12 +1,13 @@
 import copy
 import json
 import math
+import itertools
 import numpy
 
 from typing import Dict, List
 
 from PyQt5.QtCore import pyqtSignal, pyqtProperty, pyqtSlot
-from PyQt5.QtCore import QObject, QUrl, QAbstractListModel
+from PyQt5.QtCore import QObject, QUrl, QAbstractListModel, QTimer
 
 from cura.Scene.CuraSceneNode import CuraSceneNode
 from cura.Scene.BuildPlateDecorator import BuildPlateDecorator
@@ -20,6 +21,7 @@ from UM.Logger import Logger
 from UM.Operations.RemoveSceneNodeOperation import RemoveSceneNodeOperation
 from UM.Operations.GroupedOperation import GroupedOperation
 from UM.Mesh.MeshBuilder import MeshBuilder
+from UM.Mesh.MeshData import MeshData
 from UM.Settings.SettingInstance import SettingInstance
 from UM.Scene.SceneNode import SceneNode
 from UM.Scene.GroupDecorator import GroupDecorator
@@ -30,7 +32,6 @@ from UM.Signal import Signal
 
 from .SmartSliceCloudStatus import SmartSliceCloudStatus
 from .SmartSliceProperty import SmartSlicePropertyColor
-from .SmartSliceJobHandler import SmartSliceJobHandler
 from .SmartSliceDecorator import SmartSliceAddedDecorator, SmartSliceRemovedDecorator
 from .requirements_tool.SmartSliceRequirements import SmartSliceRequirements
 from .select_tool.SmartSliceSelectTool import SmartSliceSelectTool
@@ -38,14 +39,35 @@ from .stage.ui.ResultTable import ResultsTableHeader, ResultTableData
 from .utils import getNodeActiveExtruder
 from .utils import getModifierMeshes
 from .utils import getPrintableNodes
+from .utils import Tracing
+from .utils import SystemUtils
 from .components import Dialog
 
-import pywim
+pywim = SystemUtils.lazyImport("pywim")
 
 i18n_catalog = i18nCatalog("smartslice")
 
+class PreparedOptimizationResult:
+    """
+    Everything needed to show one optimization result in the scene: the extruder
+    settings and the modifier mesh nodes. Built once, then re-used every time the
+    result is selected again.
+    """
+
+    def __init__(self, analysis, settings: Dict[str, object], nodes: List[CuraSceneNode], transformation: numpy.ndarray):
+        self.analysis = analysis
+        self.settings = settings                    # None if the result doesn't change the extruder settings
+        self.nodes = nodes                          # List[CuraSceneNode]
+        self.transformation = transformation.copy() # Local transformation of the part the nodes were placed for
+
+    def isValidFor(self, analysis, transformation: numpy.ndarray) -> bool:
+        return self.analysis is analysis and numpy.array_equal(self.transformation, transformation)
+
 # Serves as a bridge between the main UI in QML and data regarding Smart Slice
 class SmartSliceCloudProxy(QObject):
+
+    prepare_neighbours_preference = "smartslice/prepare_neighbouring_results"
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -88,6 +110,17 @@ class SmartSliceCloudProxy(QObject):
         self._resultsTable.updateDisplaySignal.connect(self.updatePropertiesFromResults)
         self._resultsTable.resultsUpdated.connect(self._resultsTableUpdated)
 
+        self._modifierMeshCache = {} # Dict[(result index, mesh index), (modifier mesh, MeshData)]
+        self._preparedResults = {} # Dict[int, PreparedOptimizationResult], keyed by result index
+
+        Application.getInstance().getPreferences().addPreference(self.prepare_neighbours_preference, True)
+
+        self._pendingPreparations = [] # List[int], result indices
+        self._prepareTimer = QTimer()
+        self._prepareTimer.setSingleShot(True)
+        self._prepareTimer.setInterval(0)
+        self._prepareTimer.timeout.connect(self._prepareNeighbouringResults)
+
         # Properties (mainly) for the sliceinfo widget
         self._resultSafetyFactor = 0.0 #copy.copy(self._targetFactorOfSafety)
         self._resultMaximalDisplacement = 0.0 #copy.copy(self._targetMaximalDisplacement)
@@ -392,6 +425,19 @@ class SmartSliceCloudProxy(QObject):
         return self._resultsTable
 
     def _resultsTableUpdated(self):
+        # The first result is applied before the table tells us about the new results,
+        # so only what was prepared for results which are no longer in the table is dropped
+        analyses = self._resultsTable.analyses
+
+        def isCurrent(result_id, analysis):
+            return result_id < len(analyses) and analyses.isDecoded(result_id) and analyses[result_id] is analysis
+
+        self._preparedResults = {
+            result_id: prepared for result_id, prepared in self._preparedResults.items() if isCurrent(result_id, prepared.analysis)
+        }
+        self._modifierMeshCache = {
+            key: cached for key, cached in self._modifierMeshCache.items() if key[0] in self._preparedResults
+        }
         self.resultsTableUpdated.emit()
 
     resultTimeTotalChanged = pyqtSignal()
@@ -699,10 +745,10 @@ class SmartSliceCloudProxy(QObject):
         self.updateColorMaxDisplacement()
 
     # Updates the properties from a job setup
-    def updatePropertiesFromJob(self, job: pywim.smartslice.job.Job, callback):
+    def updatePropertiesFromJob(self, job: 'pywim.smartslice.job.Job', callback, signatures: dict = None):
 
         select_tool = SmartSliceSelectTool.getInstance()
-        select_tool.updateFromJob(job, callback)
+        select_tool.updateFromJob(job, callback, signatures)
 
         requirements = SmartSliceRequirements.getInstance()
         requirements.targetSafetyFactor = job.optimization.min_safety_factor
@@ -736,9 +782,9 @@ class SmartSliceCloudProxy(QObject):
 
         if self._sliceStatusEnum == SmartSliceCloudStatus.Optimized:
             result_id = result[ResultsTableHeader.Rank.value] - 1
-            self.updateSceneFromOptimizationResult(self._resultsTable.analyses[result_id])
+            self.updateSceneFromOptimizationResult(self._resultsTable.analyses[result_id], result_id)
 
-    def updateStatusFromResults(self, job: pywim.smartslice.job.Job, results: pywim.smartslice.result.Result):
+    def updateStatusFromResults(self, job: 'pywim.smartslice.job.Job', results: 'pywim.smartslice.result.Result'):
 
         if job:
             if job.type == pywim.smartslice.job.JobType.validation:
@@ -764,122 +810,232 @@ class SmartSliceCloudProxy(QObject):
         else:
             self._sliceStatusEnum = SmartSliceCloudStatus.Optimized
 
-    def updateSceneFromOptimizationResult(self, analysis: pywim.smartslice.result.Analysis):
+    @Tracing.traced("results.applyToScene")
+    def updateSceneFromOptimizationResult(self, analysis: 'pywim.smartslice.result.Analysis', result_id: int = None):
         our_only_node =  getPrintableNodes()[0]
         active_extruder = getNodeActiveExtruder(our_only_node)
 
-        # TODO - Move this into a common class or function to apply an am.Config to GlobalStack/ExtruderStack
-        if analysis.print_config.infill:
+        prepared = self._prepareResult(analysis, result_id, our_only_node)
 
-            infill_density = analysis.print_config.infill.density
-            infill_pattern = analysis.print_config.infill.pattern
+        # Only the settings which differ from the current ones are written
+        if prepared.settings is not None:
+            Logger.log("d", "Optimized extruder settings: {}".format(prepared.settings))
 
-            if infill_pattern is None or infill_pattern == pywim.am.InfillType.unknown:
-                infill_pattern = pywim.am.InfillType.grid
-
-            infill_pattern_name = SmartSliceJobHandler.INFILL_SMARTSLICE_CURA[infill_pattern]
+            settings_changed = False
+            for key, value in prepared.settings.items():
+                if active_extruder.getProperty(key, "value") != value:
+                    active_extruder.setProperty(key, "value", value, set_from_cache=True)
+                    settings_changed = True
 
-            extruder_dict = {
-                "wall_line_count": analysis.print_config.walls,
-                "top_layers": analysis.print_config.top_layers,
-                "bottom_layers": analysis.print_config.bottom_layers,
-                "infill_sparse_density": analysis.print_config.infill.density,
-                "infill_pattern": infill_pattern_name
-            }
+            if settings_changed:
+                Application.getInstance().getMachineManager().forceUpdateAllSettings()
 
-            Logger.log("d", "Optimized extruder settings: {}".format(extruder_dict))
+            self.optimizationResultAppliedToScene.emit()
 
-            for key, value in extruder_dict.items():
-                if value is not None:
-                    active_extruder.setProperty(key, "value", value, set_from_cache=True)
+        scene = Application.getInstance().getController().getScene()
 
-            Application.getInstance().getMachineManager().forceUpdateAllSettings()
-            self.optimizationResultAppliedToScene.emit()
+        # Removing the previous modifier meshes and adding the new ones is a single operation.
+        # Nodes of the result which are already in the scene are left alone.
+        op = GroupedOperation()
 
-        # Remove any modifier meshes which are present from a previous result
         mod_meshes = getModifierMeshes()
-        if len(mod_meshes) > 0:
-            op = GroupedOperation()
-            for node in mod_meshes:
-                node.addDecorator(SmartSliceRemovedDecorator())
-                op.addOperation(RemoveSceneNodeOperation(node))
-            op.push()
-            Application.getInstance().getController().getScene().sceneChanged.emit(node)
-
-        # Add in the new modifier meshes
-        for modifier_mesh in analysis.modifier_meshes:
-            # Building the scene node
-            modifier_mesh_node = CuraSceneNode()
-            modifier_mesh_node.setName("SmartSliceMeshModifier")
-            modifier_mesh_node.setSelectable(True)
-            modifier_mesh_node.setCalculateBoundingBox(True)
-
-            # Use the data from the SmartSlice engine to translate / rotate / scale the mod mesh
-            parent_transformation = our_only_node.getLocalTransformation()
-            modifier_mesh_transform_matrix = parent_transformation.multiply(Matrix(modifier_mesh.transform))
-            modifier_mesh_node.setTransformation(modifier_mesh_transform_matrix)
-
-            # Building the mesh
-
-            # # Preparing the data from pywim for MeshBuilder
-            modifier_mesh_vertices = [[v.x, v.y, v.z] for v in modifier_mesh.vertices ]
-            modifier_mesh_indices = [[triangle.v1, triangle.v2, triangle.v3] for triangle in modifier_mesh.triangles]
-
-            # Doing the actual build
-            modifier_mesh_data = MeshBuilder()
-            modifier_mesh_data.setVertices(numpy.asarray(modifier_mesh_vertices, dtype=numpy.float32))
-            modifier_mesh_data.setIndices(numpy.asarray(modifier_mesh_indices, dtype=numpy.int32))
-            modifier_mesh_data.calculateNormals()
-
-            modifier_mesh_node.setMeshData(modifier_mesh_data.build())
-            modifier_mesh_node.calculateBoundingBoxMesh()
-
-            active_build_plate = Application.getInstance().getMultiBuildPlateModel().activeBuildPlate
-            modifier_mesh_node.addDecorator(BuildPlateDecorator(active_build_plate))
-            modifier_mesh_node.addDecorator(SliceableObjectDecorator())
-            modifier_mesh_node.addDecorator(SmartSliceAddedDecorator())
-
-            bottom = modifier_mesh_node.getBoundingBox().bottom
-
-            z_offset_decorator = ZOffsetDecorator()
-            z_offset_decorator.setZOffset(bottom)
-            modifier_mesh_node.addDecorator(z_offset_decorator)
-
-            stack = modifier_mesh_node.callDecoration("getStack")
-            settings = stack.getTop()
-
-            modifier_mesh_node_infill_pattern = SmartSliceJobHandler.INFILL_SMARTSLICE_CURA[modifier_mesh.print_config.infill.pattern]
-            definition_dict = {
-                "infill_mesh" : True,
-                "infill_pattern" : modifier_mesh_node_infill_pattern,
-                "infill_sparse_density": modifier_mesh.print_config.infill.density,
-                "wall_line_count": modifier_mesh.print_config.walls,
-                "top_layers": modifier_mesh.print_config.top_layers,
-                "bottom_layers": modifier_mesh.print_config.bottom_layers,
-                }
-            Logger.log("d", "Optimized modifier mesh settings: {}".format(definition_dict))
-
-            for key, value in definition_dict.items():
-                if value is not None:
-                    definition = stack.getSettingDefinition(key)
-                    new_instance = SettingInstance(definition, settings)
-                    new_instance.setProperty("value", value)
-
-                    new_instance.resetState()  # Ensure that the state is not seen as a user state.
-                    settings.addInstance(new_instance)
-
-            op = GroupedOperation()
+        removed_nodes = [node for node in mod_meshes if node not in prepared.nodes]
+        new_nodes = [node for node in prepared.nodes if node not in mod_meshes]
+
+        for node in removed_nodes:
+            node.addDecorator(SmartSliceRemovedDecorator())
+            op.addOperation(RemoveSceneNodeOperation(node))
+
+        for modifier_mesh_node in new_nodes:
+            # A prepared node may have been in the scene before, for an earlier selection of this result
+            modifier_mesh_node.removeDecorator(SmartSliceRemovedDecorator)
+
             # First add node to the scene at the correct position/scale, before parenting, so the eraser mesh does not get scaled with the parent
-            op.addOperation(AddSceneNodeOperation(
-                modifier_mesh_node,
-                Application.getInstance().getController().getScene().getRoot()
-            ))
-            op.addOperation(SetParentOperation(
-                modifier_mesh_node,
-                Application.getInstance().getController().getScene().getRoot()
-            ))
+            op.addOperation(AddSceneNodeOperation(modifier_mesh_node, scene.getRoot()))
+            op.addOperation(SetParentOperation(modifier_mesh_node, scene.getRoot()))
+
+        if len(removed_nodes) > 0 or len(new_nodes) > 0:
             op.push()
 
             # emit changes and connect error tracker
-            Application.getInstance().getController().getScene().sceneChanged.emit(modifier_mesh_node)
+            if len(removed_nodes) > 0:
+                scene.sceneChanged.emit(removed_nodes[-1])
+            for modifier_mesh_node in new_nodes:
+                scene.sceneChanged.emit(modifier_mesh_node)
+
+        if result_id is not None and Application.getInstance().getPreferences().getValue(self.prepare_neighbours_preference):
+            self._pendingPreparations = self._resultsTable.neighbouringResults(result_id)
+            self._prepareTimer.start()
+
+    def _prepareResult(self, analysis: 'pywim.smartslice.result.Analysis', result_id: int, parent: SceneNode) -> PreparedOptimizationResult:
+        """
+        The settings and modifier mesh nodes of an optimization result. They are kept
+        per result until the results change or the part is transformed.
+        """
+        transformation = parent.getLocalTransformation().getData()
+
+        prepared = self._preparedResults.get(result_id) if result_id is not None else None
+        if prepared and prepared.isValidFor(analysis, transformation):
+            Tracing.count("results.prepared.hit")
+            return prepared
+
+        Tracing.count("results.prepared.miss")
+
+        with Tracing.span("results.prepare", modifier_meshes=len(analysis.modifier_meshes)):
+            nodes = [
+                self._createModifierMeshNode(parent, modifier_mesh, self._modifierMeshData(result_id, index, modifier_mesh))
+                for index, modifier_mesh in enumerate(analysis.modifier_meshes)
+            ]
+
+        prepared = PreparedOptimizationResult(analysis, self._resultSettings(analysis), nodes, transformation)
+        if result_id is not None:
+            self._preparedResults[result_id] = prepared
+
+        return prepared
+
+    def _prepareNeighbouringResults(self):
+        """
+        Prepares the results next to the applied one, one per event loop iteration,
+        so they can be shown straight away when selected
+        """
+        if len(self._pendingPreparations) == 0:
+            return
+
+        result_id = self._pendingPreparations.pop(0)
+
+        nodes = getPrintableNodes()
+        analyses = self._resultsTable.analyses
+        if len(nodes) > 0 and 0 <= result_id < len(analyses):
+            self._prepareResult(analyses[result_id], result_id, nodes[0])
+
+        if len(self._pendingPreparations) > 0:
+            self._prepareTimer.start()
+
+    @staticmethod
+    def _resultSettings(analysis: 'pywim.smartslice.result.Analysis') -> Dict[str, object]:
+        """
+        The extruder settings of an optimization result, or None if the result has no infill
+        """
+        # TODO - Move this into a common class or function to apply an am.Config to GlobalStack/ExtruderStack
+        if not analysis.print_config.infill:
+            return None
+
+        infill_pattern = analysis.print_config.infill.pattern
+
+        if infill_pattern is None or infill_pattern == pywim.am.InfillType.unknown:
+            infill_pattern = pywim.am.InfillType.grid
+
+        # The job handler is loaded with Smart Slice, which has happened by the time there are results
+        from .SmartSliceJobHandler import SmartSliceJobHandler
+
+        infill_pattern_name = SmartSliceJobHandler.INFILL_SMARTSLICE_CURA[infill_pattern]
+
+        extruder_dict = {
+            "wall_line_count": analysis.print_config.walls,
+            "top_layers": analysis.print_config.top_layers,
+            "bottom_layers": analysis.print_config.bottom_layers,
+            "infill_sparse_density": analysis.print_config.infill.density,
+            "infill_pattern": infill_pattern_name
+        }
+
+        return { key: value for key, value in extruder_dict.items() if value is not None }
+
+    def _modifierMeshData(self, result_id: int, index: int, modifier_mesh) -> MeshData:
+        """
+        The mesh of a modifier mesh of an optimization result. Meshes are cached by
+        result and mesh index, as long as the results table holds the same results.
+        """
+        if result_id is None:
+            return self._buildModifierMeshData(modifier_mesh)
+
+        key = (result_id, index)
+        cached = self._modifierMeshCache.get(key)
+
+        # The results table emits the first result before telling us the results changed
+        if cached is None or cached[0] is not modifier_mesh:
+            Tracing.count("results.modifierMesh.miss")
+            cached = (modifier_mesh, self._buildModifierMeshData(modifier_mesh))
+            self._modifierMeshCache[key] = cached
+        else:
+            Tracing.count("results.modifierMesh.hit")
+
+        return cached[1]
+
+    @staticmethod
+    @Tracing.traced("results.buildModifierMesh")
+    def _buildModifierMeshData(modifier_mesh) -> MeshData:
+        vertices = modifier_mesh.vertices
+        triangles = modifier_mesh.triangles
+
+        # Decode the pywim vertices and triangles straight into contiguous arrays
+        vertex_array = numpy.fromiter(
+            itertools.chain.from_iterable((v.x, v.y, v.z) for v in vertices),
+            dtype=numpy.float32, count=3 * len(vertices)
+        ).reshape(-1, 3)
+
+        index_array = numpy.fromiter(
+            itertools.chain.from_iterable((t.v1, t.v2, t.v3) for t in triangles),
+            dtype=numpy.int32, count=3 * len(triangles)
+        ).reshape(-1, 3)
+
+        modifier_mesh_data = MeshBuilder()
+        modifier_mesh_data.setVertices(vertex_array)
+        modifier_mesh_data.setIndices(index_array)
+        modifier_mesh_data.calculateNormals()
+
+        return modifier_mesh_data.build()
+
+    @staticmethod
+    def _createModifierMeshNode(parent: SceneNode, modifier_mesh, mesh_data: MeshData) -> CuraSceneNode:
+        # Building the scene node
+        modifier_mesh_node = CuraSceneNode()
+        modifier_mesh_node.setName("SmartSliceMeshModifier")
+        modifier_mesh_node.setSelectable(True)
+        modifier_mesh_node.setCalculateBoundingBox(True)
+
+        # Use the data from the SmartSlice engine to translate / rotate / scale the mod mesh
+        parent_transformation = parent.getLocalTransformation()
+        modifier_mesh_transform_matrix = parent_transformation.multiply(Matrix(modifier_mesh.transform))
+        modifier_mesh_node.setTransformation(modifier_mesh_transform_matrix)
+
+        # The mesh data is immutable, so the cached mesh can be shared between nodes
+        modifier_mesh_node.setMeshData(mesh_data)
+        modifier_mesh_node.calculateBoundingBoxMesh()
+
+        active_build_plate = Application.getInstance().getMultiBuildPlateModel().activeBuildPlate
+        modifier_mesh_node.addDecorator(BuildPlateDecorator(active_build_plate))
+        modifier_mesh_node.addDecorator(SliceableObjectDecorator())
+        modifier_mesh_node.addDecorator(SmartSliceAddedDecorator())
+
+        bottom = modifier_mesh_node.getBoundingBox().bottom
+
+        z_offset_decorator = ZOffsetDecorator()
+        z_offset_decorator.setZOffset(bottom)
+        modifier_mesh_node.addDecorator(z_offset_decorator)
+
+        stack = modifier_mesh_node.callDecoration("getStack")
+        settings = stack.getTop()
+
+        from .SmartSliceJobHandler import SmartSliceJobHandler
+
+        modifier_mesh_node_infill_pattern = SmartSliceJobHandler.INFILL_SMARTSLICE_CURA[modifier_mesh.print_config.infill.pattern]
+        definition_dict = {
+            "infill_mesh" : True,
+            "infill_pattern" : modifier_mesh_node_infill_pattern,
+            "infill_sparse_density": modifier_mesh.print_config.infill.density,
+            "wall_line_count": modifier_mesh.print_config.walls,
+            "top_layers": modifier_mesh.print_config.top_layers,
+            "bottom_layers": modifier_mesh.print_config.bottom_layers,
+            }
+        Logger.log("d", "Optimized modifier mesh settings: {}".format(definition_dict))
+
+        for key, value in definition_dict.items():
+            if value is not None:
+                definition = stack.getSettingDefinition(key)
+                new_instance = SettingInstance(definition, settings)
+                new_instance.setProperty("value", value)
+
+                new_instance.resetState()  # Ensure that the state is not seen as a user state.
+                settings.addInstance(new_instance)
 
+        return modifier_mesh_node
@@ -1,5 +1,6 @@
 import os
 import json
+import weakref
 from typing import Dict
 
 from PyQt5.QtCore import QUrl
@@ -8,6 +9,7 @@ from PyQt5.QtGui import QDesktopServices
 from UM.i18n import i18nCatalog
 from UM.Application import Application
 from UM.Extension import Extension
+from UM.Logger import Logger
 from UM.PluginRegistry import PluginRegistry
 
 from cura.CuraApplication import CuraApplication
@@ -15,9 +17,13 @@ from cura.CuraApplication import CuraApplication
 from .SmartSliceCloudConnector import SmartSliceCloudConnector
 from .SmartSliceCloudProxy import SmartSliceCloudProxy
 from .SmartSliceCloudStatus import SmartSliceCloudStatus
-from .utils import getPrintableNodes
+from .utils import getPrintableNodes, getModifierMeshes, findChildSceneNode
+from .stage import SmartSliceScene
+from .stage.ui.ResultTable import LazyAnalyses
+from . import SmartSliceResultEncoding
+from .utils import SystemUtils
 
-import pywim
+pywim = SystemUtils.lazyImport("pywim")
 
 i18n_catalog = i18nCatalog("smartslice")
 
@@ -62,6 +68,19 @@ class SmartSliceExtension(Extension):
         # Data storage location for workspaces - this is where we store our data for saving to the Cura project
         self._storage = Application.getInstance().getWorkspaceMetadataStorage()
 
+        # The last job and results written to the storage, re-used until the setup changes
+        self._saved_job = None          # (job dict, job type)
+        self._saved_fingerprint = None  # (settings generation, job type)
+        self._saved_setup = None        # SmartSliceSnapshot
+        self._saved_results = None      # (pywim.smartslice.result.Result, encoded result)
+
+        # Counts the changes to the scene and to any settings which end up in the job
+        self._settings_generation = 0
+        self._watched_stacks = weakref.WeakSet()
+
+        Application.getInstance().globalContainerStackChanged.connect(self._onSetupChanged)
+        controller.getScene().sceneChanged.connect(self._onSceneChanged)
+
         # We use the signal from the cloud connector to always update the plugin metadeta after results are generated
         # _saveState is also called when the user actually saves a project
         self.cloud.saveSmartSliceJob.connect(self._saveState)
@@ -171,27 +190,96 @@ class SmartSliceExtension(Extension):
     def _writeState(self, output_object=None):
         self._saveState(True)
 
-    def _saveState(self, writing_workspace=False):
-        # Build the Smart Slice job. We want to always build in case something has changed
+    def _onSetupChanged(self, *args):
+        self._settings_generation += 1
+
+    def _onSceneChanged(self, source):
+        # Only the models, modifier meshes and their groups end up in the job, not e.g. the camera
+        root = Application.getInstance().getController().getScene().getRoot()
+        if source is root or source.callDecoration("isSliceable") or source.callDecoration("isGroup"):
+            self._onSetupChanged()
+
+    def _watchStacks(self):
+        global_stack = Application.getInstance().getGlobalContainerStack()
+        if not global_stack:
+            return
+
+        stacks = [global_stack] + list(global_stack.extruderList)
+        stacks += [node.callDecoration("getStack") for node in getPrintableNodes() + getModifierMeshes()]
+
+        for stack in stacks:
+            if stack is not None and stack not in self._watched_stacks:
+                stack.propertyChanged.connect(self._onSetupChanged)
+                stack.containersChanged.connect(self._onSetupChanged)
+                self._watched_stacks.add(stack)
+
+    def _buildSavedJob(self, job_type):
+        """
+        The job to store as a dict, and its type. Building the job evaluates every setting, so the last
+        job is re-used until the scene, a setting or the Smart Slice setup changes.
+        """
+        # Nothing to save if Smart Slice has not been used yet
+        if not self.cloud.smartSliceJobHandle:
+            return None
+
+        self._watchStacks()
+
+        fingerprint = (self._settings_generation, job_type)
+        setup = self.cloud.propertyHandler.captureSetup(self._saved_setup)
+
+        if self._saved_job is not None and fingerprint == self._saved_fingerprint and setup.sharesAllStates(self._saved_setup):
+            return self._saved_job
+
+        # Build the Smart Slice job
         job = self.cloud.smartSliceJobHandle.buildJobFor3mf()
 
         # No need to save aything if we haven't switched to the smart slice stage yet
         # This is the only time we will get a null job
         if not job:
-            return
+            return None
 
+        if job_type is not None:
+            job.type = job_type
+
+        self._saved_job = (job.to_dict(), job.type)
+        self._saved_fingerprint = fingerprint
+        self._saved_setup = setup
+
+        return self._saved_job
+
+    def _encodeSavedResults(self, results) -> str:
+        if self._saved_results is None or self._saved_results[0] is not results:
+            self._saved_results = (results, SmartSliceResultEncoding.encodeResult(results))
+        return self._saved_results[1]
+
+    def _saveState(self, writing_workspace=False):
         cloudJob = self.cloud.cloudJob
-        if cloudJob:
-            job.type = cloudJob.job_type
+
+        saved_job = self._buildSavedJob(cloudJob.job_type if cloudJob else None)
+        if not saved_job:
+            return
+
+        job_dict, job_type = saved_job
 
         # Place the job in the metadata under our plugin ID
-        self._storage.setEntryToStore(plugin_id=self.metadata.id, key='job', data=job.to_dict())
+        self._storage.setEntryToStore(plugin_id=self.metadata.id, key='job', data=job_dict)
         self._storage.setEntryToStore(plugin_id=self.metadata.id, key='version', data=self.metadata.version)
         self._storage.setEntryToStore(plugin_id=self.metadata.id, key='status', data=self.cloud.status.value)
 
+        # Geometric signatures of the selected faces, so they can be found again if the mesh changes
+        smart_slice_node = findChildSceneNode(getPrintableNodes()[0], SmartSliceScene.Root) if getPrintableNodes() else None
+        if smart_slice_node:
+            self._storage.setEntryToStore(plugin_id=self.metadata.id, key='faceSignatures', data=smart_slice_node.faceSignatures())
+
         # Need to do some checks to see if we've stored the results for the active job
         if cloudJob and cloudJob.getResult():
-            self._storage.setEntryToStore(plugin_id=self.metadata.id, key='results', data=cloudJob.getResult().to_dict())
+            # Results are stored in their compact binary encoding, 'results' is only read from older workspaces
+            self._storage.setEntryToStore(plugin_id=self.metadata.id, key='results', data=None)
+            self._storage.setEntryToStore(
+                plugin_id=self.metadata.id,
+                key='resultsBinary',
+                data=self._encodeSavedResults(cloudJob.getResult())
+            )
             self._storage.setEntryToStore(
                 plugin_id=self.metadata.id,
                 key='selectedResult',
@@ -199,8 +287,9 @@ class SmartSliceExtension(Extension):
             )
             if writing_workspace:
                 cloudJob.saved = True
-        elif job.type == pywim.smartslice.job.JobType.validation and (not cloudJob or not cloudJob.getResult()):
+        elif job_type == pywim.smartslice.job.JobType.validation and (not cloudJob or not cloudJob.getResult()):
             self._storage.setEntryToStore(plugin_id=self.metadata.id, key='results', data=None)
+            self._storage.setEntryToStore(plugin_id=self.metadata.id, key='resultsBinary', data=None)
             self._storage.setEntryToStore(plugin_id=self.metadata.id, key='selectedResult', data=None)
 
     # Acquires all of the smart slice data from Cura storage and updates the UI
@@ -211,13 +300,24 @@ class SmartSliceExtension(Extension):
         if len(all_data) == 0:
             return
 
+        self.cloud.prepareSmartSlice()
+
         job_dict = all_data['job']
         status = all_data['status']
         results_dict = all_data.get('results', None)
+        results_binary = all_data.get('resultsBinary', None)
         row = all_data.get('selectedResult', None) # The row is stored as the order of the results
+        signatures = all_data.get('faceSignatures', None)
 
         job = pywim.smartslice.job.Job.from_dict(job_dict) if job_dict else None
-        results = pywim.smartslice.result.Result.from_dict(results_dict) if results_dict else None
+        results = None
+        if results_binary:
+            try:
+                results = SmartSliceResultEncoding.decodeResult(results_binary)
+            except ValueError as exc:
+                Logger.log("w", "Unable to read the Smart Slice results: {}".format(exc))
+        elif results_dict:
+            results = LazyAnalyses.decodeResult(results_dict)
         selected_row = row if row and row >= 0 else 0
 
         self.cloud.clearJobs()
@@ -246,7 +346,7 @@ class SmartSliceExtension(Extension):
             self._storage.getPluginMetadata(self.metadata.id).clear()
 
         if job:
-            self.proxy.updatePropertiesFromJob(job, afterSmartSliceNodeInit)
+            self.proxy.updatePropertiesFromJob(job, afterSmartSliceNodeInit, signatures)
 
     def _reset(self, *args):
         if len(getPrintableNodes()) == 0:
@@ -32,6 +32,7 @@ from .utils import getPrintableNodes
 from .utils import getModifierMeshes
 from .utils import getNodeActiveExtruder
 from .utils import findChildSceneNode
+from .utils import Tracing
 from .stage.SmartSliceScene import Root
 
 i18n_catalog = i18nCatalog("smartslice")
@@ -75,6 +76,7 @@ class SmartSliceJobHandler:
 
     # Builds and checks a smart slice job for errors based on current setup defined by the property handler
     # Will return the job, and a dictionary of error keys and associated error resolutions
+    @Tracing.traced("job.check")
     def checkJob(self, machine_name="printer", show_extruder_warnings=False) -> Tuple[pywim.smartslice.job.Job, Dict[str, str]]:
 
         if len(getPrintableNodes()) == 0:
@@ -217,6 +219,7 @@ class SmartSliceJobHandler:
         return job, error_dict
 
     # Builds a complete smart slice job to be written to a 3MF
+    @Tracing.traced("job.build")
     def buildJobFor3mf(self, machine_name="printer") -> pywim.smartslice.job.Job:
 
         job, errors = self.checkJob(machine_name)
@@ -271,6 +274,7 @@ class SmartSliceJobHandler:
 
     # Writes a smartslice job to a 3MF file
     @classmethod
+    @Tracing.traced("job.write3mf")
     def write3mf(self, threemf_path, mesh_nodes, job: pywim.smartslice.job.Job):
         # Getting 3MF writer and write our file
         threeMF_Writer = Application.getInstance().getMeshFileHandler().getWriter("3MFWriter")
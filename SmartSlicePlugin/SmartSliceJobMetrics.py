@@ -0,0 +1,191 @@
+#
+#  Lifecycle metrics of the Smart Slice cloud jobs, kept in a local rotating store
+#
+
+import json
+import os
+import statistics
+import threading
+import time
+
+from typing import Dict, List, Optional
+
+from UM.Logger import Logger
+
+"""
+  JobMetrics
+    Timings of one cloud job from preparing the 3MF to receiving the result. The
+      job and the status tracker fill it in while the job runs, and it is appended
+      to the store once the job is done.
+"""
+class JobMetrics:
+
+    # Upper bounds of the mesh size classes, in triangles
+    MESH_SIZES = (
+        (10000, "small"),
+        (100000, "medium"),
+        (1000000, "large")
+    )
+
+    def __init__(self, job_type: str = None):
+        self.job_type = job_type
+        self.material = None
+        self.triangles = 0
+
+        self.started = time.time()
+        self.prepare_time = None
+        self.upload_time = None
+        self.upload_bytes = None
+        self.status_times = {}      # Dict[str, float]
+        self.progress_updates = 0
+        self.status = None
+        self.result_analyses = None
+
+        self._status = None
+        self._status_start = None
+
+    @classmethod
+    def meshSize(cls, triangles: int) -> str:
+        for bound, name in cls.MESH_SIZES:
+            if triangles <= bound:
+                return name
+        return "huge"
+
+    def trackStatus(self, status: Optional[str]):
+        """
+        Called with every status the API reports, adds the time spent in the previous status
+        """
+        self.progress_updates += 1
+
+        if status == self._status:
+            return
+
+        now = time.perf_counter()
+        if self._status is not None:
+            self.status_times[self._status] = self.status_times.get(self._status, 0.) + now - self._status_start
+
+        self._status = status
+        self._status_start = now
+
+    def finish(self, status: Optional[str]):
+        self.trackStatus(status)
+        self.status = status
+
+    def toDict(self) -> dict:
+        return {
+            "started": self.started,
+            "total_time": time.time() - self.started,
+            "job_type": self.job_type,
+            "material": self.material,
+            "triangles": self.triangles,
+            "mesh_size": self.meshSize(self.triangles),
+            "prepare_time": self.prepare_time,
+            "upload_time": self.upload_time,
+            "upload_bytes": self.upload_bytes,
+            "queue_time": self.status_times.get("queued", 0.),
+            "run_time": self.status_times.get("running", 0.),
+            "progress_updates": self.progress_updates,
+            "status": self.status,
+            "result_analyses": self.result_analyses
+        }
+
+
+class JobMetricsStore:
+    """
+    JSON lines file of job metrics, rotated once it grows past max_bytes.
+    The given number of rotated files is kept next to it as .1, .2, ...
+    """
+
+    # Timings summarized per group
+    TIMINGS = ("total_time", "prepare_time", "upload_time", "queue_time", "run_time")
+
+    def __init__(self, path: str, max_bytes: int = 1024 * 1024, backups: int = 3):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+
+        self._lock = threading.Lock()
+
+    def _files(self) -> List[str]:
+        """
+        Store files from the oldest to the newest
+        """
+        rotated = ["{}.{}".format(self.path, i) for i in range(self.backups, 0, -1)]
+        return [f for f in rotated + [self.path] if os.path.exists(f)]
+
+    def _rotate(self):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < self.max_bytes:
+            return
+
+        for i in range(self.backups, 0, -1):
+            source = "{}.{}".format(self.path, i - 1) if i > 1 else self.path
+            if os.path.exists(source):
+                os.replace(source, "{}.{}".format(self.path, i))
+
+        if self.backups == 0:
+            os.remove(self.path)
+
+    def append(self, metrics: JobMetrics) -> bool:
+        line = json.dumps(metrics.toDict(), default=str)
+
+        with self._lock:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory and not os.path.exists(directory):
+                    os.makedirs(directory)
+
+                self._rotate()
+
+                with open(self.path, "a") as store:
+                    store.write(line + "\n")
+            except OSError as exc:
+                Logger.log("w", "Unable to store the Smart Slice job metrics in {}: {}".format(self.path, exc))
+                return False
+
+        return True
+
+    def records(self, since: float = None) -> List[dict]:
+        records = []
+
+        with self._lock:
+            for f in self._files():
+                try:
+                    with open(f) as store:
+                        for line in store:
+                            try:
+                                record = json.loads(line)
+                            except ValueError:
+                                # A partially written line, e.g. when Cura was closed while writing
+                                continue
+                            if since is None or record.get("started", 0) >= since:
+                                records.append(record)
+                except OSError as exc:
+                    Logger.log("w", "Unable to read the Smart Slice job metrics in {}: {}".format(f, exc))
+
+        return records
+
+    def summary(self, group_by: str = "job_type", since: float = None) -> Dict[str, dict]:
+        """
+        Job count, median and mean of the timings and the share of the total time
+        per group. Records can be grouped by 'job_type', 'material' or 'mesh_size'.
+        """
+        groups = {}
+        for record in self.records(since):
+            groups.setdefault(str(record.get(group_by)), []).append(record)
+
+        summary = {}
+        for name, records in sorted(groups.items()):
+            group = { "jobs": len(records) }
+            total = sum(r.get("total_time") or 0. for r in records)
+
+            for timing in self.TIMINGS:
+                values = [r[timing] for r in records if r.get(timing) is not None]
+                group[timing] = {
+                    "median": statistics.median(values) if values else None,
+                    "mean": statistics.mean(values) if values else None,
+                    "share": sum(values) / total if total > 0 and timing != "total_time" else None
+                }
+
+            summary[name] = group
+
+        return summary
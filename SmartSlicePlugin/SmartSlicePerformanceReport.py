@@ -0,0 +1,220 @@
+#
+#  Performance report added to the Smart Slice debug package
+#
+
+import cProfile
+import io
+import json
+import platform
+import pstats
+import time
+import zipfile
+
+from typing import List
+
+from UM.Logger import Logger
+
+from .SmartSliceJobMetrics import JobMetricsStore
+from .utils import getPrintableNodes, getModifierMeshes, findChildSceneNode
+from .utils import Tracing
+from .utils import SystemUtils
+from .stage import SmartSliceScene
+
+"""
+  RollingProfiler
+    Profiles the main thread in windows of a fixed length. The previous window is
+      kept when a new one starts, so a capture always covers between one and two
+      windows of the most recent plugin activity.
+"""
+class RollingProfiler:
+
+    def __init__(self, window: float):
+        self.window = window
+
+        self._current = None     # cProfile.Profile
+        self._previous = None    # cProfile.Profile
+        self._started = None
+
+    @property
+    def running(self) -> bool:
+        return self._current is not None
+
+    def start(self):
+        if self._current is not None:
+            return
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as exc:
+            # Another profiler is already active
+            Logger.log("w", "Unable to start the Smart Slice profiler: {}".format(exc))
+            return
+
+        self._current = profile
+        self._started = time.time()
+
+    def stop(self):
+        if self._current is not None:
+            self._current.disable()
+            self._previous = self._current
+            self._current = None
+
+    def rotate(self):
+        """
+        Starts a new window, dropping the oldest one
+        """
+        if self._current is None:
+            return
+
+        self._current.disable()
+        self._previous = self._current
+        self._current = None
+        self.start()
+
+    def capture(self, limit: int = 60) -> str:
+        """
+        The profile of the last one to two windows as text, sorted by cumulative time
+        """
+        profiles = [p for p in (self._previous, self._current) if p is not None]
+        if len(profiles) == 0:
+            return ""
+
+        running = self._current is not None
+        if running:
+            self._current.disable()
+
+        try:
+            output = io.StringIO()
+            stats = pstats.Stats(profiles[0], stream=output)
+            for profile in profiles[1:]:
+                stats.add(profile)
+            stats.sort_stats("cumulative").print_stats(limit)
+        finally:
+            if running:
+                self._current.enable()
+
+        return output.getvalue()
+
+
+class PerformanceReport:
+    """
+    Collects the span timings, mesh statistics, API call statistics and the queue and
+    solve times of recent jobs into one report
+    """
+
+    # Names of the files added to the debug package
+    REPORT_FILE = "SmartSlice/performance.json"
+    PROFILE_FILE = "SmartSlice/profile.txt"
+
+    def __init__(self, plugin_version: str = None, job_metrics: JobMetricsStore = None):
+        self.plugin_version = plugin_version
+        self.job_metrics = job_metrics
+
+    def build(self) -> dict:
+        tracer = Tracing.tracer
+
+        return {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "plugin_version": self.plugin_version,
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "tracing_enabled": tracer.enabled,
+            "load_times": SystemUtils.loadTimes(),
+            "spans": tracer.histograms(),
+            "counters": tracer.counters(),
+            "recent_spans": tracer.recentSpans(),
+            "mesh": self.meshStatistics(),
+            "api": self.apiStatistics(tracer.recentSpans("api.call")),
+            "jobs": self.jobStatistics(tracer.recentSpans()),
+            "job_metrics": {
+                group_by: self.job_metrics.summary(group_by) for group_by in ("job_type", "material", "mesh_size")
+            } if self.job_metrics else None
+        }
+
+    @staticmethod
+    def meshStatistics() -> List[dict]:
+        statistics = []
+
+        for node in getPrintableNodes() + getModifierMeshes():
+            mesh_data = node.getMeshData()
+
+            node_statistics = {
+                "name": node.getName(),
+                "vertices": mesh_data.getVertexCount() if mesh_data else 0,
+                "triangles": mesh_data.getFaceCount() if mesh_data else 0,
+            }
+
+            smart_slice_node = findChildSceneNode(node, SmartSliceScene.Root)
+            interactive_mesh = smart_slice_node.getInteractiveMesh() if smart_slice_node else None
+            if interactive_mesh:
+                node_statistics["interactive_mesh"] = interactive_mesh.statistics()
+
+            statistics.append(node_statistics)
+
+        analyses = Tracing.tracer.recentSpans("mesh.analyze")
+        if analyses:
+            statistics.append({
+                "name": "mesh analysis",
+                "durations": [s["duration"] for s in analyses],
+                "sizes": [s["attributes"] for s in analyses]
+            })
+
+        return statistics
+
+    @staticmethod
+    def apiStatistics(calls: List[dict]) -> dict:
+        durations = [c["duration"] for c in calls]
+        retries = [c["attributes"].get("retries", 0) for c in calls]
+
+        return {
+            "calls": len(calls),
+            "total_time": sum(durations),
+            "max_time": max(durations) if durations else 0.,
+            "retried_calls": sum(1 for r in retries if r > 0),
+            "retries": sum(retries),
+            "unsuccessful_calls": sum(1 for c in calls if c["attributes"].get("status") != 200)
+        }
+
+    @staticmethod
+    def jobStatistics(spans: List[dict]) -> List[dict]:
+        """
+        Upload, queue and solve times of the recent jobs, in the order they ran. A job
+        starts with its upload span, the status spans which follow belong to it.
+        """
+        jobs = []
+
+        for s in spans:
+            name = s["name"]
+
+            if name == "api.upload":
+                jobs.append({ "start": s["start"], "upload": s["duration"], "upload_bytes": s["attributes"].get("upload_bytes") })
+            elif len(jobs) == 0:
+                continue
+            elif name == "api.status.queued":
+                jobs[-1]["queued"] = jobs[-1].get("queued", 0.) + s["duration"]
+            elif name == "api.status.running":
+                jobs[-1]["running"] = jobs[-1].get("running", 0.) + s["duration"]
+            elif name == "api.wait":
+                jobs[-1]["wait"] = s["duration"]
+                jobs[-1]["status"] = s["attributes"].get("status")
+
+        return jobs
+
+    def writeToPackage(self, package_path: str, profiler: RollingProfiler = None) -> bool:
+        """
+        Adds the report, and the profile if there is one, to the debug package
+        """
+        try:
+            with zipfile.ZipFile(package_path, "a", compression=zipfile.ZIP_DEFLATED) as package:
+                package.writestr(self.REPORT_FILE, json.dumps(self.build(), indent=2, default=str))
+
+                if profiler:
+                    profile = profiler.capture()
+                    if profile:
+                        package.writestr(self.PROFILE_FILE, profile)
+        except (OSError, zipfile.BadZipFile) as exc:
+            Logger.log("w", "Unable to add the performance report to {}: {}".format(package_path, exc))
+            return False
+
+        return True
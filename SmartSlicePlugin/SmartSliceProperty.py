@@ -1,6 +1,8 @@
 from typing import List, Optional
 
 import copy
+import numpy
+from collections import OrderedDict, namedtuple
 from enum import Enum
 
 from UM.Application import Application
@@ -23,6 +25,18 @@ class SmartSlicePropertyColor():
     SuccessColor = "#5DBA47"
 
 class TrackedProperty:
+    """
+    A value Smart Slice depends on, which can be cached and later compared to or restored.
+
+    Versioned properties carry a counter which is bumped with touch() whenever a
+    signal reports the underlying value may have changed. hasChanged() then only
+    compares the live value to the cached one if the version moved since cache().
+    """
+
+    versioned = False
+    version = 0
+    _cached_version = None
+
     def value(self):
         raise NotImplementedError()
 
@@ -35,6 +49,37 @@ class TrackedProperty:
     def changed(self) -> bool:
         raise NotImplementedError()
 
+    def snapshot(self):
+        """
+        Immutable copy of the current state, see SmartSliceSnapshot
+        """
+        return self.value()
+
+    def applySnapshot(self, state) -> bool:
+        """
+        Applies a state from snapshot() if it differs from the current one.
+        Returns True if a Cura setting was changed.
+        """
+        raise NotImplementedError()
+
+    def touch(self, *args):
+        self.version += 1
+
+    def markCached(self):
+        if self.versioned:
+            self._cached_version = self.version
+
+    def hasChanged(self) -> bool:
+        if self.versioned and self._cached_version == self.version:
+            return False
+
+        if self.changed():
+            return True
+
+        # Touched, but the value is the same as the cached one
+        self.markCached()
+        return False
+
     def _getMachineAndExtruder(self):
         machine = CuraApplication.getInstance().getMachineManager().activeMachine
         extruder = None
@@ -46,6 +91,8 @@ class TrackedProperty:
 class ContainerProperty(TrackedProperty):
     NAMES = []
 
+    versioned = True
+
     def __init__(self, name):
         self.name = name
         self._cached_value = None
@@ -58,6 +105,7 @@ class ContainerProperty(TrackedProperty):
 
     def cache(self):
         self._cached_value = self.value()
+        self.markCached()
 
     def changed(self) -> bool:
         return self._cached_value != self.value()
@@ -85,6 +133,14 @@ class GlobalProperty(ContainerProperty):
             machine.setProperty(self.name, "value", self._cached_value, set_from_cache=True)
             machine.setProperty(self.name, "state", InstanceState.Default, set_from_cache=True)
 
+    def applySnapshot(self, state) -> bool:
+        machine, extruder = self._getMachineAndExtruder()
+        if machine and state is not None and state != self.value():
+            machine.setProperty(self.name, "value", state, set_from_cache=True)
+            machine.setProperty(self.name, "state", InstanceState.Default, set_from_cache=True)
+            return True
+        return False
+
 
 class ExtruderProperty(ContainerProperty):
     EXTRUDER_KEYS = [
@@ -134,6 +190,14 @@ class ExtruderProperty(ContainerProperty):
             extruder.setProperty(self.name, "value", self._cached_value, set_from_cache=True)
             extruder.setProperty(self.name, "state", InstanceState.Default, set_from_cache=True)
 
+    def applySnapshot(self, state) -> bool:
+        machine, extruder = self._getMachineAndExtruder()
+        if extruder and state is not None and state != self.value():
+            extruder.setProperty(self.name, "value", state, set_from_cache=True)
+            extruder.setProperty(self.name, "state", InstanceState.Default, set_from_cache=True)
+            return True
+        return False
+
 class ActiveQualityGroup(TrackedProperty):
     def __init__(self):
         self._quality_group = self.value()
@@ -147,6 +211,12 @@ class ActiveQualityGroup(TrackedProperty):
     def restore(self):
         CuraApplication.getInstance().getMachineManager().setQualityGroup(self._quality_group, no_dialog=True)
 
+    def applySnapshot(self, state) -> bool:
+        if state is None or state == self.value():
+            return False
+        CuraApplication.getInstance().getMachineManager().setQualityGroup(state, no_dialog=True)
+        return True
+
     def changed(self):
         return self._quality_group != self.value()
 
@@ -163,6 +233,11 @@ class ActiveExtruder(TrackedProperty):
     def restore(self):
         CuraApplication.getInstance().getExtruderManager().setActiveExtruderIndex(self._active_extruder_index)
 
+    def applySnapshot(self, state) -> bool:
+        if state is not None and state != self.value():
+            CuraApplication.getInstance().getExtruderManager().setActiveExtruderIndex(state)
+        return False
+
     def changed(self):
         return self.value() != self._active_extruder_index
 
@@ -200,6 +275,30 @@ class SceneNodeExtruder(TrackedProperty):
             for key in ExtruderProperty.EXTRUDER_KEYS:
                 machine.setProperty(key, "value", self._specific_extruders[key])
 
+    def snapshot(self):
+        active_extruder_index, specific_indices = self.value()
+        return active_extruder_index, tuple(sorted(specific_indices.items())) if specific_indices else None
+
+    def applySnapshot(self, state) -> bool:
+        if not self._node or state[0] is None or state == self.snapshot():
+            return False
+
+        active_extruder_index, specific_indices = state
+        current_index, current_indices = self.value()
+
+        if active_extruder_index != current_index:
+            extruder_list = CuraApplication.getInstance().getGlobalContainerStack().extruderList
+            self._node.callDecoration("setActiveExtruder", extruder_list[active_extruder_index].id)
+
+        machine, extruder = self._getMachineAndExtruder()
+        changed = False
+        for key, value in specific_indices:
+            if current_indices.get(key) != value:
+                machine.setProperty(key, "value", value)
+                changed = True
+
+        return changed
+
     def changed(self):
         active_extruder_index, specific_indices = self.value()
 
@@ -226,6 +325,13 @@ class SelectedMaterial(TrackedProperty):
         if extruder and self._cached_material:
             extruder.material = self._cached_material
 
+    def applySnapshot(self, state) -> bool:
+        machine, extruder = self._getMachineAndExtruder()
+        if extruder and state and state != self.value():
+            extruder.material = state
+            return True
+        return False
+
     def changed(self) -> bool:
         return self._cached_material != self.value()
 
@@ -246,6 +352,13 @@ class SelectedMaterialVariant(TrackedProperty):
         if extruder and self._cached_material_variant:
             extruder.variant = self._cached_material_variant
 
+    def applySnapshot(self, state) -> bool:
+        machine, extruder = self._getMachineAndExtruder()
+        if extruder and state and state != self.value():
+            extruder.variant = state
+            return True
+        return False
+
     def changed(self) -> bool:
         return self._cached_material_variant != self.value()
 
@@ -269,11 +382,21 @@ class Transform(TrackedProperty):
             self._node.setOrientation(self._orientation)
             self._node.transformationChanged.emit(self._node)
 
+    def applySnapshot(self, state) -> bool:
+        scale, orientation = state
+        if self._node and scale is not None and state != self.value():
+            self._node.setScale(scale)
+            self._node.setOrientation(orientation)
+            self._node.transformationChanged.emit(self._node)
+        return False
+
     def changed(self) -> bool:
         scale, orientation = self.value()
         return scale != self._scale or orientation != self._orientation
 
 class SceneNode(TrackedProperty):
+    versioned = True
+
     def __init__(self, node=None, name=None):
         self.parent_changed = False
         self.mesh_name = name
@@ -296,6 +419,11 @@ class SceneNode(TrackedProperty):
         self._extruder.cache()
         self._transform.cache()
         self._properties, extruder, transform = self.value()
+        self.markCached()
+
+    def onStackPropertyChanged(self, key=None, property_name=None):
+        if key in ExtruderProperty.NAMES or key in ExtruderProperty.EXTRUDER_KEYS:
+            self.touch()
 
     def changed(self):
         if self._node:
@@ -315,6 +443,33 @@ class SceneNode(TrackedProperty):
             self._extruder.restore()
             self._transform.restore()
 
+    def snapshot(self):
+        if not self._node:
+            return None
+
+        stack = self._node.callDecoration("getStack").getTop()
+        properties = tuple((prop, stack.getProperty(prop, "value")) for prop in self._names)
+
+        return properties, self._extruder.snapshot(), self._transform.snapshot()
+
+    def applySnapshot(self, state) -> bool:
+        if not self._node or state is None:
+            return False
+
+        properties, extruder, transform = state
+
+        stack = self._node.callDecoration("getStack").getTop()
+        changed = False
+        for key, value in properties:
+            if stack.getProperty(key, "value") != value:
+                stack.setProperty(key, "value", value)
+                changed = True
+
+        changed = self._extruder.applySnapshot(extruder) or changed
+        self._transform.applySnapshot(transform)
+
+        return changed
+
     def parentChanged(self, parent):
         self.parent_changed = True
 
@@ -332,23 +487,40 @@ class Scene(TrackedProperty):
     def cache(self):
         self._root, self._nodes = self.value()
 
+    def snapshot(self):
+        root, nodes = self.value()
+        return root, tuple(nodes)
+
+    def applySnapshot(self, state) -> bool:
+        root, nodes = state
+        if root is None or state == self.snapshot():
+            return False
+
+        self._restoreTo(root, nodes)
+
+        return False
+
     def restore(self):
+        self._restoreTo(self._root, self._nodes)
+
+    def _restoreTo(self, cached_root, cached_nodes):
         root, nodes = self.value()
 
-        if root != self._root:
-            Application.getInstance().getController().getScene().setRoot(self._root)
+        if root != cached_root:
+            Application.getInstance().getController().getScene().setRoot(cached_root)
 
-        for n in self._nodes:
-            if n in nodes:
+        # Nodes which Smart Slice added or removed are not part of the user's setup
+        for n in cached_nodes:
+            if n in nodes or n.getDecorator(SmartSliceRemovedDecorator):
                 continue
 
-            self._root.addChild(n)
+            cached_root.addChild(n)
 
         for n in nodes:
-            if n in self._nodes:
+            if n in cached_nodes or n.getDecorator(SmartSliceAddedDecorator):
                 continue
 
-            self._root.removeChild(n)
+            cached_root.removeChild(n)
 
     def changed(self):
         if not self._root:
@@ -400,12 +572,39 @@ class ToolProperty(TrackedProperty):
     def restore(self):
         getattr(self._tool, 'set' + self._property)(self._cached_value)
 
+    def applySnapshot(self, state) -> bool:
+        if state != self.value():
+            getattr(self._tool, 'set' + self._property)(state)
+        return False
+
     def changed(self) -> bool:
         return self._cached_value != self.value()
 
 
+class FaceState(namedtuple('FaceState', ['face', 'surface_type', 'axis', 'selection'])):
+    """
+    Snapshot of a highlight face. The face's triangle ids are compared by value.
+    """
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return isinstance(other, FaceState) and \
+            numpy.array_equal(self.face.ids, other.face.ids) and \
+            tuple(self[1:]) == tuple(other[1:])
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+
+LoadFaceState = namedtuple('LoadFaceState', ['face', 'direction', 'pull', 'direction_type', 'magnitude'])
+
+
 class SmartSliceFace(TrackedProperty):
 
+    versioned = True
+
     class Properties:
 
         def __init__(self):
@@ -427,11 +626,12 @@ class SmartSliceFace(TrackedProperty):
         self._properties.surface_type = highlight_face.surface_type
         self._properties.axis = highlight_face.axis
         self._properties.selection = highlight_face.selection
+        self.markCached()
 
     def changed(self) -> bool:
         highlight_face = self.value()
 
-        return highlight_face.getTriangles() != self._properties.tri_face.triangles or \
+        return not numpy.array_equal(highlight_face.face.ids, self._properties.tri_face.ids) or \
             highlight_face.axis != self._properties.axis or \
             highlight_face.surface_type != self._properties.surface_type or \
             highlight_face.selection != self._properties.selection
@@ -441,6 +641,22 @@ class SmartSliceFace(TrackedProperty):
         self.highlight_face.setMeshDataFromPywimTriangles(self._properties.tri_face, self._properties.axis)
         self.highlight_face.selection = self._properties.selection
 
+    def snapshot(self):
+        highlight_face = self.value()
+        return FaceState(highlight_face.face, highlight_face.surface_type, highlight_face.axis, highlight_face.selection)
+
+    def applySnapshot(self, state) -> bool:
+        highlight_face = self.value()
+
+        highlight_face.surface_type = state.surface_type
+        highlight_face.selection = state.selection
+
+        # Only rebuild the highlight mesh if the selected triangles moved
+        if not numpy.array_equal(highlight_face.face.ids, state.face.ids) or highlight_face.axis != state.axis:
+            highlight_face.setMeshDataFromPywimTriangles(state.face, state.axis)
+
+        return False
+
 class SmartSliceLoadFace(SmartSliceFace):
 
     class LoadFaceProperties(SmartSliceFace.Properties):
@@ -485,6 +701,41 @@ class SmartSliceLoadFace(SmartSliceFace):
         if not self.highlight_face.isVisible():
             self.highlight_face.disableTools()
 
+    def snapshot(self):
+        highlight_face = self.value()
+        force = highlight_face.force
+        return LoadFaceState(
+            super().snapshot(),
+            highlight_face.activeArrow.direction,
+            force.pull,
+            force.direction_type,
+            force.magnitude
+        )
+
+    def applySnapshot(self, state) -> bool:
+        highlight_face = self.value()
+        force = highlight_face.force
+
+        face_changed = state.face != super().snapshot()
+        load_changed = \
+            force.pull != state.pull or \
+            force.direction_type != state.direction_type or \
+            highlight_face.activeArrow.direction != state.direction
+
+        force.magnitude = state.magnitude
+        force.pull = state.pull
+        force.direction_type = state.direction_type
+
+        if face_changed:
+            super().applySnapshot(state.face)
+
+        if face_changed or load_changed:
+            highlight_face.setArrow(state.direction)
+            if not highlight_face.isVisible():
+                highlight_face.disableTools()
+
+        return False
+
 class SmartSliceSceneRoot(TrackedProperty):
     def __init__(self, root: Root = None):
         self._root = root
@@ -508,6 +759,25 @@ class SmartSliceSceneRoot(TrackedProperty):
 
         return False
 
+    def snapshot(self):
+        return tuple(self.value())
+
+    def applySnapshot(self, state) -> bool:
+        if self._root is None:
+            return False
+
+        faces = self.value()
+
+        for f in faces:
+            if f not in state:
+                self._root.removeChild(f)
+
+        for f in state:
+            if f not in faces:
+                self._root.addChild(f)
+
+        return False
+
     def restore(self):
         if self._root is None:
             return
@@ -523,3 +793,87 @@ class SmartSliceSceneRoot(TrackedProperty):
         for f in self._faces:
             if f not in faces:
                 self._root.addChild(f)
+
+class TrackedPropertyRegistry:
+    """
+    Collection of tracked properties with constant time lookup by name, by kind
+    (property class, including base classes), by highlight face and by scene node name.
+    Iteration follows the order the properties were added in.
+    """
+
+    def __init__(self, properties: List[TrackedProperty] = None):
+        self._properties = OrderedDict()   # id -> TrackedProperty
+        self._kinds = {}                   # type -> OrderedDict(id -> TrackedProperty)
+        self._names = {}                   # type -> {name: TrackedProperty}
+        self._faces = {}                   # id(HighlightFace) -> SmartSliceFace
+        self._scene_nodes = {}             # mesh name -> SceneNode
+
+        for prop in properties or []:
+            self.add(prop)
+
+    def __iter__(self):
+        return iter(list(self._properties.values()))
+
+    def __len__(self):
+        return len(self._properties)
+
+    def __contains__(self, prop):
+        return id(prop) in self._properties
+
+    def _kindsOf(self, prop):
+        return [k for k in type(prop).__mro__ if issubclass(k, TrackedProperty)]
+
+    def add(self, prop: TrackedProperty):
+        if prop in self:
+            return
+
+        self._properties[id(prop)] = prop
+
+        name = getattr(prop, 'name', None)
+
+        for kind in self._kindsOf(prop):
+            self._kinds.setdefault(kind, OrderedDict())[id(prop)] = prop
+            if name is not None:
+                self._names.setdefault(kind, {}).setdefault(name, prop)
+
+        if isinstance(prop, SmartSliceFace):
+            self._faces[id(prop.highlight_face)] = prop
+        elif isinstance(prop, SceneNode):
+            self._scene_nodes[prop.mesh_name] = prop
+
+    def remove(self, prop: TrackedProperty):
+        if prop not in self:
+            return
+
+        del self._properties[id(prop)]
+
+        name = getattr(prop, 'name', None)
+
+        for kind in self._kindsOf(prop):
+            self._kinds[kind].pop(id(prop), None)
+
+            if name is not None and self._names[kind].get(name) is prop:
+                del self._names[kind][name]
+
+                # Fall back to the next property with the same name, if any
+                for other in self._kinds[kind].values():
+                    if getattr(other, 'name', None) == name:
+                        self._names[kind][name] = other
+                        break
+
+        if isinstance(prop, SmartSliceFace):
+            self._faces.pop(id(prop.highlight_face), None)
+        elif isinstance(prop, SceneNode) and self._scene_nodes.get(prop.mesh_name) is prop:
+            del self._scene_nodes[prop.mesh_name]
+
+    def get(self, name: str, kind: type = TrackedProperty) -> Optional[TrackedProperty]:
+        return self._names.get(kind, {}).get(name)
+
+    def ofType(self, kind: type) -> List[TrackedProperty]:
+        return list(self._kinds.get(kind, {}).values())
+
+    def face(self, highlight_face: HighlightFace) -> Optional['SmartSliceFace']:
+        return self._faces.get(id(highlight_face))
+
+    def sceneNode(self, name: str) -> Optional[SceneNode]:
+        return self._scene_nodes.get(name)
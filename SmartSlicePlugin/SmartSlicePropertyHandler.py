@@ -4,7 +4,7 @@
 
 import time, threading
 
-from PyQt5.QtCore import QObject
+from PyQt5.QtCore import QObject, QTimer
 
 from UM.i18n import i18nCatalog
 from UM.Application import Application
@@ -20,11 +20,13 @@ from .SmartSliceDecorator import SmartSliceRemovedDecorator
 from .select_tool.SmartSliceSelectTool import SmartSliceSelectTool
 from .requirements_tool.SmartSliceRequirements import SmartSliceRequirements
 from .utils import getModifierMeshes, getPrintableNodes, getNodeActiveExtruder
-from .stage.SmartSliceScene import Root, HighlightFace, LoadFace
+from .stage.SmartSliceScene import Root, HighlightFace, LoadFace, Force
 
 from . import SmartSliceProperty
+from .SmartSliceSnapshot import SmartSliceSnapshot
+from .utils import SystemUtils
 
-import pywim
+pywim = SystemUtils.lazyImport("pywim")
 
 i18n_catalog = i18nCatalog("smartslice")
 
@@ -40,6 +42,10 @@ i18n_catalog = i18nCatalog("smartslice")
 """
 class SmartSlicePropertyHandler(QObject):
 
+    # Time in ms to wait for more property changes before checking them. With 0 the
+    # changes are checked on the next pass of the event loop.
+    coalesce_window_preference = "smartslice/property_change_coalesce_ms"
+
     def __init__(self, connector):
         super().__init__()
 
@@ -48,6 +54,18 @@ class SmartSlicePropertyHandler(QObject):
 
         controller = Application.getInstance().getController()
 
+        # Property changes are collected and confirmed once per burst of signals
+        self._pending_changes = {}          # Dict[bool, List[TrackedProperty]], keyed by revalidationRequired
+        self._pending_status_update = None  # show_warnings of a deferred status update, None if there is none
+
+        preferences = Application.getInstance().getPreferences()
+        preferences.addPreference(self.coalesce_window_preference, 0)
+
+        self._coalesce_timer = QTimer()
+        self._coalesce_timer.setSingleShot(True)
+        self._coalesce_timer.setInterval(int(preferences.getValue(self.coalesce_window_preference)))
+        self._coalesce_timer.timeout.connect(self._processPendingChanges)
+
         self._global_properties = SmartSliceProperty.GlobalProperty.CreateAll()
         self._extruder_properties = SmartSliceProperty.ExtruderProperty.CreateAll()
         self._selected_material = SmartSliceProperty.SelectedMaterial()
@@ -68,7 +86,7 @@ class SmartSlicePropertyHandler(QObject):
             SmartSliceProperty.ToolProperty(req_tool, "MaxDisplacement")
         ]
 
-        self._properties = \
+        self._properties = SmartSliceProperty.TrackedPropertyRegistry(
             self._global_properties + \
             self._extruder_properties + \
             self._req_tool_properties + \
@@ -80,9 +98,13 @@ class SmartSlicePropertyHandler(QObject):
                 self._quality_group,
                 self._active_extruder
             ]
+        )
 
         self._propertiesChanged = []
 
+        # Accepted state of the setup, which is what cancelling restores
+        self._snapshot = None  # SmartSliceSnapshot
+
         self._activeMachineManager = CuraApplication.getInstance().getMachineManager()
         self._activeMachineManager.printerConnectedStatusChanged.connect(self.printerCheck)
         self._activeMachineManager.globalContainerChanged.connect(self._onQualityGroupChanged)
@@ -94,6 +116,8 @@ class SmartSlicePropertyHandler(QObject):
         Root.rootChanged.connect(self._onRootChanged)
 
         HighlightFace.facePropertyChanged.connect(self._faceChanged)
+        HighlightFace.surfaceTypeChanged.connect(self._touchFaces)
+        Force.loadChanged.connect(self._touchFaces)
 
         sel_tool.selectedFaceChanged.connect(self._faceChanged)
         sel_tool.toolPropertyChanged.connect(self._onSelectToolPropertyChanged)
@@ -127,21 +151,34 @@ class SmartSlicePropertyHandler(QObject):
         else:
             prop = SmartSliceProperty.SmartSliceFace(face)
 
-        prop.cache()
-        self._properties.append(prop)
+        self._properties.add(prop)
+        self._cacheProperties([prop])
         self.confirmPendingChanges(self._root)
 
     def _faceChanged(self, face):
-        for prop in self._properties:
-            if isinstance(prop, SmartSliceProperty.SmartSliceFace) and face == prop.highlight_face:
-                self.confirmPendingChanges(prop)
-                break
+        prop = self._properties.face(face)
+        if prop:
+            prop.touch()
+            self.confirmPendingChanges(prop)
+
+    def _touchFaces(self, *args):
+        for prop in self._properties.ofType(SmartSliceProperty.SmartSliceFace):
+            prop.touch()
+
+    def _touchContainerProperties(self):
+        """
+        Marks all container and scene node properties as possibly changed, for events
+        which replace whole containers rather than emitting per setting signals
+        """
+        for prop in self._properties.ofType(SmartSliceProperty.ContainerProperty):
+            prop.touch()
+        for prop in self._properties.ofType(SmartSliceProperty.SceneNode):
+            prop.touch()
 
     def _faceRemoved(self, face):
-        for prop in self._properties:
-            if isinstance(prop, SmartSliceProperty.SmartSliceFace) and face == prop.highlight_face:
-                self._properties.remove(prop)
-                break
+        prop = self._properties.face(face)
+        if prop:
+            self._properties.remove(prop)
         self.confirmPendingChanges(self._root)
 
     def _reset(self, *args):
@@ -157,29 +194,32 @@ class SmartSlicePropertyHandler(QObject):
             self._activeMachineManager.activeMaterialChanged.connect(self._onMaterialChanged)
 
     def jobCheck(self):
+        self.flushPendingChanges()
         show_warning = self._getMaterialGUID() not in self._material_warnings
         self.connector.updateStatus(show_warnings=show_warning)
 
     def buildSceneNode(self, node):
         scene_node = SmartSliceProperty.SceneNode(node, node.getName())
-        self._properties.append(scene_node)
+        self._properties.add(scene_node)
         Logger.log("d", "Tracking properties for {}".format(node.getName()))
         stack = node.callDecoration('getStack')
+        stack.propertyChanged.connect(scene_node.onStackPropertyChanged)
         stack.propertyChanged.connect(self._onSceneNodePropertyChanged)
+        node.transformationChanged.connect(scene_node.touch)
         node.parentChanged.connect(scene_node.parentChanged)
         node.parentChanged.connect(self.sceneNodeRemoved)
+        node.callDecoration("getActiveExtruderChangedSignal").connect(scene_node.touch)
         node.callDecoration("getActiveExtruderChangedSignal").connect(self._onSceneNodeChanged)
-        scene_node.cache()
+        self._cacheProperties([scene_node])
 
     def loadSceneNodes(self, root):
-        names = [p.mesh_name for p in self._properties if isinstance(p, SmartSliceProperty.SceneNode)]
         for node in getPrintableNodes() + getModifierMeshes():
-            if node.getName() not in names:
+            if self._properties.sceneNode(node.getName()) is None:
                 self.buildSceneNode(node)
 
     def sceneNodeRemoved(self, parent_node):
-        for property in self._properties:
-            if isinstance(property, SmartSliceProperty.SceneNode) and property.parent_changed:
+        for property in self._properties.ofType(SmartSliceProperty.SceneNode):
+            if property.parent_changed:
                 Logger.log("d", "Stopped tracking for {}".format(property.mesh_name))
                 self._properties.remove(property)
                 break
@@ -188,73 +228,127 @@ class SmartSlicePropertyHandler(QObject):
         for p in self._properties:
             p.cache()
 
+        self._snapshot = SmartSliceSnapshot.capture(self._properties, self._snapshot)
+
+    def captureSetup(self, previous: SmartSliceSnapshot = None) -> SmartSliceSnapshot:
+        """
+        Snapshot of the live state of all tracked properties, sharing the unchanged states with previous
+        """
+        return SmartSliceSnapshot.capture(self._properties, previous)
+
+    def _cacheProperties(self, props):
+        """
+        Caches a subset of the properties and records them in the current snapshot
+        """
+        for p in props:
+            p.cache()
+
+        if self._snapshot:
+            self._snapshot = self._snapshot.updated(props)
+
     def restoreCache(self):
         """
         Restores all cached values for properties upon user cancellation
         """
+        self._restoreSnapshot(self._snapshot)
 
-        for p in self._properties:
-            if p.changed():
-                p.restore()
-
+    def _restoreSnapshot(self, snapshot: SmartSliceSnapshot):
         self._addProperties = False
+
+        if snapshot:
+            settings_changed = snapshot.restore()
+        else:
+            settings_changed = True
+            for p in self._properties:
+                if p.hasChanged():
+                    p.restore()
+
+        # Faces which were removed and restored need to be tracked again
+        if snapshot:
+            highlight_faces = self._root.value()
+            for p in snapshot.properties():
+                if isinstance(p, SmartSliceProperty.SmartSliceFace) and p not in self._properties and \
+                        p.highlight_face in highlight_faces:
+                    self._properties.add(p)
+
         self._cleanRootCache()
-        self._activeMachineManager.forceUpdateAllSettings()
+
+        # Re-evaluate the setting tree once for all of the restored settings
+        if settings_changed:
+            self._activeMachineManager.forceUpdateAllSettings()
+
         self._addProperties = True
 
+        # Everything is back to the cached values, the changes from restoring don't need confirming
+        self._clearPendingChanges()
+
     def _cleanRootCache(self):
         """
         Cleans the cache for the Root children and their individual tracking
         """
         highlight_faces = self._root.value()
 
-        for prop in self._properties:
-            if isinstance(prop, SmartSliceProperty.SmartSliceFace) and prop.highlight_face not in highlight_faces:
+        for prop in self._properties.ofType(SmartSliceProperty.SmartSliceFace):
+            if prop.highlight_face not in highlight_faces:
                 self._properties.remove(prop)
 
-        self._root.cache()
+        self._cacheProperties([self._root])
 
     def getProperty(self, key, property_name, context = None):
-        for p in self._properties:
-            if p.name == key:
-                return p.value()
-        return None
+        p = self._properties.get(key)
+        return p.value() if p else None
 
     def getGlobalProperty(self, key):
-        for p in self._global_properties:
-            if p.name == key:
-                return p.value()
+        p = self._properties.get(key, SmartSliceProperty.GlobalProperty)
+        return p.value() if p else None
 
     def getExtruderProperty(self, key):
-        for p in self._extruder_properties:
-            if p.name == key:
-                return p.value()
+        p = self._properties.get(key, SmartSliceProperty.ExtruderProperty)
+        return p.value() if p else None
 
     def _onGlobalPropertyChanged(self, key: str, property_name: str):
-        self.confirmPendingChanges(
-            list(filter(lambda p: p.name == key, self._global_properties))
-        )
+        prop = self._properties.get(key, SmartSliceProperty.GlobalProperty)
+        if prop:
+            prop.touch()
+
+        # Node extruder assignments are read from the global stack
+        if key in SmartSliceProperty.ExtruderProperty.EXTRUDER_KEYS:
+            for scene_node in self._properties.ofType(SmartSliceProperty.SceneNode):
+                scene_node.touch()
+
+        self.confirmPendingChanges(prop)
 
     def _onExtruderPropertyChanged(self, key: str, property_name: str):
-        self.confirmPendingChanges(
-            list(filter(lambda p: p.name == key, self._extruder_properties))
-        )
+        prop = self._properties.get(key, SmartSliceProperty.ExtruderProperty)
+        if prop:
+            prop.touch()
+
+        self.confirmPendingChanges(prop)
 
     def _onQualityGroupChanged(self):
+        self._touchContainerProperties()
         self.confirmPendingChanges(self._quality_group)
 
     def _onActiveExtruderChanged(self):
+        self._touchContainerProperties()
         self.confirmPendingChanges(self._active_extruder)
 
     def _onMachineChanged(self):
+        # Extruder properties are read from the first extruder, which need not be the active one
         active_extruder_index = CuraApplication.getInstance().getExtruderManager().activeExtruderIndex
-        self._activeMachineManager.activeMachine.extruderList[active_extruder_index].propertyChanged.connect(self._onExtruderPropertyChanged)
+        extruder_list = self._activeMachineManager.activeMachine.extruderList
+        extruder_list[active_extruder_index].propertyChanged.connect(self._onExtruderPropertyChanged)
+        if active_extruder_index != 0 and len(extruder_list) > 0:
+            extruder_list[0].propertyChanged.connect(self._onExtruderPropertyChanged)
+
+        self._touchContainerProperties()
         self.confirmPendingChanges([self._active_extruder, self._selected_material, self._selected_material_variant])
 
         self._onActiveExtruderChanged()
         CuraApplication.getInstance().getExtruderManager().activeExtruderChanged.connect(self._onActiveExtruderChanged)
 
     def _onMaterialChanged(self):
+        self._touchContainerProperties()
         self.confirmPendingChanges([self._active_extruder, self._selected_material, self._selected_material_variant])
 
         # If we've spawned a cancellation from the event, don't update the status
@@ -264,7 +358,8 @@ class SmartSlicePropertyHandler(QObject):
         active_stage = CuraApplication.getInstance().getController().getActiveStage()
 
         if active_stage and active_stage.getPluginId() == self.connector.extension.getPluginId():
-            self.connector.updateStatus(show_warnings=True)
+            self._pending_status_update = True
+            self._coalesce_timer.start()
 
         # If we're not in the stage, remove the GUID from the list of warnings so we'll show it again
         else:
@@ -287,12 +382,10 @@ class SmartSlicePropertyHandler(QObject):
         if root is not None:
             self._root = SmartSliceProperty.SmartSliceSceneRoot(root)
 
-            for prop in self._properties:
-                if isinstance(prop, SmartSliceProperty.SmartSliceSceneRoot):
-                    self._properties.remove(prop)
-                    break
+            for prop in self._properties.ofType(SmartSliceProperty.SmartSliceSceneRoot):
+                self._properties.remove(prop)
 
-            self._properties.append(self._root)
+            self._properties.add(self._root)
             self._cleanRootCache()
 
     def _onSceneRootChanged(self, node=None):
@@ -301,20 +394,20 @@ class SmartSlicePropertyHandler(QObject):
 
     def _onSceneNodeChanged(self, node=None):
         self._scene.cacheSmartSliceNodes()
-        tracked_nodes = list(filter(lambda p: isinstance(p, SmartSliceProperty.SceneNode), self._properties))
+        tracked_nodes = self._properties.ofType(SmartSliceProperty.SceneNode)
         self.confirmPendingChanges(tracked_nodes + [self._scene])
 
     def _onSceneNodePropertyChanged(self, key=None, property_name=None):
-        if key not in SmartSliceProperty.ExtruderProperty.NAMES:
+        if self._properties.get(key, SmartSliceProperty.ExtruderProperty) is None:
             return
 
         self.confirmPendingChanges(
-            list(filter(lambda p: isinstance(p, SmartSliceProperty.SceneNode), self._properties))
+            self._properties.ofType(SmartSliceProperty.SceneNode)
         )
 
     def _onSelectToolPropertyChanged(self, property_name):
         self.confirmPendingChanges(
-            list(filter(lambda p: p.name == property_name, self._sel_tool_properties))
+            self._properties.get(property_name, SmartSliceProperty.ToolProperty)
         )
 
     def _onRequirementToolPropertyChanged(self, property_name):
@@ -322,33 +415,71 @@ class SmartSlicePropertyHandler(QObject):
         # status. We only need to ask for confirmation if the model is optimizing or has been optimized
         if self.connector.status in { SmartSliceCloudStatus.Underdimensioned, SmartSliceCloudStatus.Overdimensioned }:
             self.connector.prepareOptimization()
-            for p in self._req_tool_properties:
-                p.cache()
+            self._cacheProperties(self._req_tool_properties)
 
         # Optimizing or optimized, confirm the changes
         elif self.connector.status == SmartSliceCloudStatus.Optimized or \
             (self.connector.status in SmartSliceCloudStatus.busy() and self.connector.cloudJob and self.connector.cloudJob.job_type == pywim.smartslice.job.JobType.optimization):
             self.confirmPendingChanges(
-                list(filter(lambda p: p.name == property_name, self._req_tool_properties)),
+                self._properties.get(property_name, SmartSliceProperty.ToolProperty),
                 revalidationRequired=False
             )
 
         # Busy validating or nothing - just cache the values directly
         else:
-            for p in self._req_tool_properties:
-                p.cache()
+            self._cacheProperties(self._req_tool_properties)
 
         self.connector._proxy.targetSafetyFactorChanged.emit()
         self.connector._proxy.targetMaximalDisplacementChanged.emit()
 
     def confirmPendingChanges(self, props, revalidationRequired=True):
+        """
+        Queues the properties to be checked for changes. All properties queued within
+        the coalescing window are checked, confirmed and re-validated together.
+        """
         if not props:
             return
 
         if isinstance(props, SmartSliceProperty.TrackedProperty):
             props = [props]
 
-        changes = [p.changed() for p in props]
+        pending = self._pending_changes.setdefault(revalidationRequired, [])
+        for p in props:
+            if not any(p is q for q in pending):
+                pending.append(p)
+
+        self._coalesce_timer.start()
+
+    def flushPendingChanges(self):
+        """
+        Immediately processes any queued property changes
+        """
+        if self._coalesce_timer.isActive():
+            self._coalesce_timer.stop()
+            self._processPendingChanges()
+
+    def _clearPendingChanges(self):
+        self._coalesce_timer.stop()
+        self._pending_changes.clear()
+        self._pending_status_update = None
+
+    def _processPendingChanges(self):
+        pending = self._pending_changes
+        show_warnings = self._pending_status_update
+
+        self._pending_changes = {}
+        self._pending_status_update = None
+
+        # Changes that require re-validation take precedence
+        for revalidationRequired in (True, False):
+            if revalidationRequired in pending:
+                self._confirmChanges(pending[revalidationRequired], revalidationRequired)
+
+        if show_warnings is not None and not (self._confirmDialog and self._confirmDialog.visible):
+            self.connector.updateStatus(show_warnings=show_warnings)
+
+    def _confirmChanges(self, props, revalidationRequired=True):
+        changes = [p.hasChanged() for p in props]
 
         if not any(changes):
             return
@@ -359,8 +490,7 @@ class SmartSlicePropertyHandler(QObject):
         else:
             self.connector.status = SmartSliceCloudStatus.Cancelling
             self.connector.updateStatus()
-            for p in props:
-                p.cache()
+            self._cacheProperties(props)
 
     def showConfirmDialog(self, revalidationRequired : bool):
         if (self._confirmDialog and self._confirmDialog.visible) or self.connector.cloudJob is None:
@@ -482,4 +612,5 @@ class SmartSlicePropertyHandler(QObject):
 
     def resetProperties(self):
         self.cacheChanges()
+        self._clearPendingChanges()
         self._propertiesChanged.clear()
@@ -0,0 +1,254 @@
+#
+#  Compact binary encoding of Smart Slice results for saved workspaces
+#
+
+import base64
+import json
+import struct
+import zlib
+
+from typing import List
+
+import numpy
+
+from .stage.ui.ResultTable import LazyAnalyses
+from .utils import SystemUtils
+
+pywim = SystemUtils.lazyImport("pywim")
+
+"""
+  Encoded results
+    The workspace metadata is written as JSON, so the encoding is a base64 string of
+
+        magic (4 bytes) | version (uint16) | zlib compressed body
+
+    and the body is
+
+        metadata length (uint32) | metadata (JSON) | summaries | vertices | triangles | analyses
+
+    The metadata holds the result without its analyses and the location of every
+    section. Summaries are the float64 (analyses x 4) table shown in the results
+    table, vertices and triangles are the modifier meshes of all analyses packed
+    into float32 and int32 (n x 3) arrays, and analyses are the JSON encoded
+    analyses with their modifier mesh geometry taken out.
+
+    Reading only decompresses the body and parses the metadata. Analyses are
+    parsed when they are accessed, with their mesh geometry read from the arrays.
+"""
+
+MAGIC = b"SSRB"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sH")
+_LENGTH = struct.Struct("<I")
+
+_VERTEX_KEYS = ("x", "y", "z")
+_TRIANGLE_KEYS = ("v1", "v2", "v3")
+
+
+class PackedResults:
+    """
+    The analyses of an encoded result, a source for LazyAnalyses
+    """
+
+    def __init__(self, data: str):
+        self.data = data
+
+        raw = base64.b64decode(data)
+        if len(raw) < _HEADER.size:
+            raise ValueError("The data is not an encoded Smart Slice result")
+
+        magic, version = _HEADER.unpack_from(raw)
+        if magic != MAGIC:
+            raise ValueError("The data is not an encoded Smart Slice result")
+        if version > VERSION:
+            raise ValueError("Smart Slice result encoding version {} is not supported".format(version))
+
+        try:
+            body = zlib.decompress(raw[_HEADER.size:])
+        except zlib.error as exc:
+            raise ValueError("The encoded Smart Slice result is corrupt: {}".format(exc))
+
+        metadata_length, = _LENGTH.unpack_from(body)
+        start = _LENGTH.size + metadata_length
+
+        self._metadata = json.loads(body[_LENGTH.size:start].decode("utf-8"))
+        self._body = body
+        self._start = start
+
+        sections = self._metadata["sections"]
+        count = self._metadata["count"]
+
+        self._summaries = self._array(sections["summaries"], numpy.float64).reshape(count, 4)
+        self._vertices = self._array(sections["vertices"], numpy.float32).reshape(-1, 3)
+        self._triangles = self._array(sections["triangles"], numpy.int32).reshape(-1, 3)
+
+    def _array(self, section, dtype) -> numpy.ndarray:
+        offset, length = section
+        return numpy.frombuffer(self._body, dtype=dtype, count=length // numpy.dtype(dtype).itemsize, offset=self._start + offset)
+
+    def __len__(self):
+        return self._metadata["count"]
+
+    def summaries(self) -> numpy.ndarray:
+        return self._summaries
+
+    def resultDict(self) -> dict:
+        return dict(self._metadata["result"])
+
+    def analysisDict(self, index: int) -> dict:
+        offset, length = self._metadata["analyses"][index]
+        begin = self._start + offset
+
+        data = json.loads(self._body[begin:begin + length].decode("utf-8"))
+
+        for mesh, packed in zip(data.get("modifier_meshes") or [], self._metadata["meshes"][index]):
+            if packed is None:
+                continue
+
+            vertex_offset, vertex_count, triangle_offset, triangle_count, vertex_form, triangle_form = packed
+
+            mesh["vertices"] = _unpackRecords(
+                self._vertices[vertex_offset:vertex_offset + vertex_count], _VERTEX_KEYS, vertex_form
+            )
+            mesh["triangles"] = _unpackRecords(
+                self._triangles[triangle_offset:triangle_offset + triangle_count], _TRIANGLE_KEYS, triangle_form
+            )
+
+        return data
+
+
+def encodeResult(result: 'pywim.smartslice.result.Result') -> str:
+    analyses = result.analyses
+
+    # Results read from a workspace are saved again as they were read
+    if isinstance(analyses, LazyAnalyses) and isinstance(analyses.source, PackedResults):
+        return analyses.source.data
+
+    if not isinstance(analyses, LazyAnalyses):
+        analyses = LazyAnalyses(analyses)
+
+    result_dict = LazyAnalyses.encodeResult(result)
+    result_dict["analyses"] = []
+
+    vertices = []       # List[numpy.ndarray]
+    triangles = []      # List[numpy.ndarray]
+    vertex_count = 0
+    triangle_count = 0
+
+    blobs = []          # List[bytes]
+    meshes = []         # List[List[list]], packed mesh locations of each analysis
+
+    for index in range(len(analyses)):
+        data = dict(analyses.toDict(index))
+
+        packed_meshes = []
+        modifier_meshes = []
+
+        for mesh in data.get("modifier_meshes") or []:
+            mesh_vertices, vertex_form = _packRecords(mesh.get("vertices"), _VERTEX_KEYS, numpy.float32)
+            mesh_triangles, triangle_form = _packRecords(mesh.get("triangles"), _TRIANGLE_KEYS, numpy.int32)
+
+            # Geometry in a form we don't know is left in the JSON
+            if mesh_vertices is None or mesh_triangles is None:
+                modifier_meshes.append(mesh)
+                packed_meshes.append(None)
+                continue
+
+            modifier_meshes.append(dict(mesh, vertices=[], triangles=[]))
+            packed_meshes.append([
+                vertex_count, len(mesh_vertices), triangle_count, len(mesh_triangles), vertex_form, triangle_form
+            ])
+
+            vertices.append(mesh_vertices)
+            triangles.append(mesh_triangles)
+            vertex_count += len(mesh_vertices)
+            triangle_count += len(mesh_triangles)
+
+        if "modifier_meshes" in data:
+            data["modifier_meshes"] = modifier_meshes
+
+        blobs.append(json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        meshes.append(packed_meshes)
+
+    summaries = analyses.summaries().astype(numpy.float64).tobytes()
+    vertex_bytes = _concatenate(vertices, numpy.float32).tobytes()
+    triangle_bytes = _concatenate(triangles, numpy.int32).tobytes()
+
+    sections = {}
+    offset = 0
+    for name, section in (("summaries", summaries), ("vertices", vertex_bytes), ("triangles", triangle_bytes)):
+        sections[name] = [offset, len(section)]
+        offset += len(section)
+
+    analysis_locations = []
+    for blob in blobs:
+        analysis_locations.append([offset, len(blob)])
+        offset += len(blob)
+
+    metadata = json.dumps({
+        "result": result_dict,
+        "count": len(analyses),
+        "sections": sections,
+        "analyses": analysis_locations,
+        "meshes": meshes
+    }, separators=(",", ":")).encode("utf-8")
+
+    body = b"".join([_LENGTH.pack(len(metadata)), metadata, summaries, vertex_bytes, triangle_bytes] + blobs)
+
+    raw = _HEADER.pack(MAGIC, VERSION) + zlib.compress(body)
+
+    return base64.b64encode(raw).decode("ascii")
+
+
+def decodeResult(data: str) -> 'pywim.smartslice.result.Result':
+    """
+    Reads an encoded result, leaving the analyses encoded until they are accessed
+    """
+    packed = PackedResults(data)
+
+    result_dict = packed.resultDict()
+    result_dict["analyses"] = []
+
+    result = pywim.smartslice.result.Result.from_dict(result_dict)
+    result.analyses = LazyAnalyses(source=packed)
+
+    return result
+
+
+def _packRecords(records, keys, dtype):
+    """
+    (n x 3) array of a list of {key: value} dicts or of 3 element lists, and the form
+    they were in. (None, None) if the records are in neither form.
+    """
+    if not records:
+        return numpy.zeros((0, 3), dtype=dtype), "list"
+
+    if isinstance(records[0], dict):
+        key_set = set(keys)
+        if not all(isinstance(r, dict) and r.keys() == key_set for r in records):
+            return None, None
+        values = [r[k] for r in records for k in keys]
+        form = "dict"
+    elif isinstance(records[0], (list, tuple)):
+        if not all(isinstance(r, (list, tuple)) and len(r) == 3 for r in records):
+            return None, None
+        values = [v for r in records for v in r]
+        form = "list"
+    else:
+        return None, None
+
+    return numpy.array(values, dtype=dtype).reshape(-1, 3), form
+
+
+def _unpackRecords(array: numpy.ndarray, keys, form: str) -> List:
+    rows = array.tolist()
+    if form == "dict":
+        return [dict(zip(keys, row)) for row in rows]
+    return rows
+
+
+def _concatenate(arrays: List[numpy.ndarray], dtype) -> numpy.ndarray:
+    if len(arrays) == 0:
+        return numpy.zeros((0, 3), dtype=dtype)
+    return numpy.concatenate(arrays).astype(dtype, copy=False)
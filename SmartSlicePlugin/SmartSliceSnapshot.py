@@ -0,0 +1,84 @@
+#
+#  Immutable snapshots of the Smart Slice setup, used for cancelling changes
+#
+
+from typing import Iterable, List, Optional
+
+from .SmartSliceProperty import TrackedProperty, SmartSliceSceneRoot
+
+"""
+  SmartSliceSnapshot
+    The state of every tracked property (settings, per object settings, transforms,
+      faces and loads, requirements) at one point in time.
+
+    Snapshots are never modified. A new snapshot taken from a previous one shares the
+      states of all properties which did not change, so comparing it with a saved
+      snapshot only needs to look at what actually changed.
+"""
+class SmartSliceSnapshot:
+
+    __slots__ = ('_states', '_index')
+
+    def __init__(self, states):
+        self._states = tuple(states)  # Tuple[(TrackedProperty, state)]
+        self._index = { id(p): i for i, (p, s) in enumerate(self._states) }
+
+    @classmethod
+    def capture(cls, properties: Iterable[TrackedProperty], previous: 'SmartSliceSnapshot' = None) -> 'SmartSliceSnapshot':
+        return cls(cls._shared(properties, previous))
+
+    @staticmethod
+    def _shared(properties: Iterable[TrackedProperty], previous: Optional['SmartSliceSnapshot']):
+        for p in properties:
+            state = p.snapshot()
+            old = previous.state(p) if previous else None
+            yield p, old if old is not None and old == state else state
+
+    def __len__(self):
+        return len(self._states)
+
+    def state(self, prop: TrackedProperty):
+        i = self._index.get(id(prop))
+        return self._states[i][1] if i is not None else None
+
+    def updated(self, properties: Iterable[TrackedProperty]) -> 'SmartSliceSnapshot':
+        """
+        Returns a new snapshot with the states of the given properties re-captured
+        """
+        updates = dict((id(p), (p, s)) for p, s in self._shared(properties, self))
+
+        states = []
+        for p, s in self._states:
+            states.append(updates.pop(id(p), (p, s)))
+
+        # Properties which were not tracked when the snapshot was taken
+        states.extend(updates.values())
+
+        return SmartSliceSnapshot(states)
+
+    def properties(self) -> List[TrackedProperty]:
+        return [p for p, s in self._states]
+
+    def sharesAllStates(self, other: 'SmartSliceSnapshot') -> bool:
+        """
+        True if both snapshots hold the same properties with the same state objects
+        """
+        return other is not None and len(self) == len(other) and \
+            all(other.state(p) is s for p, s in self._states)
+
+    def restore(self) -> bool:
+        """
+        Applies the difference between the snapshot and the live state in one pass.
+        Returns True if any Cura setting was changed, in which case the caller needs
+        to re-evaluate the settings once.
+        """
+        settings_changed = False
+
+        # The face set comes first so the faces it re-adds can be restored too
+        ordered = sorted(self._states, key=lambda ps: not isinstance(ps[0], SmartSliceSceneRoot))
+
+        for p, state in ordered:
+            settings_changed = p.applySnapshot(state) or settings_changed
+
+        return settings_changed
+
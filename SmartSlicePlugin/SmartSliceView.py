@@ -10,6 +10,7 @@ from cura.BuildVolume import BuildVolume
 from cura.Scene.ConvexHullNode import ConvexHullNode
 
 import math
+import weakref
 
 
 class SmartSliceView(View):
@@ -19,6 +20,11 @@ class SmartSliceView(View):
         self._non_printing_shader = None
         self._theme = None
 
+        # (node, queueNode arguments) of every node, rebuilt when the scene nodes or a setting change
+        self._render_queue = None # List[Tuple[SceneNode, dict]]
+        self._root = None
+        self._watched_stacks = weakref.WeakSet()
+
     def _checkSetup(self):
         if not self._shader:
             self._shader = OpenGL.getInstance().createShaderProgram(Resources.getPath(Resources.Shaders, "overhang.shader"))
@@ -31,38 +37,86 @@ class SmartSliceView(View):
             self._non_printing_shader.setUniformValue("u_diffuseColor", Color(*self._theme.getColor("model_non_printing").getRgb()))
             self._non_printing_shader.setUniformValue("u_opacity", 0.6)
 
+            # Camera moves and transformations do not change how the nodes are rendered
+            self.getController().getScene().rootChanged.connect(self._onRootChanged)
+            self._onRootChanged()
+            Application.getInstance().globalContainerStackChanged.connect(self._invalidateRenderQueue)
+
+    def _onRootChanged(self):
+        root = self.getController().getScene().getRoot()
+        if root is not self._root:
+            if self._root is not None:
+                self._root.childrenChanged.disconnect(self._invalidateRenderQueue)
+                self._root.meshDataChanged.disconnect(self._invalidateRenderQueue)
+            self._root = root
+            # Both signals are forwarded from all nodes below the root
+            root.childrenChanged.connect(self._invalidateRenderQueue)
+            root.meshDataChanged.connect(self._invalidateRenderQueue)
+
+        self._invalidateRenderQueue()
+
+    def _invalidateRenderQueue(self, *args):
+        self._render_queue = None
+
+    def _watchStack(self, stack):
+        if stack is not None and stack not in self._watched_stacks:
+            stack.propertyChanged.connect(self._invalidateRenderQueue)
+            stack.containersChanged.connect(self._invalidateRenderQueue)
+            self._watched_stacks.add(stack)
+
+    def _classify(self, node):
+        """
+        How a node which does not render itself is queued, as keyword arguments for queueNode,
+        or None if it is not rendered by the view
+        """
+        if not node.getMeshData() or node.callDecoration("getLayerData"):
+            return None
+
+        uniforms = {}
+        overlay = False
+
+        if hasattr(node, "color"):
+            uniforms["diffuse_color"] = node.color
+            overlay = True
+
+        per_mesh_stack = node.callDecoration("getStack")
+        self._watchStack(per_mesh_stack)
+
+        if node.callDecoration("isNonPrintingMesh"):
+            uniforms["diffuse_color"] = [.55, .69, .1, 1]
+            uniforms["hover_face"] = -1
+            return { "shader": self._non_printing_shader, "uniforms": uniforms, "transparent": True }
+        elif per_mesh_stack and per_mesh_stack.getProperty("support_mesh", "value"):
+            return None
+        elif overlay:
+            return { "shader": self._shader, "uniforms": uniforms, "overlay": True }
+
+        return { "shader": self._shader, "uniforms": uniforms }
+
+    def _buildRenderQueue(self, scene):
+        render_queue = []
+
+        for node in DepthFirstIterator(scene.getRoot()):
+            if isinstance(node, (BuildVolume, ConvexHullNode, Platform)):
+                continue
+
+            render_queue.append((node, self._classify(node)))
+
+        return render_queue
+
     def beginRendering(self):
         scene = self.getController().getScene()
         renderer = self.getRenderer()
 
         self._checkSetup()
 
-        for node in DepthFirstIterator(scene.getRoot()):
-            if isinstance(node, (BuildVolume, ConvexHullNode, Platform)):
-                continue
+        # The nodes and how to render them only change with the scene or the settings
+        if self._render_queue is None:
+            self._render_queue = self._buildRenderQueue(scene)
 
-            uniforms = {}
-            overlay = False
-
-            if hasattr(node, "color"):
-                uniforms["diffuse_color"] = node.color
-                overlay = True
-
-            if not node.render(renderer):
-                if node.getMeshData() and node.isVisible() and not node.callDecoration("getLayerData"):
-                    per_mesh_stack = node.callDecoration("getStack")
-
-                    if node.callDecoration("isNonPrintingMesh"):
-                        uniforms["diffuse_color"] = [.55, .69, .1, 1]
-                        uniforms["hover_face"] = -1
-                        renderer.queueNode(node, shader=self._non_printing_shader, uniforms=uniforms, transparent=True)
-                    elif per_mesh_stack and per_mesh_stack.getProperty("support_mesh", "value"):
-                        pass
-                    else:
-                        if overlay:
-                            renderer.queueNode(node, shader = self._shader, uniforms = uniforms, overlay = True)
-                        else:
-                            renderer.queueNode(node, shader = self._shader, uniforms = uniforms)
+        for node, queue_arguments in self._render_queue:
+            if not node.render(renderer) and queue_arguments and node.isVisible():
+                renderer.queueNode(node, **queue_arguments)
 
     def endRendering(self):
         pass
@@ -1,5 +1,9 @@
 import os
 import sys
+import time
+
+# Time taken to load the plugin, logged once it is registered
+_load_start = time.perf_counter()
 
 from PyQt5.QtCore import QUrl
 from PyQt5.QtQml import qmlRegisterType
@@ -18,9 +22,6 @@ third_party_dir = os.path.join(third_party_dir, "3rd-party")
 if os.path.isdir(third_party_dir):
     SystemUtils.registerThirdPartyModules(third_party_dir)
 
-# Importing pywim for testing
-import pywim
-
 from . import SmartSliceExtension, SmartSliceView
 from .requirements_tool import SmartSliceRequirements
 from .select_tool import SmartSliceSelectTool, BoundaryConditionList
@@ -103,6 +104,9 @@ def register(app):
         "SmartSliceLogin"
     )
 
+    # pywim, threemf and the job handling are loaded on first use, see SmartSliceCloudConnector.prepareSmartSlice
+    SystemUtils.recordLoadTime("startup", time.perf_counter() - _load_start)
+
     return {
         "extension": extension,
         "stage": _stage,
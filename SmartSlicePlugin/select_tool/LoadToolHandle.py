@@ -1,12 +1,19 @@
 from typing import Optional
 
+import numpy
+
 from UM.Math.Color import Color
 from UM.Scene.ToolHandle import ToolHandle
 from UM.Mesh.MeshData import MeshData
 
+from ..utils.CompactMesh import CompactMesh
+
 class LoadToolHandle(ToolHandle):
     """Base for the Smart Slice Tool Handles"""
 
+    # The axis the selection meshes are drawn for, they all use the Y axis selection color
+    SELECTION_AXIS = ToolHandle.YAxis
+
     PADDING = 0
 
     ARROW_HEAD_LENGTH = 8
@@ -32,6 +39,10 @@ class LoadToolHandle(ToolHandle):
         self._auto_scale = False
         self._name = name
 
+        # Selection mesh as a CompactMesh for ray casts, and the mesh it was built from
+        self._hit_mesh = None         # CompactMesh
+        self._hit_mesh_source = None  # MeshData
+
     def setOutsideBuildArea(self, new_value: bool) -> None:
         pass
 
@@ -72,3 +83,29 @@ class LoadToolHandle(ToolHandle):
             return None
 
         return super().getSolidMesh()
+
+    def rayHit(self, origin, direction) -> Optional[float]:
+        """
+        Distance along a world space ray to the selection mesh, or None if the ray misses it.
+        This is used for hovering, so the selection pass does not need to be read back.
+        """
+        if not self._enabled:
+            return None
+
+        selection_mesh = self.getSelectionMesh()
+        if selection_mesh is None:
+            return None
+
+        if self._hit_mesh is None or self._hit_mesh_source is not selection_mesh:
+            self._hit_mesh = CompactMesh(selection_mesh.getVertices(), selection_mesh.getIndices())
+            self._hit_mesh_source = selection_mesh
+
+        transformation = self.getWorldTransformation().getData()
+        if not numpy.array_equal(self._hit_mesh.transformation, transformation):
+            self._hit_mesh.set_transformation(transformation)
+
+        hit = self._hit_mesh.ray_cast(origin, direction)
+        if hit is None:
+            return None
+
+        return float(numpy.linalg.norm(hit[1] - numpy.asarray(origin, dtype=numpy.float64)))
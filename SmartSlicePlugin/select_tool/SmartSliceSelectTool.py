@@ -1,10 +1,8 @@
-from typing import Tuple, List, cast
+from typing import Optional, Tuple, List, cast
 
 import numpy
 import time
 
-import pywim
-
 from PyQt5.QtCore import pyqtProperty
 
 from UM.i18n import i18nCatalog
@@ -26,8 +24,12 @@ from ..stage import SmartSliceScene
 from ..utils import getPrintableNodes
 from ..utils import findChildSceneNode
 from ..utils import angleBetweenVectors
+from ..utils.CompactMesh import CompactFace
+from ..utils import SystemUtils
 from .BoundaryConditionList import BoundaryConditionListModel
 
+pywim = SystemUtils.lazyImport("pywim")
+
 i18n_catalog = i18nCatalog("smartslice")
 
 
@@ -62,6 +64,7 @@ class SmartSliceSelectTool(Tool):
         self._rotating = False
         self._select = True
         self._selected_face = None
+        self._press_position = None
 
     toolPropertyChanged = Signal()
     selectedFaceChanged = Signal()
@@ -78,9 +81,10 @@ class SmartSliceSelectTool(Tool):
     def _onSelectionChanged(self):
         super()._onSelectionChanged()
 
-    def updateFromJob(self, job: pywim.smartslice.job.Job, callback):
+    def updateFromJob(self, job: 'pywim.smartslice.job.Job', callback, signatures: dict = None):
         """
-        When loading a saved smart slice job, get all associated smart slice selection data and load into scene
+        When loading a saved smart slice job, get all associated smart slice selection data and load into scene.
+        signatures are the saved face signatures, used to re-map the faces if the mesh has changed.
         """
         self._bc_list = None
 
@@ -95,10 +99,10 @@ class SmartSliceSelectTool(Tool):
         if smart_slice_node is None:
             # add smart slice scene to node
             smart_slice_node = SmartSliceScene.Root()
-            smart_slice_node.initialize(normal_mesh, step, callback)
+            smart_slice_node.initialize(normal_mesh, step, callback, signatures)
         else:
             smart_slice_node.clearFaces()
-            smart_slice_node.loadStep(step)
+            smart_slice_node.loadStep(step, signatures)
             smart_slice_node.setOrigin()
 
         controller = Application.getInstance().getController()
@@ -140,7 +144,7 @@ class SmartSliceSelectTool(Tool):
         self,
         current_surface : Tuple[SceneNode, int],
         surface_type : SmartSliceScene.HighlightFace.SurfaceType
-    ) -> Tuple[pywim.geom.tri.Face, pywim.geom.Vector]:
+    ) -> Tuple[CompactFace, 'pywim.geom.Vector']:
 
         if current_surface is None:
             current_surface = Selection.getSelectedFace()
@@ -157,6 +161,14 @@ class SmartSliceSelectTool(Tool):
         if interactive_mesh is None:
             return None, None
 
+        # The face id decoded from the selection pass can be off for thin or very small
+        # triangles - fall back to picking the triangle geometrically
+        if not 0 <= face_id < interactive_mesh.triangle_count and self._press_position:
+            picked = self.getTriangleAtPosition(*self._press_position)
+            if picked is None or picked[0] is not node:
+                return None, None
+            face_id = picked[1]
+
         if surface_type == SmartSliceScene.HighlightFace.SurfaceType.Flat:
             selected_face = interactive_mesh.select_planar_face(face_id)
         elif surface_type == SmartSliceScene.HighlightFace.SurfaceType.Concave:
@@ -172,6 +184,57 @@ class SmartSliceSelectTool(Tool):
 
         return selected_face, axis
 
+    def getTriangleAtPosition(self, x: float, y: float) -> Tuple[SceneNode, int]:
+        """
+        Casts a ray from the camera through the screen position and returns the
+        closest (node, triangle id) hit on an interactive mesh, or None
+        """
+        camera = self._controller.getScene().getActiveCamera()
+        if camera is None:
+            return None
+
+        ray = camera.getRay(x, y)
+
+        closest = None
+        closest_distance = None
+        for node in getPrintableNodes():
+            smart_slice_node = findChildSceneNode(node, SmartSliceScene.Root)
+            interactive_mesh = smart_slice_node.getInteractiveMesh() if smart_slice_node else None
+
+            if interactive_mesh is None:
+                continue
+
+            hit = interactive_mesh.ray_cast(ray.origin.getData(), ray.direction.getData())
+            if hit is None:
+                continue
+
+            distance = numpy.linalg.norm(hit[1] - ray.origin.getData())
+            if closest is None or distance < closest_distance:
+                closest = (node, hit[0])
+                closest_distance = distance
+
+        return closest
+
+    def getHandleAxisAtPosition(self, x: float, y: float, handles) -> Optional[int]:
+        """
+        Axis of the first load tool handle under the screen position, or None. The handles are
+        hit tested against a ray from the camera, which avoids re-rendering and reading back the
+        selection pass on every mouse move.
+        """
+        camera = self._controller.getScene().getActiveCamera()
+        if camera is None:
+            return None
+
+        ray = camera.getRay(x, y)
+        origin = ray.origin.getData()
+        direction = ray.direction.getData()
+
+        for handle in handles:
+            if handle.rayHit(origin, direction) is not None:
+                return handle.SELECTION_AXIS
+
+        return None
+
     def redraw(self):
         if not self.getEnabled():
             return
@@ -264,6 +327,9 @@ class SmartSliceSelectTool(Tool):
         if not self.getEnabled():
             return False
 
+        if event.type == Event.MousePressEvent:
+            self._press_position = (event.x, event.y)
+
         # Not a load face - make sure we render faces
         if not self._bc_list or not self._bc_list.getActiveNode() or isinstance(self._bc_list.getActiveNode(), SmartSliceScene.AnchorFace):
             self._changeRenderMode(faces=True)
@@ -279,15 +345,15 @@ class SmartSliceSelectTool(Tool):
             if MouseEvent.LeftButton not in event.buttons:
                 return False
 
-            pixel_color = self._selection_pass.getIdAtPosition(event.x, event.y)
+            axis = self.getHandleAxisAtPosition(event.x, event.y, (rotator, arrow))
 
             # We did not click the tool - we need to select the surface under it if it exists
-            # TODO - This is a little hacky.... we should implement a SelectionPass just for this Tool
-            if not pixel_color or not arrow.isAxis(pixel_color):
-                if Selection.hasSelection() and not Selection.getFaceSelectMode():
-                    self._changeRenderMode(faces=True)
-                    select_tool = PluginRegistry.getInstance().getPluginObject("SelectionTool")
-                    return select_tool.event(event)
+            if axis is None:
+                if not Selection.hasSelection():
+                    return False
+                self._changeRenderMode(faces=True)
+                select_tool = PluginRegistry.getInstance().getPluginObject("SelectionTool")
+                return select_tool.event(event)
 
             # Rotator isn't enabled - we don't need to do anything
             if not rotator.isEnabled():
@@ -295,7 +361,7 @@ class SmartSliceSelectTool(Tool):
 
             # If we made it here, we have clicked the tool. Set the locked color to our tool color, and set the plane
             # the user will be constrained to drag in
-            self.setLockedAxis(pixel_color)
+            self.setLockedAxis(axis)
             self.setDragPlane(Plane(rotator.rotation_axis))
 
             self.setDragStart(event.x, event.y)
@@ -312,18 +378,12 @@ class SmartSliceSelectTool(Tool):
             event = cast(MouseEvent, event)
 
             # Turn the shader on for the rotator and arrow if the mouse is hovered on them
-            # in the above, pixel_color is the color of the solid mesh of the pixekl the mouse is on
             # For some reason, "ActiveAxis" means the color of the tool we are interested in
             if not self._rotating:
-                self._changeRenderMode(faces=False)
-                pixel_color = self._selection_pass.getIdAtPosition(event.x, event.y)
-
-                if rotator.isAxis(pixel_color):
-                    rotator.setActiveAxis(pixel_color)
-                    arrow.setActiveAxis(pixel_color)
-                else:
-                    rotator.setActiveAxis(None)
-                    arrow.setActiveAxis(None)
+                axis = self.getHandleAxisAtPosition(event.x, event.y, (rotator, arrow))
+
+                rotator.setActiveAxis(axis)
+                arrow.setActiveAxis(axis)
 
                 return False
 
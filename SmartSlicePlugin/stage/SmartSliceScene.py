@@ -21,13 +21,17 @@ from UM.Application import Application
 from UM.i18n import i18nCatalog
 
 from ..utils import makeInteractiveMesh, getPrintableNodes, angleBetweenVectors
+from ..utils.CompactMesh import CompactFace, CompactMesh
+from ..utils import Tracing
+from ..utils import SystemUtils
 from ..select_tool.LoadArrow import LoadArrow
 from .. select_tool.LoadRotator import LoadRotator
 from .. select_tool.LoadToolHandle import LoadToolHandle
 
-import pywim
 import numpy
 
+pywim = SystemUtils.lazyImport("pywim")
+
 i18n_catalog = i18nCatalog("smartslice")
 
 class Force:
@@ -74,7 +78,7 @@ class Force:
             self._pull = value
             self.loadChanged.emit()
 
-    def setFromVectorAndAxis(self, load_vector: pywim.geom.Vector, axis: pywim.geom.Vector):
+    def setFromVectorAndAxis(self, load_vector: 'pywim.geom.Vector', axis: 'pywim.geom.Vector'):
         self.magnitude = round(load_vector.magnitude(), 2)
 
         if not axis:
@@ -105,7 +109,7 @@ class HighlightFace(SceneNode):
     def __init__(self, name: str = ""):
         super().__init__(name=name, visible=True)
 
-        self.face = pywim.geom.tri.Face()
+        self.face = CompactFace()
         self._surface_type = self.SurfaceType.Flat
         self.axis = None #pywim.geom.vector
         self.selection = None
@@ -137,39 +141,36 @@ class HighlightFace(SceneNode):
         pass
 
     def getTriangleIndices(self) -> List[int]:
-        return [t.id for t in self.face.triangles]
+        return self.face.ids.tolist()
 
     def getTriangles(self):
         return self.face.triangles
 
     def clearSelection(self):
-        self.face = pywim.geom.tri.Face()
+        self.face = CompactFace()
         self.axis = None
         super().setMeshData(None)
 
     def setMeshDataFromPywimTriangles(
-        self, face: pywim.geom.tri.Face,
-        axis: pywim.geom.Vector = None
+        self, face: CompactFace,
+        axis: 'pywim.geom.Vector' = None
     ):
 
-        if len(face.triangles) == 0:
+        if len(face) == 0:
             return
 
         self.face = face
         self.axis = axis
 
         mb = MeshBuilder()
-
-        for tri in self.face.triangles:
-            mb.addFace(tri.v1, tri.v2, tri.v3)
-
+        mb.setVertices(face.vertex_array())
         mb.calculateNormals()
 
         self.setMeshData(mb.build())
 
         self._setupTools()
 
-    def pywimBoundaryCondition(self, step: pywim.chop.model.Step, mesh_rotation: Matrix):
+    def pywimBoundaryCondition(self, step: 'pywim.chop.model.Step', mesh_rotation: Matrix):
         raise NotImplementedError()
 
     def enableTools(self):
@@ -181,13 +182,11 @@ class HighlightFace(SceneNode):
 class AnchorFace(HighlightFace):
     color = Color(1., 0.4, 0.4, 1.)
 
-    def pywimBoundaryCondition(self, step: pywim.chop.model.Step, mesh_rotation: Matrix):
+    def pywimBoundaryCondition(self, step: 'pywim.chop.model.Step', mesh_rotation: Matrix):
         # Create the fixed boundary conditions (anchor points)
         anchor = pywim.chop.model.FixedBoundaryCondition(name=self.getName())
 
         # Add the face Ids from the STL mesh that the user selected for this anchor
-        a = self.face.triangles
-        b = self.getTriangleIndices()
         anchor.face.extend(self.getTriangleIndices())
 
         Logger.log("d", "Smart Slice {} Triangles: {}".format(self.getName(), anchor.face))
@@ -197,8 +196,8 @@ class AnchorFace(HighlightFace):
         return anchor
 
     def setMeshDataFromPywimTriangles(
-        self, tris: List[pywim.geom.tri.Triangle],
-        axis: pywim.geom.Vector = None
+        self, tris: CompactFace,
+        axis: 'pywim.geom.Vector' = None
     ):
         axis = None
 
@@ -243,8 +242,8 @@ class LoadFace(HighlightFace):
             self.enableRotatorIfNeeded()
 
     def setMeshDataFromPywimTriangles(
-        self, tris: List[pywim.geom.tri.Triangle],
-        axis: pywim.geom.Vector = None
+        self, tris: CompactFace,
+        axis: 'pywim.geom.Vector' = None
     ):
 
         # If there is no axis, we don't know where to put the arrow, so we don't do anything
@@ -255,7 +254,7 @@ class LoadFace(HighlightFace):
 
         super().setMeshDataFromPywimTriangles(tris, axis)
 
-    def pywimBoundaryCondition(self, step: pywim.chop.model.Step, mesh_rotation: Matrix):
+    def pywimBoundaryCondition(self, step: 'pywim.chop.model.Step', mesh_rotation: Matrix):
 
         force = pywim.chop.model.Force(name=self.getName())
 
@@ -319,7 +318,7 @@ class LoadFace(HighlightFace):
             self.setToolParallelToAxis(center, rotation_axis)
 
     def enableTools(self):
-        if len(self.face.triangles) == 0:
+        if len(self.face) == 0:
             self.disableTools()
             return
 
@@ -358,7 +357,7 @@ class LoadFace(HighlightFace):
         self._rotator.setEnabled(False)
 
     def flipArrow(self):
-        if len(self.face.triangles) == 0:
+        if len(self.face) == 0:
             return
 
         self._arrows[self.force.pull].setEnabled(True)
@@ -424,7 +423,7 @@ class LoadFace(HighlightFace):
         self.inactiveArrow.setEnabled(False)
 
     def enableRotatorIfNeeded(self):
-        if len(self.face.triangles) > 0:
+        if len(self.face) > 0:
             if self.surface_type == HighlightFace.SurfaceType.Flat and self.force.direction_type is Force.DirectionType.Parallel:
                 self._rotator.setEnabled(True)
 
@@ -454,8 +453,9 @@ class Root(SceneNode):
     def isOutsideBuildArea(self) -> bool:
         return False
 
-    def initialize(self, parent: SceneNode, step=None, callback=None):
+    def initialize(self, parent: SceneNode, step=None, callback=None, signatures=None):
         parent.addChild(self)
+        parent.transformationChanged.connect(self._onParentTransformationChanged)
 
         mesh_data = parent.getMeshData()
 
@@ -463,14 +463,16 @@ class Root(SceneNode):
             Logger.log('d', 'Compute interactive mesh from SceneNode {}'.format(parent.getName()))
 
             if mesh_data.getVertexCount() < 1000:
-                self._interactive_mesh = makeInteractiveMesh(mesh_data)
+                with Tracing.span("mesh.analyze", vertices=mesh_data.getVertexCount(), triangles=mesh_data.getFaceCount()):
+                    self._interactive_mesh = makeInteractiveMesh(mesh_data)
+                self._onParentTransformationChanged()
                 if step:
-                    self.loadStep(step)
+                    self.loadStep(step, signatures)
                     self.setOrigin()
                 if callback:
                     callback()
             else:
-                job = AnalyzeMeshJob(mesh_data, step, callback)
+                job = AnalyzeMeshJob(mesh_data, step, callback, signatures)
                 job.finished.connect(self._process_mesh_analysis)
 
                 self._mesh_analyzing_message = Message(
@@ -489,6 +491,7 @@ class Root(SceneNode):
 
     def _process_mesh_analysis(self, job : "AnalyzeMeshJob"):
         self._interactive_mesh = job.interactive_mesh
+        self._onParentTransformationChanged()
         if self._mesh_analyzing_message:
             self._mesh_analyzing_message.hide()
 
@@ -503,14 +506,26 @@ class Root(SceneNode):
             ).show()
         else:
             if job.step:
-                self.loadStep(job.step)
+                self.loadStep(job.step, job.signatures)
                 self.setOrigin()
             if job.callback:
                 job.callback()
 
-    def getInteractiveMesh(self) -> pywim.geom.tri.Mesh:
+    def getInteractiveMesh(self) -> CompactMesh:
         return self._interactive_mesh
 
+    def _onParentTransformationChanged(self, node=None):
+        """
+        Keeps the interactive mesh in sync with the scale / rotation of the model. The mesh
+        topology, the selected faces and the boundary conditions are reused as they are
+        stored in the local coordinates of the model.
+        """
+        parent = self.getParent()
+        if self._interactive_mesh is None or parent is None:
+            return
+
+        self._interactive_mesh.set_transformation(parent.getWorldTransformation().getData())
+
     def addFace(self, bc):
         self.addChild(bc)
         self.faceAdded.emit(bc)
@@ -519,18 +534,45 @@ class Root(SceneNode):
         self.removeChild(bc)
         self.faceRemoved.emit(bc)
 
-    def loadStep(self, step):
+    def faceSignatures(self) -> dict:
+        """
+        Geometric signatures of the selected faces by boundary condition name, see CompactFace.signature
+        """
+        kinds = {
+            HighlightFace.SurfaceType.Flat: 'planar',
+            HighlightFace.SurfaceType.Concave: 'concave',
+            HighlightFace.SurfaceType.Convex: 'convex'
+        }
+
+        signatures = {}
+        for bc_node in DepthFirstIterator(self):
+            if isinstance(bc_node, HighlightFace) and len(bc_node.face) > 0:
+                signatures[bc_node.getName()] = bc_node.face.signature(kinds.get(bc_node.surface_type))
+
+        return signatures
+
+    def _faceFromBoundaryCondition(self, bc, signatures: dict) -> CompactFace:
+        signature = signatures.get(str(bc.name)) if signatures else None
+
+        selected_face = self._interactive_mesh.remap_face(bc.face, signature)
+
+        if len(selected_face) != len(bc.face) or not numpy.array_equal(selected_face.ids, sorted(bc.face)):
+            Logger.log("d", "Smart Slice {} re-mapped from {} to {} triangles".format(bc.name, len(bc.face), len(selected_face)))
+
+        return selected_face
+
+    def loadStep(self, step, signatures: dict = None):
         selected_node = Selection.getSelectedObject(0)
 
         for bc in step.boundary_conditions:
-            selected_face = self._interactive_mesh.face_from_ids(bc.face)
+            selected_face = self._faceFromBoundaryCondition(bc, signatures)
             face = AnchorFace(str(bc.name))
-            face.selection = (selected_node, bc.face[0])
+            face.selection = (selected_node, int(selected_face.ids[0])) if len(selected_face) > 0 else None
 
-            if len(selected_face.triangles) > 0:
+            axis = None
+            if len(selected_face) > 0:
                 face.surface_type = self._guessSurfaceTypeFromTriangles(selected_face)
 
-                axis = None
                 if face.surface_type == HighlightFace.SurfaceType.Flat:
                     axis = selected_face.planar_axis()
                 elif face.surface_type != face.SurfaceType.Unknown:
@@ -542,9 +584,9 @@ class Root(SceneNode):
             self.addFace(face)
 
         for bc in step.loads:
-            selected_face = self._interactive_mesh.face_from_ids(bc.face)
+            selected_face = self._faceFromBoundaryCondition(bc, signatures)
             face = LoadFace(str(bc.name))
-            face.selection = (selected_node, bc.face[0])
+            face.selection = (selected_node, int(selected_face.ids[0])) if len(selected_face) > 0 else None
 
             load_prime = Vector(
                 bc.force[0],
@@ -581,10 +623,10 @@ class Root(SceneNode):
                 origin[2]
             )
 
-            if len(selected_face.triangles) > 0:
+            axis = None
+            if len(selected_face) > 0:
                 face.surface_type = self._guessSurfaceTypeFromTriangles(selected_face)
 
-                axis = None
                 if face.surface_type == HighlightFace.SurfaceType.Flat:
                     axis = selected_face.planar_axis()
                 elif face.surface_type != face.SurfaceType.Unknown:
@@ -610,7 +652,7 @@ class Root(SceneNode):
             self.addFace(face)
             face.disableTools()
 
-    def createSteps(self) -> pywim.WimList:
+    def createSteps(self) -> 'pywim.WimList':
         steps = pywim.WimList(pywim.chop.model.Step)
 
         step = pywim.chop.model.Step(name='step-1')
@@ -642,19 +684,20 @@ class Root(SceneNode):
         camTool = controller.getCameraTool()
         camTool.setOrigin(self.getParent().getBoundingBox().center)
 
-    def _guessSurfaceTypeFromTriangles(self, face: pywim.geom.tri.Face) -> HighlightFace.SurfaceType:
+    def _guessSurfaceTypeFromTriangles(self, face: CompactFace) -> HighlightFace.SurfaceType:
         """
-            Attempts to determine the face type from a pywim face
+            Attempts to determine the face type from a compact mesh face
             Will return Unknown if it cannot determine the type
         """
-        triangle_list = list(face.triangles)
-        if not face.triangles:
+        if len(face) == 0:
             return HighlightFace.SurfaceType.Unknown
-        elif len(self._interactive_mesh.select_planar_face(triangle_list[0]).triangles) == len(face.triangles):
+
+        seed = int(face.ids[0])
+        if len(self._interactive_mesh.select_planar_face(seed)) == len(face):
             return HighlightFace.SurfaceType.Flat
-        elif len(self._interactive_mesh.select_concave_face(triangle_list[0]).triangles) == len(face.triangles):
+        elif len(self._interactive_mesh.select_concave_face(seed)) == len(face):
             return HighlightFace.SurfaceType.Concave
-        elif len(self._interactive_mesh.select_convex_face(triangle_list[0]).triangles) == len(face.triangles):
+        elif len(self._interactive_mesh.select_convex_face(seed)) == len(face):
             return HighlightFace.SurfaceType.Convex
 
         return HighlightFace.SurfaceType.Unknown
@@ -667,15 +710,19 @@ class Root(SceneNode):
 
 
 class AnalyzeMeshJob(Job):
-    def __init__(self, mesh_data, step, callback):
+    def __init__(self, mesh_data, step, callback, signatures=None):
         super().__init__()
         self.mesh_data = mesh_data
         self.step = step
         self.callback = callback
+        self.signatures = signatures
         self.interactive_mesh = None
 
     def run(self):
         # Sleep for a second to allow the UI to catch up (hopefully) and display the progress message
         time.sleep(1)
-        self.interactive_mesh = makeInteractiveMesh(self.mesh_data)
+
+        with Tracing.span("mesh.analyze") as span:
+            self.interactive_mesh = makeInteractiveMesh(self.mesh_data)
+            span.set(vertices=self.mesh_data.getVertexCount(), triangles=self.mesh_data.getFaceCount())
 
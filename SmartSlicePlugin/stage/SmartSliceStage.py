@@ -138,6 +138,7 @@ class SmartSliceStage(CuraStage):
 
         self._previous_view = controller.getActiveView().name
 
+        self._connector.prepareSmartSlice()
         self._connector.api_connection.openConnection()
 
         # When the Smart Slice stage is active we want to use our SmartSliceView
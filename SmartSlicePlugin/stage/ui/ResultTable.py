@@ -1,11 +1,14 @@
 import json
 import math
+import numpy
+import weakref
 
 from typing import Dict, List
+from collections.abc import Sequence
 from enum import Enum
 from datetime import time
 
-from PyQt5.QtCore import QAbstractListModel, QObject, QModelIndex
+from PyQt5.QtCore import QAbstractListModel, QObject, QModelIndex, QTimer
 from PyQt5.QtCore import pyqtProperty, pyqtSignal, pyqtSlot
 from PyQt5.QtCore import Qt
 from PyQt5.QtWidgets import QApplication
@@ -15,7 +18,9 @@ from UM.Signal import Signal
 from UM.Application import Application
 from UM.Qt.Duration import Duration
 
-import pywim
+from ...utils import SystemUtils
+
+pywim = SystemUtils.lazyImport("pywim")
 
 class ResultsTableHeader(Enum):
     Rank = 0
@@ -40,17 +45,421 @@ class ResultsTableHeader(Enum):
     def numRoles():
         return len(ResultsTableHeader.rolesAsBytes())
 
+class MaterialConstants:
+    """
+    Per extruder constants needed to turn a material volume into a length, weight
+    and cost. Reading them means parsing the material preferences and querying the
+    extruder stacks, so they are cached until the material, the filament diameter
+    or the preferences change.
+    """
+
+    _cached = None      # MaterialConstants
+    _connected = False
+    _watched_stacks = weakref.WeakSet()
+
+    def __init__(self, positions, densities, radii, weights_per_spool, costs_per_spool, names):
+        self.positions = numpy.array(positions, dtype=numpy.int64)
+        self.densities = numpy.array(densities, dtype=numpy.float64)
+        self.radii = numpy.array(radii, dtype=numpy.float64)
+        self.weights_per_spool = numpy.array(weights_per_spool, dtype=numpy.float64)
+        self.costs_per_spool = numpy.array(costs_per_spool, dtype=numpy.float64)
+        self.names = list(names)
+
+    @classmethod
+    def get(cls) -> 'MaterialConstants':
+        if cls._cached is None:
+            cls._connectSignals()
+            cls._cached = cls._read()
+        return cls._cached
+
+    @classmethod
+    def invalidate(cls, *args):
+        cls._cached = None
+
+    @classmethod
+    def _onPreferenceChanged(cls, preference: str):
+        if preference == "cura/material_settings":
+            cls.invalidate()
+
+    @classmethod
+    def _onExtruderPropertyChanged(cls, key: str, property_name: str):
+        if key == "material_diameter" and property_name == "value":
+            cls.invalidate()
+
+    @classmethod
+    def _watchStack(cls, stack):
+        if stack not in cls._watched_stacks:
+            stack.propertyChanged.connect(cls._onExtruderPropertyChanged)
+            stack.containersChanged.connect(cls.invalidate)
+            cls._watched_stacks.add(stack)
+
+    @classmethod
+    def _connectSignals(cls):
+        if cls._connected:
+            return
+
+        application = Application.getInstance()
+        application.getPreferences().preferenceChanged.connect(cls._onPreferenceChanged)
+        application.globalContainerStackChanged.connect(cls.invalidate)
+
+        machine_manager = application.getMachineManager()
+        machine_manager.activeMaterialChanged.connect(cls.invalidate)
+        machine_manager.activeVariantChanged.connect(cls.invalidate)
+
+        cls._connected = True
+
+    @classmethod
+    def _read(cls) -> 'MaterialConstants':
+        application = Application.getInstance()
+
+        global_stack = application.getGlobalContainerStack()
+        if global_stack is None:
+            return None
+
+        material_preference_values = json.loads(application.getPreferences().getValue("cura/material_settings"))
+
+        positions = []
+        densities = []
+        radii = []
+        weights_per_spool = []
+        costs_per_spool = []
+        names = []
+
+        for extruder_stack in global_stack.extruderList:
+            cls._watchStack(extruder_stack)
+
+            material = extruder_stack.material
+            material_guid = material.getMetaDataEntry("GUID")
+
+            weight_per_spool = 0.
+            cost_per_spool = 0.
+
+            if material_guid in material_preference_values:
+                material_values = material_preference_values[material_guid]
+
+                if material_values and "spool_weight" in material_values:
+                    weight_per_spool = float(material_values["spool_weight"])
+                else:
+                    weight_per_spool = float(extruder_stack.getMetaDataEntry("properties", {}).get("weight", 0))
+
+                cost_per_spool = float(material_values["spool_cost"] if material_values and "spool_cost" in material_values else 0)
+
+            positions.append(int(extruder_stack.position))
+            densities.append(float(extruder_stack.getMetaDataEntry("properties", {}).get("density", 0)))
+            radii.append(extruder_stack.getProperty("material_diameter", "value") / 2)
+            weights_per_spool.append(weight_per_spool)
+            costs_per_spool.append(cost_per_spool)
+            names.append(material.getName())
+
+        return cls(positions, densities, radii, weights_per_spool, costs_per_spool, names)
+
+    def compute(self, volumes: numpy.ndarray):
+        """
+        Lengths (m), weights (g) and costs of the material volumes (mm^3), given as an
+        (analyses x extruders) array. Only extruders with a column in volumes are
+        included, in the order of the extruder list. Returns three arrays shaped
+        (analyses x included extruders) and the names of the included materials.
+        """
+        volumes = numpy.asarray(volumes, dtype=numpy.float64).reshape(len(volumes), -1)
+
+        included = numpy.flatnonzero(self.positions < volumes.shape[1])
+        amounts = volumes[:, self.positions[included]]
+
+        densities = self.densities[included]
+        radii = self.radii[included]
+        weights_per_spool = self.weights_per_spool[included]
+        costs_per_spool = self.costs_per_spool[included]
+
+        weights = amounts * densities / 1000
+
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            costs = numpy.where(weights_per_spool != 0, costs_per_spool * weights / weights_per_spool, 0.)
+
+            # Material amount is sent as an amount of mm^3, so calculate length from that
+            lengths = numpy.where(radii != 0, numpy.round(amounts / (math.pi * radii ** 2) / 1000, 2), 0.)
+
+        return lengths, weights, costs, [self.names[i] for i in included]
+
+
+class LazyAnalyses(Sequence):
+    """
+    The analyses of a result, decoded from their dictionaries only when accessed.
+    The summary values shown in the results table are read straight from the
+    dictionaries, so loading a large result set doesn't decode the print config
+    and modifier meshes of every analysis. Decoded analyses and their encoded
+    dictionaries are both kept, so neither is computed more than once.
+
+    The analyses can also be read from a source, such as the packed results of a
+    saved workspace, which provides analysisDict(index), summaries() and __len__.
+
+    Only results read from a workspace are decoded lazily. Results from the API
+    arrive decoded by pywim, for those only the encoding for saving is cached.
+    """
+
+    def __init__(self, analyses=None, source=None):
+        self.source = source # Where the analyses are read from, if they weren't given
+
+        self._dicts = []     # List[dict], None until encoded
+        self._analyses = []  # List[pywim.smartslice.result.Analysis], None until decoded
+
+        if source is not None:
+            self._dicts = [None] * len(source)
+            self._analyses = [None] * len(source)
+
+        for a in analyses if analyses is not None else []:
+            is_dict = isinstance(a, dict)
+            self._dicts.append(a if is_dict else None)
+            self._analyses.append(None if is_dict else a)
+
+    def __len__(self):
+        return len(self._analyses)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        analysis = self._analyses[index]
+        if analysis is None:
+            analysis = pywim.smartslice.result.Analysis.from_dict(self._encoded(index))
+            self._analyses[index] = analysis
+
+        return analysis
+
+    def _encoded(self, index: int) -> dict:
+        data = self._dicts[index]
+        if data is None and self.source is not None:
+            data = self.source.analysisDict(index)
+        return data
+
+    def isDecoded(self, index: int) -> bool:
+        return self._analyses[index] is not None
+
+    def toDict(self, index: int) -> dict:
+        data = self._dicts[index]
+        if data is None:
+            data = self._analyses[index].to_dict() if self.source is None else self.source.analysisDict(index)
+            self._dicts[index] = data
+        return data
+
+    def toDicts(self) -> List[dict]:
+        return [self.toDict(i) for i in range(len(self))]
+
+    def summary(self, index: int):
+        """
+        (print time, minimum safety factor, maximum displacement, material volume of the first extruder)
+        """
+        analysis = self._analyses[index]
+        if analysis is not None:
+            return (
+                analysis.print_time,
+                analysis.structural.min_safety_factor,
+                analysis.structural.max_displacement,
+                analysis.extruders[0].material_volume
+            )
+
+        if self.source is not None and self._dicts[index] is None:
+            return tuple(self.source.summaries()[index].tolist())
+
+        data = self._dicts[index]
+        structural = data["structural"]
+        return (
+            data["print_time"],
+            structural["min_safety_factor"],
+            structural["max_displacement"],
+            data["extruders"][0]["material_volume"]
+        )
+
+    def summaries(self) -> numpy.ndarray:
+        """
+        The summaries of all analyses as an (analyses x 4) array
+        """
+        if self.source is not None:
+            return self.source.summaries()
+
+        return numpy.array(
+            [self.summary(i) for i in range(len(self))], dtype=numpy.float64
+        ).reshape(len(self), 4)
+
+    @staticmethod
+    def encodeResult(result: 'pywim.smartslice.result.Result') -> dict:
+        """
+        Result.to_dict(), re-using the dictionaries of analyses which were never decoded
+        """
+        analyses = result.analyses
+
+        result.analyses = []
+        try:
+            data = result.to_dict()
+        finally:
+            result.analyses = analyses
+
+        if isinstance(analyses, LazyAnalyses):
+            data["analyses"] = analyses.toDicts()
+        else:
+            data["analyses"] = [a.to_dict() for a in analyses]
+
+        return data
+
+    @staticmethod
+    def decodeResult(data: dict) -> 'pywim.smartslice.result.Result':
+        """
+        Result.from_dict(), leaving the analyses encoded until they are accessed
+        """
+        data = dict(data)
+        analyses = data.get("analyses") or []
+        data["analyses"] = []
+
+        result = pywim.smartslice.result.Result.from_dict(data)
+        result.analyses = LazyAnalyses(analyses)
+
+        return result
+
+
+class ResultStore:
+    """
+    Columnar store of the summary values of a set of analyses, one NumPy array per
+    ResultsTableHeader. The analyses themselves are kept as they are; all queries
+    return arrays of indices into them.
+    """
+
+    # Objectives which are better when larger, all others are minimized
+    MAXIMIZED = { ResultsTableHeader.Strength.value }
+
+    # Number of results compared at once when looking for dominated results
+    PARETO_CHUNK = 256
+
+    def __init__(self, analyses: List['pywim.smartslice.result.Analysis'] = None):
+        self.analyses = analyses if isinstance(analyses, LazyAnalyses) else LazyAnalyses(analyses)
+        self.columns = {} # Dict[int, numpy.ndarray], keyed by ResultsTableHeader value
+
+        count = len(self.analyses)
+
+        summaries = self.analyses.summaries()
+
+        self.columns[ResultsTableHeader.Rank.value] = numpy.arange(1, count + 1, dtype=numpy.int64)
+        self.columns[ResultsTableHeader.Time.value] = summaries[:, 0]
+        self.columns[ResultsTableHeader.Strength.value] = summaries[:, 1]
+        self.columns[ResultsTableHeader.Displacement.value] = summaries[:, 2]
+
+        lengths, weights, costs = ResultTableData.calculateMaterialInfo(summaries[:, 3])
+
+        self.columns[ResultsTableHeader.Length.value] = lengths
+        self.columns[ResultsTableHeader.Mass.value] = weights
+        self.columns[ResultsTableHeader.Cost.value] = costs
+
+    def __len__(self):
+        return len(self.analyses)
+
+    def value(self, index: int, column: int):
+        return self.columns[column][index].item()
+
+    def row(self, index: int) -> Dict[int, object]:
+        """
+        The summary values of one analysis, in the same form as ResultTableData.analysisToResultDict
+        """
+        return { column: values[index].item() for column, values in self.columns.items() }
+
+    def _indices(self, indices=None) -> numpy.ndarray:
+        if indices is None:
+            return numpy.arange(len(self), dtype=numpy.int64)
+        return numpy.asarray(indices, dtype=numpy.int64)
+
+    def where(self, column: int, minimum: float = None, maximum: float = None, indices=None) -> numpy.ndarray:
+        """
+        Indices of the results with minimum <= value <= maximum in the column
+        """
+        indices = self._indices(indices)
+        values = self.columns[column][indices]
+
+        keep = numpy.ones(len(indices), dtype=bool)
+        if minimum is not None:
+            keep &= values >= minimum
+        if maximum is not None:
+            keep &= values <= maximum
+
+        return indices[keep]
+
+    def order(self, column: int, descending: bool = False, indices=None) -> numpy.ndarray:
+        """
+        Indices sorted by the column. Ties keep their rank order.
+        """
+        indices = self._indices(indices)
+        values = self.columns[column][indices]
+        ranks = self.columns[ResultsTableHeader.Rank.value][indices]
+
+        return indices[numpy.lexsort((ranks, -values if descending else values))]
+
+    def topK(self, column: int, k: int, largest: bool = False, indices=None) -> numpy.ndarray:
+        """
+        Indices of the k best results in the column, best first
+        """
+        indices = self._indices(indices)
+
+        if k < len(indices):
+            values = self.columns[column][indices]
+            part = numpy.argpartition(-values if largest else values, k - 1)[:k]
+            indices = indices[part]
+
+        return self.order(column, largest, indices)
+
+    def paretoFront(self, objectives: List[int], indices=None) -> numpy.ndarray:
+        """
+        Indices of the results which are not dominated by any other result in the
+        given columns. Columns in MAXIMIZED are maximized, the others minimized.
+        """
+        indices = self._indices(indices)
+        if len(indices) == 0 or len(objectives) == 0:
+            return indices
+
+        values = numpy.column_stack([
+            -self.columns[c][indices] if c in self.MAXIMIZED else self.columns[c][indices] for c in objectives
+        ])
+
+        dominated = numpy.zeros(len(indices), dtype=bool)
+
+        for start in range(0, len(indices), self.PARETO_CHUNK):
+            block = values[start:start + self.PARETO_CHUNK, None, :]
+            no_worse = numpy.all(values[None, :, :] <= block, axis=2)
+            better = numpy.any(values[None, :, :] < block, axis=2)
+            dominated[start:start + self.PARETO_CHUNK] = numpy.any(no_worse & better, axis=1)
+
+        return indices[~dominated]
+
+
 class ResultTableData(QAbstractListModel):
 
     selectedRowChanged = pyqtSignal()
     sortColumnChanged = pyqtSignal()
     sortOrderChanged = pyqtSignal()
+    viewChanged = pyqtSignal()
+
+    # Objectives of the Pareto front view
+    PARETO_OBJECTIVES = [
+        ResultsTableHeader.Time.value,
+        ResultsTableHeader.Mass.value,
+        ResultsTableHeader.Strength.value,
+        ResultsTableHeader.Displacement.value
+    ]
+
+    # Number of rows added to the table at a time when new results are set
+    STREAM_BATCH = 200
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        self._results = [] # List[pywim.smartslice.result.Analysis]
-        self._resultsDict = [] # List[Dict[]] --> A list of dictionary items for sorting
+        self._store = ResultStore()
+        self._view = numpy.zeros(0, dtype=numpy.int64) # Indices into the store, in row order
+        self._rows = numpy.zeros(0, dtype=numpy.int64) # Row of each store index (rank - 1), -1 if not shown
+        self._shown = 0 # Number of rows of the view added to the model so far
+
+        self._streamTimer = QTimer(self)
+        self._streamTimer.setSingleShot(True)
+        self._streamTimer.setInterval(0)
+        self._streamTimer.timeout.connect(self._streamRows)
+
+        self._filters = {} # Dict[int, (minimum, maximum)], keyed by column
+        self._paretoOnly = False
+        self._topK = 0
 
         self._selectedRow = 0
         self._sortColumn = 0
@@ -59,34 +468,38 @@ class ResultTableData(QAbstractListModel):
         self.updateDisplaySignal = Signal() # Tells the owner of the table when to  update the display (like when a row is clicked)
         self.resultsUpdated = Signal()
 
-    def setResults(self, results: List[pywim.smartslice.result.Analysis], requested_result=0):
+    def setResults(self, results: List['pywim.smartslice.result.Analysis'], requested_result=0):
+
+        self._streamTimer.stop()
 
-        self.beginRemoveRows(QModelIndex(), 0, len(self._resultsDict) - 1)
-        self._results.clear()
-        self._resultsDict.clear()
+        self.beginRemoveRows(QModelIndex(), 0, self._shown - 1)
+        self._store = ResultStore()
+        self._setView(numpy.zeros(0, dtype=numpy.int64))
+        self._shown = 0
         self.endRemoveRows()
 
-        self._results = results
         self.selectedRow = -1
 
         self.sortColumn = 0
         self.sortOrder = Qt.AscendingOrder
 
-        rank = 0
-        row = 0
-        for result in self._results:
-            rank += 1
-            self._resultsDict.append(self.analysisToResultDict(rank, result))
-            if rank - 1 == requested_result:
-                row = rank - 1
+        # Only the summary columns are read here, the rows are added to the model in batches
+        self._store = ResultStore(results)
+        self._setView(self._filteredIndices(self._store))
 
-        self.beginInsertRows(QModelIndex(), 0, len(self._resultsDict) - 1)
-        self.endInsertRows()
+        # The first row is selected if the requested result is filtered out
+        row = max(self._rowOfIndex(requested_result), 0)
+
+        self._showRows(max(self.STREAM_BATCH, row + 1))
+        if self._shown < len(self._view):
+            self._streamTimer.start()
 
         self.selectedRow = row
-        self.sortByColumn(0, Qt.AscendingOrder)
-        self.updateDisplaySignal.emit(self._resultsDict[row])
+
+        if len(self._view) > 0:
+            self.updateDisplaySignal.emit(self._store.row(self._view[row]))
         self.resultsUpdated.emit()
+        self.viewChanged.emit()
 
     def roleNames(self):
         return ResultsTableHeader.rolesAsBytes()
@@ -123,21 +536,66 @@ class ResultTableData(QAbstractListModel):
 
     @property
     def analyses(self):
-        return self._results
+        return self._store.analyses
+
+    @property
+    def store(self) -> ResultStore:
+        return self._store
+
+    @pyqtProperty(int, notify=viewChanged)
+    def totalCount(self):
+        return len(self._store)
 
     @pyqtSlot(QObject, result=int)
     def rowCount(self, parent=None) -> int:
-        return len(self._resultsDict)
+        return self._shown
+
+    def _showRows(self, count: int):
+        count = min(count, len(self._view))
+        if count > self._shown:
+            self.beginInsertRows(QModelIndex(), self._shown, count - 1)
+            self._shown = count
+            self.endInsertRows()
+
+    def _streamRows(self):
+        self._showRows(self._shown + self.STREAM_BATCH)
+        if self._shown < len(self._view):
+            self._streamTimer.start()
+
+    def _finishStreaming(self):
+        self._streamTimer.stop()
+        self._showRows(len(self._view))
+
+    def _setView(self, view: numpy.ndarray):
+        self._view = view
+        self._rows = numpy.full(len(self._store), -1, dtype=numpy.int64)
+        self._rows[view] = numpy.arange(len(view))
+
+    def _rowOfIndex(self, index: int) -> int:
+        if index is None or index < 0 or index >= len(self._rows):
+            return -1
+        return int(self._rows[index])
+
+    def neighbouringResults(self, index: int, distance: int = 1) -> List[int]:
+        """
+        Indices of the results shown up to distance rows away from the result, nearest first
+        """
+        row = self._rowOfIndex(index)
+        if row < 0:
+            return []
+
+        rows = [r for d in range(1, distance + 1) for r in (row + d, row - d) if 0 <= r < self._shown]
+        return [int(self._view[r]) for r in rows]
 
     def getSelectedResultId(self):
-        if self._selectedRow >= 0 and self._selectedRow < len(self._resultsDict):
-            return self._resultsDict[self._selectedRow][ResultsTableHeader.Rank.value] - 1
+        if self._selectedRow >= 0 and self._selectedRow < len(self._view):
+            return self._store.value(self._view[self._selectedRow], ResultsTableHeader.Rank.value) - 1
         return 0
 
     def data(self, index, role):
-        if len(self._resultsDict) > index.row():
+        if self._shown > index.row():
             if len(ResultsTableHeader.rolesAsBytes()) > role:
-                value = self._resultsDict[index.row()][role]
+                value = self._store.value(self._view[index.row()], role)
 
                 if role == ResultsTableHeader.Time.value:
                     return Duration(value).getDisplayString()
@@ -156,6 +614,61 @@ class ResultTableData(QAbstractListModel):
 
         return None
 
+    def _filteredIndices(self, store: ResultStore) -> numpy.ndarray:
+        indices = None
+        for column, (minimum, maximum) in self._filters.items():
+            indices = store.where(column, minimum, maximum, indices)
+
+        if self._paretoOnly:
+            indices = store.paretoFront(self.PARETO_OBJECTIVES, indices)
+
+        indices = store.order(self._sortColumn, self._sortOrder == Qt.DescendingOrder, indices)
+
+        if self._topK > 0:
+            indices = indices[:self._topK]
+
+        return indices
+
+    def _updateView(self):
+        """
+        Re-applies the filters to the store, keeping the selected result selected if it is still shown
+        """
+        selected = self._view[self._selectedRow] if 0 <= self._selectedRow < len(self._view) else None
+
+        self._streamTimer.stop()
+
+        self.beginResetModel()
+        self._setView(self._filteredIndices(self._store))
+        self._shown = len(self._view)
+        self.endResetModel()
+
+        self.selectedRow = self._rowOfIndex(selected) if selected is not None else -1
+        self.viewChanged.emit()
+
+    @pyqtSlot(float, float)
+    def filterByRequirements(self, min_safety_factor: float, max_displacement: float):
+        self._filters[ResultsTableHeader.Strength.value] = (min_safety_factor, None)
+        self._filters[ResultsTableHeader.Displacement.value] = (None, max_displacement)
+        self._updateView()
+
+    @pyqtSlot()
+    def clearFilters(self):
+        self._filters.clear()
+        self._updateView()
+
+    @pyqtSlot(bool)
+    def setParetoFrontOnly(self, pareto_only: bool):
+        self._paretoOnly = pareto_only
+        self._updateView()
+
+    @pyqtSlot(int)
+    def setTopK(self, k: int):
+        """
+        Only shows the first k results in the current sort order, 0 shows all
+        """
+        self._topK = max(0, k)
+        self._updateView()
+
     @pyqtSlot(int)
     def sortByColumn(self, column=0, order=None):
 
@@ -177,28 +690,37 @@ class ResultTableData(QAbstractListModel):
 
         descending = True if self.sortOrder is Qt.DescendingOrder else False
 
-        rank = self._resultsDict[self._selectedRow][ResultsTableHeader.Rank.value]
+        selected = self._view[self._selectedRow] if 0 <= self._selectedRow < len(self._view) else None
 
-        self._resultsDict.sort(reverse=descending, key=lambda result: result[column])
+        # With a top k view, the rows shown depend on the order
+        if self._topK > 0:
+            self._updateView()
+            return
 
-        self.beginRemoveRows(QModelIndex(), 0, len(self._resultsDict) - 1)
-        self.endRemoveRows()
+        # Sorting only permutes the rows, so the delegates are kept and moved
+        self._finishStreaming()
+
+        self.layoutAboutToBeChanged.emit()
+
+        old_view = self._view
+        self._setView(self._store.order(column, descending, self._view))
+
+        persistent = self.persistentIndexList()
+        self.changePersistentIndexList(persistent, [
+            self.index(self._rowOfIndex(old_view[i.row()]), i.column()) for i in persistent
+        ])
 
-        self.beginInsertRows(QModelIndex(), 0, len(self._resultsDict) - 1)
-        self.endInsertRows()
+        self.layoutChanged.emit()
 
-        i = 0
-        for result in self._resultsDict:
-            if result[ResultsTableHeader.Rank.value] == rank:
-                self.selectedRow = i
-            i += 1
+        if selected is not None:
+            self.selectedRow = self._rowOfIndex(selected)
 
     @pyqtSlot(int)
     def rowClicked(self, row):
-        if row < len(self._resultsDict):
+        if row < self._shown:
             self.selectedRow = row
             QApplication.setOverrideCursor(Qt.WaitCursor)
-            self.updateDisplaySignal.emit(self._resultsDict[row])
+            self.updateDisplaySignal.emit(self._store.row(self._view[row]))
             QApplication.restoreOverrideCursor()
 
             # This is needed to stop the cursor from rotating indefinitely in the table area
@@ -210,7 +732,7 @@ class ResultTableData(QAbstractListModel):
         Application.getInstance().getController().setActiveStage("PreviewStage")
 
     @classmethod
-    def analysisToResultDict(self, rank, result: pywim.smartslice.result.Analysis):
+    def analysisToResultDict(self, rank, result: 'pywim.smartslice.result.Analysis'):
         material_data = self.calculateAdditionalMaterialInfo(result)
 
         return {
@@ -224,70 +746,32 @@ class ResultTableData(QAbstractListModel):
         }
 
     @classmethod
-    def calculateAdditionalMaterialInfo(self, result: pywim.smartslice.result.Analysis):
-
-        _material_volume = [result.extruders[0].material_volume]
-
-        application = Application.getInstance()
-
-        global_stack = application.getGlobalContainerStack()
-        if global_stack is None:
-            return
-
-        _material_lengths = []
-        _material_weights = []
-        _material_costs = []
-        _material_names = []
-
-        material_preference_values = json.loads(application.getPreferences().getValue("cura/material_settings"))
-
-        Logger.log("d", "global_stack.extruderList: {}".format(global_stack.extruderList))
-
-        for extruder_stack in global_stack.extruderList:
-            position = extruder_stack.position
-            if type(position) is not int:
-                position = int(position)
-            if position >= len(_material_volume):
-                continue
-            amount = _material_volume[position]
-            # Find the right extruder stack. As the list isn't sorted because it's a annoying generator, we do some
-            # list comprehension filtering to solve this for us.
-            density = extruder_stack.getMetaDataEntry("properties", {}).get("density", 0)
-            material = extruder_stack.material
-            radius = extruder_stack.getProperty("material_diameter", "value") / 2
-
-            weight = float(amount) * float(density) / 1000
-            cost = 0.
-
-            material_guid = material.getMetaDataEntry("GUID")
-            material_name = material.getName()
-
-            if material_guid in material_preference_values:
-                material_values = material_preference_values[material_guid]
-
-                if material_values and "spool_weight" in material_values:
-                    weight_per_spool = float(material_values["spool_weight"])
-                else:
-                    weight_per_spool = float(extruder_stack.getMetaDataEntry("properties", {}).get("weight", 0))
+    def calculateMaterialInfo(self, volumes: numpy.ndarray):
+        """
+        Lengths, weights and costs of the first extruder for an array of material volumes,
+        one per analysis
+        """
+        volumes = numpy.asarray(volumes, dtype=numpy.float64)
 
-                cost_per_spool = float(material_values["spool_cost"] if material_values and "spool_cost" in material_values else 0)
+        constants = MaterialConstants.get()
+        if constants is None or len(volumes) == 0:
+            zeros = numpy.zeros(len(volumes), dtype=numpy.float64)
+            return zeros, zeros.copy(), zeros.copy()
 
-                if weight_per_spool != 0:
-                    cost = cost_per_spool * weight / weight_per_spool
-                else:
-                    cost = 0
+        lengths, weights, costs, names = constants.compute(volumes[:, None])
+        if lengths.shape[1] == 0:
+            zeros = numpy.zeros(len(volumes), dtype=numpy.float64)
+            return zeros, zeros.copy(), zeros.copy()
 
-            # Material amount is sent as an amount of mm^3, so calculate length from that
-            if radius != 0:
-                length = round((amount / (math.pi * radius ** 2)) / 1000, 2)
-            else:
-                length = 0
+        return lengths[:, 0], weights[:, 0], costs[:, 0]
 
-            _material_weights.append(weight)
-            _material_lengths.append(length)
-            _material_costs.append(cost)
-            _material_names.append(material_name)
+    @classmethod
+    def calculateAdditionalMaterialInfo(self, result: 'pywim.smartslice.result.Analysis'):
 
-        return _material_lengths, _material_weights, _material_costs, _material_names
+        constants = MaterialConstants.get()
+        if constants is None:
+            return
 
+        lengths, weights, costs, names = constants.compute([[result.extruders[0].material_volume]])
 
+        return lengths[0].tolist(), weights[0].tolist(), costs[0].tolist(), names
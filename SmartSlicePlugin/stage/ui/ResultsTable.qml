@@ -14,7 +14,7 @@ Item {
     property int implicitHeight: 200
 
     width: 0.6 * smartSliceMain.width
-    height: tableArea.height + draggableArea.height + topDragArea.height
+    height: tableArea.height + draggableArea.height + topDragArea.height + filterBar.height
 
     property int centerX: 0.5 * (parent.width - width)
     property int centerY: 0.5 * (parent.height - height)
@@ -113,6 +113,87 @@ Item {
             }
         }
 
+        // Filters of the results shown in the table
+        Rectangle {
+            id: filterBar
+
+            width: parent.width
+            height: filterRow.height + 2 * UM.Theme.getSize("thin_margin").height
+            color: UM.Theme.getColor("main_background")
+            border.width: UM.Theme.getSize("default_lining").width
+            border.color: UM.Theme.getColor("lining")
+
+            function applyRequirementsFilter() {
+                if (requirementsCheckBox.checked) {
+                    tableArea.model.filterByRequirements(smartSliceMain.proxy.targetSafetyFactor, smartSliceMain.proxy.targetMaximalDisplacement)
+                } else {
+                    tableArea.model.clearFilters()
+                }
+            }
+
+            RowLayout {
+                id: filterRow
+
+                anchors {
+                    left: parent.left
+                    leftMargin: UM.Theme.getSize("default_margin").width
+                    verticalCenter: parent.verticalCenter
+                }
+
+                spacing: UM.Theme.getSize("default_margin").width
+
+                CheckBox {
+                    id: requirementsCheckBox
+                    text: "Meets requirements"
+                    font: UM.Theme.getFont("default")
+
+                    onToggled: filterBar.applyRequirementsFilter()
+                }
+
+                CheckBox {
+                    text: "Pareto front only"
+                    font: UM.Theme.getFont("default")
+
+                    onToggled: tableArea.model.setParetoFrontOnly(checked)
+                }
+
+                Text {
+                    text: "Show best"
+                    renderType: Text.NativeRendering
+                    font: UM.Theme.getFont("default")
+                    color: UM.Theme.getColor("text")
+                }
+
+                SpinBox {
+                    from: 0
+                    to: 1000
+                    value: 0
+                    editable: true
+                    font: UM.Theme.getFont("default")
+
+                    // 0 shows all results
+                    textFromValue: function(value, locale) { return value > 0 ? value.toString() : "All" }
+                    valueFromText: function(text, locale) { return text == "All" ? 0 : parseInt(text) }
+
+                    onValueModified: tableArea.model.setTopK(value)
+                }
+            }
+
+            Connections {
+                target: smartSliceMain.proxy
+                onTargetSafetyFactorChanged: {
+                    if (requirementsCheckBox.checked) {
+                        filterBar.applyRequirementsFilter()
+                    }
+                }
+                onTargetMaximalDisplacementChanged: {
+                    if (requirementsCheckBox.checked) {
+                        filterBar.applyRequirementsFilter()
+                    }
+                }
+            }
+        }
+
         TableView {
 
             id: tableArea
@@ -427,16 +508,16 @@ Item {
 
                 if (drag.active) {
                     var h = mouseY + tableArea.height | 0
-                    var bottom = tableTop + topDragArea.height + h + draggableArea.height
+                    var bottom = tableTop + topDragArea.height + filterBar.height + h + draggableArea.height
 
                     if (bottom <= smartSliceMain.y) {
-                        h = smartSliceMain.y - tableTop - topDragArea.height - draggableArea.height;
+                        h = smartSliceMain.y - tableTop - topDragArea.height - filterBar.height - draggableArea.height;
                     }
                     h = Math.max(absoluteMinimumHeight, h);
 
                     resultsTable.y = tableTop;
                     tableArea.height = h;
-                    resultsTable.height = h + draggableArea.height + topDragArea.height;
+                    resultsTable.height = h + draggableArea.height + topDragArea.height + filterBar.height;
                     resultTableColumn.forceLayout()
 
                     resultsTable.handler.setHeight(h)
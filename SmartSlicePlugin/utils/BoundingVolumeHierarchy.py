@@ -0,0 +1,294 @@
+'''
+Bounding volume hierarchy over the triangles of an interactive mesh.
+
+The hierarchy is a linear BVH: triangles are ordered along a Morton (Z-order)
+curve of their centroids and grouped into leaves of LEAF_SIZE consecutive
+triangles. The tree above the leaves is a complete binary tree stored level
+by level, so it can be built and traversed with whole-array NumPy operations
+instead of visiting nodes one at a time in Python.
+
+All queries are in the coordinates of the vertices the hierarchy was built
+from (the local coordinates of the mesh).
+'''
+
+import math
+
+import numpy
+
+# Number of triangles in one leaf of the hierarchy
+LEAF_SIZE = 8
+
+# Number of bits per axis used for the Morton codes
+MORTON_BITS = 10
+
+# Minimum ray parameter for a hit, avoids hitting the triangle the ray starts on
+RAY_EPSILON = 1.e-6
+
+
+class BoundingVolumeHierarchy:
+    def __init__(self, vertices: numpy.ndarray, triangles: numpy.ndarray, leaf_size: int = LEAF_SIZE):
+        self._vertices = numpy.asarray(vertices, dtype=numpy.float32)
+        self._triangles = numpy.asarray(triangles, dtype=numpy.int32).reshape(-1, 3)
+        self.leaf_size = max(1, int(leaf_size))
+
+        corners = self._vertices[self._triangles]
+
+        self.triangle_min = corners.min(axis=1)     # Mx3 float32
+        self.triangle_max = corners.max(axis=1)     # Mx3 float32
+
+        self.leaf_triangles = None  # (leaves x leaf_size) int32, -1 for padding
+        self.levels = []            # List[(mins, maxs)], root level first
+
+        self._build(corners.mean(axis=1))
+
+    @property
+    def depth(self) -> int:
+        return len(self.levels) - 1
+
+    @property
+    def bounds(self):
+        if len(self._triangles) == 0:
+            return None
+        return self.levels[0][0][0], self.levels[0][1][0]
+
+    def _build(self, centroids: numpy.ndarray):
+        count = len(self._triangles)
+
+        order = numpy.argsort(_morton_codes(centroids), kind='stable').astype(numpy.int32)
+
+        leaf_count = max(1, int(math.ceil(count / self.leaf_size)))
+        depth = int(math.ceil(math.log2(leaf_count))) if leaf_count > 1 else 0
+        padded_leaves = 1 << depth
+
+        leaf_triangles = numpy.full(padded_leaves * self.leaf_size, -1, dtype=numpy.int32)
+        leaf_triangles[:count] = order
+        self.leaf_triangles = leaf_triangles.reshape(padded_leaves, self.leaf_size)
+
+        # Padding gets inverted bounds (min > max) so it never passes an overlap test
+        mins = numpy.full((padded_leaves * self.leaf_size, 3), numpy.inf, dtype=numpy.float32)
+        maxs = numpy.full((padded_leaves * self.leaf_size, 3), -numpy.inf, dtype=numpy.float32)
+        mins[:count] = self.triangle_min[order]
+        maxs[:count] = self.triangle_max[order]
+
+        mins = mins.reshape(padded_leaves, self.leaf_size, 3).min(axis=1)
+        maxs = maxs.reshape(padded_leaves, self.leaf_size, 3).max(axis=1)
+
+        levels = [(mins, maxs)]
+        while len(mins) > 1:
+            mins = mins.reshape(-1, 2, 3).min(axis=1)
+            maxs = maxs.reshape(-1, 2, 3).max(axis=1)
+            levels.append((mins, maxs))
+
+        self.levels = levels[::-1]
+
+    def _traverse(self, test) -> numpy.ndarray:
+        """
+        Walks down the tree one level at a time. test(mins, maxs) returns a mask
+        of the nodes to descend into. Returns the ids of the leaves that passed.
+        """
+        nodes = numpy.zeros(1, dtype=numpy.int64)
+
+        for level, (mins, maxs) in enumerate(self.levels):
+            nodes = nodes[test(mins[nodes], maxs[nodes])]
+
+            if len(nodes) == 0 or level == self.depth:
+                break
+
+            nodes = (nodes[:, None] * 2 + numpy.arange(2)).ravel()
+
+        return nodes
+
+    def _leaf_candidates(self, leaves: numpy.ndarray) -> numpy.ndarray:
+        candidates = self.leaf_triangles[leaves].ravel()
+        return candidates[candidates >= 0]
+
+    def query_box(self, box_min, box_max) -> numpy.ndarray:
+        """
+        Ids of all triangles whose bounds overlap the axis aligned box
+        """
+        box_min = numpy.asarray(box_min, dtype=numpy.float32)
+        box_max = numpy.asarray(box_max, dtype=numpy.float32)
+
+        def overlaps(mins, maxs):
+            return numpy.all((mins <= box_max) & (maxs >= box_min), axis=1)
+
+        candidates = self._leaf_candidates(self._traverse(overlaps))
+        keep = overlaps(self.triangle_min[candidates], self.triangle_max[candidates])
+
+        return numpy.sort(candidates[keep])
+
+    def ray_cast(self, origin, direction):
+        """
+        Closest triangle hit by the ray, as (triangle id, ray parameter), or None.
+        The hit point is origin + parameter * direction.
+        """
+        origin = numpy.asarray(origin, dtype=numpy.float64)
+        direction = numpy.asarray(direction, dtype=numpy.float64)
+
+        # Avoid 0 * inf in the slab test for rays parallel to an axis
+        safe_direction = numpy.where(numpy.abs(direction) < 1.e-30, 1.e-30, direction)
+        inverse = 1. / safe_direction
+
+        def crosses(mins, maxs):
+            t1 = (mins - origin) * inverse
+            t2 = (maxs - origin) * inverse
+            near = numpy.minimum(t1, t2).max(axis=1)
+            far = numpy.maximum(t1, t2).min(axis=1)
+            return (far >= numpy.maximum(near, 0.)) & numpy.all(mins <= maxs, axis=1)
+
+        candidates = self._leaf_candidates(self._traverse(crosses))
+        if len(candidates) == 0:
+            return None
+
+        t = _intersect_triangles(self._vertices[self._triangles[candidates]], origin, direction)
+
+        best = numpy.argmin(t)
+        if not numpy.isfinite(t[best]):
+            return None
+
+        return int(candidates[best]), float(t[best])
+
+    def nearest(self, point, max_distance: float = numpy.inf):
+        """
+        Closest triangle to the point, as (triangle id, closest point, distance),
+        or None if there is no triangle within max_distance.
+        """
+        point = numpy.asarray(point, dtype=numpy.float64)
+
+        bound = [max_distance * max_distance]
+
+        def within_reach(mins, maxs):
+            valid = numpy.all(mins <= maxs, axis=1)
+            nearest_sq = (numpy.maximum(numpy.maximum(mins - point, point - maxs), 0.) ** 2).sum(axis=1)
+            farthest_sq = (numpy.maximum(numpy.abs(point - mins), numpy.abs(point - maxs)) ** 2).sum(axis=1)
+
+            # Every box holds at least one triangle, so no triangle is further than its farthest corner
+            if valid.any():
+                bound[0] = min(bound[0], float(farthest_sq[valid].min()))
+
+            return valid & (nearest_sq <= bound[0])
+
+        candidates = self._leaf_candidates(self._traverse(within_reach))
+        if len(candidates) == 0:
+            return None
+
+        closest = _closest_points_on_triangles(self._vertices[self._triangles[candidates]], point)
+        distance_sq = ((closest - point) ** 2).sum(axis=1)
+        distance_sq[~numpy.isfinite(distance_sq)] = numpy.inf
+
+        best = numpy.argmin(distance_sq)
+        if distance_sq[best] > max_distance * max_distance:
+            return None
+
+        return int(candidates[best]), closest[best], math.sqrt(distance_sq[best])
+
+
+def _morton_codes(points: numpy.ndarray) -> numpy.ndarray:
+    if len(points) == 0:
+        return numpy.zeros(0, dtype=numpy.int64)
+
+    low = points.min(axis=0)
+    extent = points.max(axis=0) - low
+    extent[extent <= 0.] = 1.
+
+    scale = (1 << MORTON_BITS) - 1
+    cells = ((points - low) / extent * scale).astype(numpy.int64)
+
+    codes = numpy.zeros(len(points), dtype=numpy.int64)
+    for axis in range(3):
+        codes |= _spread_bits(cells[:, axis]) << axis
+
+    return codes
+
+
+def _spread_bits(values: numpy.ndarray) -> numpy.ndarray:
+    # Inserts two zero bits between each of the lower 10 bits
+    values = (values | (values << 16)) & 0x030000FF
+    values = (values | (values << 8)) & 0x0300F00F
+    values = (values | (values << 4)) & 0x030C30C3
+    values = (values | (values << 2)) & 0x09249249
+    return values
+
+
+def _intersect_triangles(corners: numpy.ndarray, origin: numpy.ndarray, direction: numpy.ndarray) -> numpy.ndarray:
+    """
+    Moller-Trumbore for a batch of triangles. Returns the ray parameter of each hit, inf if missed.
+    """
+    a = corners[:, 0].astype(numpy.float64)
+    edge1 = corners[:, 1] - a
+    edge2 = corners[:, 2] - a
+
+    p = numpy.cross(direction, edge2)
+    det = numpy.einsum('ij,ij->i', edge1, p)
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        inv_det = 1. / det
+
+        s = origin - a
+        u = numpy.einsum('ij,ij->i', s, p) * inv_det
+
+        q = numpy.cross(s, edge1)
+        v = q.dot(direction) * inv_det
+        t = numpy.einsum('ij,ij->i', edge2, q) * inv_det
+
+        # Comparisons with the NaNs of degenerate triangles are invalid too
+        hit = (numpy.abs(det) > 1.e-12) & (u >= 0.) & (v >= 0.) & (u + v <= 1.) & (t > RAY_EPSILON)
+
+    return numpy.where(hit, t, numpy.inf)
+
+
+def _closest_points_on_triangles(corners: numpy.ndarray, point: numpy.ndarray) -> numpy.ndarray:
+    """
+    Closest point on each triangle to the point, following the Voronoi region
+    tests from Ericson's Real-Time Collision Detection.
+    """
+    def dot(x, y):
+        return numpy.einsum('ij,ij->i', x, y)
+
+    a = corners[:, 0].astype(numpy.float64)
+    b = corners[:, 1].astype(numpy.float64)
+    c = corners[:, 2].astype(numpy.float64)
+
+    ab = b - a
+    ac = c - a
+    bc = c - b
+
+    ap = point - a
+    bp = point - b
+    cp = point - c
+
+    d1, d2 = dot(ab, ap), dot(ac, ap)
+    d3, d4 = dot(ab, bp), dot(ac, bp)
+    d5, d6 = dot(ab, cp), dot(ac, cp)
+
+    va = d3 * d6 - d5 * d4
+    vb = d5 * d2 - d1 * d6
+    vc = d1 * d4 - d3 * d2
+
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        denom = 1. / (va + vb + vc)
+        closest = a + ab * (vb * denom)[:, None] + ac * (vc * denom)[:, None]
+
+        # Regions are applied from lowest to highest priority
+        region_bc = (va <= 0.) & (d4 - d3 >= 0.) & (d5 - d6 >= 0.)
+        w_bc = (d4 - d3) / ((d4 - d3) + (d5 - d6))
+        closest[region_bc] = (b + bc * w_bc[:, None])[region_bc]
+
+        region_ac = (vb <= 0.) & (d2 >= 0.) & (d6 <= 0.)
+        w_ac = d2 / (d2 - d6)
+        closest[region_ac] = (a + ac * w_ac[:, None])[region_ac]
+
+        region_c = (d6 >= 0.) & (d5 <= d6)
+        closest[region_c] = c[region_c]
+
+        region_ab = (vc <= 0.) & (d1 >= 0.) & (d3 <= 0.)
+        v_ab = d1 / (d1 - d3)
+        closest[region_ab] = (a + ab * v_ab[:, None])[region_ab]
+
+    region_b = (d3 >= 0.) & (d4 <= d3)
+    closest[region_b] = b[region_b]
+
+    region_a = (d1 <= 0.) & (d2 <= 0.)
+    closest[region_a] = a[region_a]
+
+    return closest
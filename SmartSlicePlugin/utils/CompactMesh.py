@@ -0,0 +1,705 @@
+'''
+Array backed interactive mesh used for face selection in the Smart Slice stage.
+
+CompactMesh exposes the subset of the pywim.geom.tri.Mesh interface the plugin
+relies on (select_*_face, face_from_ids and the Face axis helpers), but keeps
+the geometry in contiguous NumPy arrays instead of per vertex / per triangle
+Python objects:
+
+    * vertices  - Nx3 float32, coincident vertices merged
+    * triangles - Mx3 int32, triangle ids are the row numbers (same as Cura's face ids)
+    * adjacency - CSR (indptr / indices) over triangles sharing an edge
+
+Triangle objects are only created when a CompactFace's triangles are accessed.
+
+The mesh is kept in the local coordinates of its scene node. A world
+transformation can be attached with set_transformation: rigid and uniform
+scale transformations keep all of the cached topology and curved regions, other
+transformations only re-derive the angles between neighbouring triangles.
+'''
+
+import math
+
+import numpy
+
+from . import SystemUtils
+
+from .BoundingVolumeHierarchy import BoundingVolumeHierarchy
+
+pywim = SystemUtils.lazyImport("pywim")
+
+# Maximum angle between two triangle normals for them to be considered coplanar
+PLANAR_TOLERANCE = math.radians(1.0)
+
+# Maximum angle between two neighbouring triangles on a concave / convex surface
+CURVED_TOLERANCE = math.radians(30.0)
+
+# Relative tolerance for treating a transformation as a similarity (rotation, mirror, uniform scale)
+SIMILARITY_TOLERANCE = 1.e-5
+
+# Tolerances for matching a face signature, relative to the size of the face
+SIGNATURE_POSITION_TOLERANCE = 1.e-3
+SIGNATURE_AREA_TOLERANCE = 1.e-3
+
+# How far around its saved bounds a face is searched for when re-mapping, relative to the size of the face
+REMAP_SEARCH_MARGIN = 0.05
+
+
+class CompactVertex:
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x: float, y: float, z: float):
+        self.x = x
+        self.y = y
+        self.z = z
+
+
+class CompactTriangle:
+    __slots__ = ('_mesh', 'id')
+
+    def __init__(self, mesh: 'CompactMesh', id: int):
+        self._mesh = mesh
+        self.id = id
+
+    def _vertex(self, i: int) -> CompactVertex:
+        v = self._mesh.vertices[self._mesh.triangles[self.id, i]]
+        return CompactVertex(float(v[0]), float(v[1]), float(v[2]))
+
+    @property
+    def v1(self) -> CompactVertex:
+        return self._vertex(0)
+
+    @property
+    def v2(self) -> CompactVertex:
+        return self._vertex(1)
+
+    @property
+    def v3(self) -> CompactVertex:
+        return self._vertex(2)
+
+    def __eq__(self, other):
+        return isinstance(other, CompactTriangle) and self.id == other.id and self._mesh is other._mesh
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class CompactFace:
+    """
+    A set of triangle ids on a CompactMesh. The ids are stored sorted and unique.
+    """
+
+    def __init__(self, mesh: 'CompactMesh' = None, ids=None):
+        self._mesh = mesh
+        self._triangles = None
+        self._axes = {}
+
+        if mesh is None or ids is None:
+            self.ids = numpy.zeros(0, dtype=numpy.int32)
+        else:
+            self.ids = numpy.unique(numpy.asarray(ids, dtype=numpy.int32))
+
+    @property
+    def mesh(self) -> 'CompactMesh':
+        return self._mesh
+
+    @property
+    def triangles(self):
+        if self._triangles is None:
+            self._triangles = [CompactTriangle(self._mesh, int(i)) for i in self.ids]
+        return self._triangles
+
+    def __len__(self):
+        return len(self.ids)
+
+    def vertex_array(self) -> numpy.ndarray:
+        """
+        Returns the triangle corners as a (3 * len(self))x3 float32 array, suitable for MeshBuilder.setVertices
+        """
+        if len(self.ids) == 0:
+            return numpy.zeros((0, 3), dtype=numpy.float32)
+        return self._mesh.vertices[self._mesh.triangles[self.ids]].reshape(-1, 3)
+
+    def area(self) -> float:
+        if len(self.ids) == 0:
+            return 0.0
+        return float(self._mesh.areas[self.ids].sum())
+
+    def centroid(self) -> numpy.ndarray:
+        """
+        Area weighted centroid of the face
+        """
+        centroids = self._mesh.centroids(self.ids)
+        weights = self._mesh.areas[self.ids].astype(numpy.float64)
+        if weights.sum() <= 0.:
+            return centroids.mean(axis=0)
+        return (centroids * weights[:, None]).sum(axis=0) / weights.sum()
+
+    def bounds(self):
+        corners = self.vertex_array()
+        return corners.min(axis=0).astype(numpy.float64), corners.max(axis=0).astype(numpy.float64)
+
+    def signature(self, kind: str = None) -> dict:
+        """
+        Geometric description of the face, used to find it again on a mesh with
+        different triangle ids. kind is the selection type ('planar', 'concave'
+        or 'convex') the face was made with. The result is JSON serializable.
+        """
+        if len(self.ids) == 0:
+            return None
+
+        centroid = self.centroid()
+        centroids = self._mesh.centroids(self.ids)
+
+        # The centroid of a curved face is not on the surface, so also keep the triangle closest to it
+        seed = int(numpy.argmin(((centroids - centroid) ** 2).sum(axis=1)))
+
+        if kind == 'planar':
+            axis = self.planar_axis()
+        elif kind in ('concave', 'convex'):
+            axis = self.rotation_axis()
+        else:
+            axis = None
+
+        low, high = self.bounds()
+
+        return {
+            'kind': kind,
+            'count': len(self.ids),
+            'area': self.area(),
+            'centroid': centroid.tolist(),
+            'seed': centroids[seed].tolist(),
+            'seed_normal': self._mesh.normals[self.ids[seed]].tolist(),
+            'axis': [axis.r, axis.s, axis.t, axis.origin.x, axis.origin.y, axis.origin.z] if axis else None,
+            'bounds': [low.tolist(), high.tolist()]
+        }
+
+    def planar_axis(self) -> 'pywim.geom.Vector':
+        """
+        Area weighted normal of the face, with the origin at the face centroid
+        """
+        if 'planar' not in self._axes:
+            self._axes['planar'] = self._planar_axis()
+        return self._axes['planar']
+
+    def rotation_axis(self) -> 'pywim.geom.Vector':
+        """
+        Axis of revolution for a concave / convex face. The direction is the
+        one most perpendicular to all of the triangle normals and the origin
+        is the point on the axis closest to the face's normal lines.
+        """
+        if 'rotation' not in self._axes:
+            self._axes['rotation'] = self._rotation_axis()
+        return self._axes['rotation']
+
+    def _planar_axis(self) -> 'pywim.geom.Vector':
+        if len(self.ids) == 0:
+            return None
+
+        weights = self._mesh.areas[self.ids].astype(numpy.float64)
+        normal = (self._mesh.normals[self.ids] * weights[:, None]).sum(axis=0)
+
+        length = numpy.linalg.norm(normal)
+        if length < 1.e-12:
+            return None
+
+        return _make_vector(normal / length, self.centroid())
+
+    def _rotation_axis(self) -> 'pywim.geom.Vector':
+        if len(self.ids) < 2:
+            return None
+
+        normals = self._mesh.normals[self.ids].astype(numpy.float64)
+        points = self._mesh.centroids(self.ids)
+        weights = self._mesh.areas[self.ids].astype(numpy.float64)
+
+        scatter = numpy.einsum('i,ij,ik->jk', weights, normals, normals)
+        eigenvalues, eigenvectors = numpy.linalg.eigh(scatter)
+        axis = eigenvectors[:, 0]
+
+        # Least squares intersection of the normal lines, pinned along the axis
+        # to the mean height of the face so the system is not singular.
+        projectors = numpy.eye(3)[None, :, :] - normals[:, :, None] * normals[:, None, :]
+        lhs = numpy.einsum('i,ijk->jk', weights, projectors)
+        rhs = numpy.einsum('i,ijk,ik->j', weights, projectors, points)
+
+        pin = weights.sum()
+        height = numpy.dot(self.centroid(), axis)
+        lhs += pin * numpy.outer(axis, axis)
+        rhs += pin * height * axis
+
+        center, _, rank, _ = numpy.linalg.lstsq(lhs, rhs, rcond=None)
+        if rank < 3:
+            center = self.centroid()
+
+        return _make_vector(axis, center)
+
+
+class CompactMesh:
+    """
+    Array backed triangle mesh with edge adjacency for region growing face selection
+    """
+
+    def __init__(self, vertices: numpy.ndarray, indices: numpy.ndarray = None):
+        vertices = numpy.asarray(vertices, dtype=numpy.float32).reshape(-1, 3)
+
+        if indices is None:
+            indices = numpy.arange(len(vertices) - len(vertices) % 3, dtype=numpy.int32).reshape(-1, 3)
+        else:
+            indices = numpy.asarray(indices, dtype=numpy.int32).reshape(-1, 3)
+
+        # STL meshes come in without shared vertices, so merge coincident
+        # vertices to recover the connectivity between triangles
+        unique_vertices, inverse = numpy.unique(vertices, axis=0, return_inverse=True)
+
+        self.vertices = numpy.ascontiguousarray(unique_vertices, dtype=numpy.float32)
+        self.triangles = numpy.ascontiguousarray(inverse.reshape(-1)[indices], dtype=numpy.int32)
+
+        self.normals = None         # Mx3 float32
+        self.areas = None           # M float32
+        self.adjacency_indptr = None   # M + 1 int64
+        self.adjacency_indices = None  # int32, neighbouring triangle ids
+        self.adjacency_cos = None      # float32, cosine of the angle between the neighbour normals
+        self.adjacency_bend = None     # int8, 1 concave, -1 convex, 0 flat
+
+        self.transformation = numpy.identity(4)
+        self._inverse_transformation = None
+
+        # Linear part of the transformation the adjacency angles were computed in
+        self._angle_frame = numpy.identity(3)
+        self._angles_outdated = False
+
+        # Segmentation cache: selection kind -> (triangle labels, List[CompactFace])
+        self._regions = {}
+        self.region_hits = 0
+        self.region_misses = 0
+
+        self.spatial_index = None  # BoundingVolumeHierarchy, local coordinates
+
+    @property
+    def triangle_count(self) -> int:
+        return len(self.triangles)
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.vertices)
+
+    def centroids(self, ids=None) -> numpy.ndarray:
+        tris = self.triangles if ids is None else self.triangles[ids]
+        return self.vertices[tris].astype(numpy.float64).mean(axis=1)
+
+    def analyze_mesh(self):
+        """
+        Computes the triangle normals, areas and the edge adjacency. Degenerate
+        triangles are kept, since their ids need to line up with Cura's.
+        """
+        corners = self.vertices[self.triangles].astype(numpy.float64)
+        cross = numpy.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        length = numpy.linalg.norm(cross, axis=1)
+
+        valid = length > 1.e-12
+        normals = numpy.zeros_like(cross)
+        normals[valid] = cross[valid] / length[valid, None]
+
+        self.normals = normals.astype(numpy.float32)
+        self.areas = (0.5 * length).astype(numpy.float32)
+
+        self._build_adjacency(corners.mean(axis=1))
+
+    def build_spatial_index(self) -> BoundingVolumeHierarchy:
+        self.spatial_index = BoundingVolumeHierarchy(self.vertices, self.triangles)
+        return self.spatial_index
+
+    def _spatial_index(self) -> BoundingVolumeHierarchy:
+        if self.spatial_index is None:
+            self.build_spatial_index()
+        return self.spatial_index
+
+    def ray_cast(self, origin, direction):
+        """
+        First triangle hit by a ray given in world coordinates, as (triangle id, world hit point), or None
+        """
+        origin = numpy.asarray(origin, dtype=numpy.float64)
+        direction = numpy.asarray(direction, dtype=numpy.float64)
+
+        # The ray parameter is the same in local and world coordinates for an affine transformation
+        hit = self._spatial_index().ray_cast(self.to_local_point(origin), self.to_local_direction(direction))
+        if hit is None:
+            return None
+
+        tri_id, t = hit
+        return tri_id, origin + t * direction
+
+    def nearest_triangle(self, point, max_distance: float = numpy.inf):
+        """
+        Triangle closest to a point given in world coordinates, as (triangle id, world closest point), or None.
+        Distances are measured in local coordinates, which only differs for non-uniform scales.
+        """
+        hit = self._spatial_index().nearest(self.to_local_point(point), max_distance)
+        if hit is None:
+            return None
+
+        tri_id, closest, distance = hit
+        return tri_id, self.transformation[:3, :3].dot(closest) + self.transformation[:3, 3]
+
+    def triangles_in_box(self, box_min, box_max) -> numpy.ndarray:
+        """
+        Ids of the triangles overlapping an axis aligned box in local coordinates
+        """
+        return self._spatial_index().query_box(box_min, box_max)
+
+    def _build_adjacency(self, centroids: numpy.ndarray):
+        n_tris = len(self.triangles)
+
+        edges = numpy.concatenate((
+            self.triangles[:, [0, 1]],
+            self.triangles[:, [1, 2]],
+            self.triangles[:, [2, 0]]
+        ))
+        owners = numpy.tile(numpy.arange(n_tris, dtype=numpy.int32), 3)
+
+        edges.sort(axis=1)
+        keep = edges[:, 0] != edges[:, 1]
+        edges = edges[keep]
+        owners = owners[keep]
+
+        keys = edges[:, 0].astype(numpy.int64) * max(len(self.vertices), 1) + edges[:, 1]
+        order = numpy.argsort(keys, kind='mergesort')
+        keys = keys[order]
+        owners = owners[order]
+
+        # Triangles which share an edge end up next to each other after sorting.
+        # Non-manifold edges (more than two triangles) are chained together.
+        shared = keys[1:] == keys[:-1]
+        first = owners[:-1][shared]
+        second = owners[1:][shared]
+
+        distinct = first != second
+        first = first[distinct]
+        second = second[distinct]
+
+        rows = numpy.concatenate((first, second))
+        cols = numpy.concatenate((second, first))
+
+        order = numpy.argsort(rows, kind='mergesort')
+        rows = rows[order]
+        cols = cols[order]
+
+        indptr = numpy.zeros(n_tris + 1, dtype=numpy.int64)
+        numpy.cumsum(numpy.bincount(rows, minlength=n_tris), out=indptr[1:])
+
+        self.adjacency_indptr = indptr
+        self.adjacency_indices = cols.astype(numpy.int32)
+        self._compute_adjacency_angles(self.normals, centroids)
+
+    def _compute_adjacency_angles(self, normals: numpy.ndarray, centroids: numpy.ndarray):
+        rows = numpy.repeat(
+            numpy.arange(len(self.triangles), dtype=numpy.int32),
+            numpy.diff(self.adjacency_indptr)
+        )
+        cols = self.adjacency_indices
+
+        src_normals = normals[rows]
+        dst_normals = normals[cols]
+
+        self.adjacency_cos = numpy.einsum('ij,ij->i', src_normals, dst_normals)
+
+        # A neighbour lying above the plane of a triangle bends towards its normal (concave)
+        rise = numpy.einsum('ij,ij->i', src_normals, centroids[cols] - centroids[rows])
+        self.adjacency_bend = numpy.sign(rise).astype(numpy.int8)
+
+    def set_transformation(self, matrix) -> bool:
+        """
+        Attaches the world transformation (4x4) of the scene node this mesh belongs to.
+        The topology, triangle ids and local geometry are always reused. Returns True
+        if the cached segmentation is still valid, which is the case for any rigid or
+        uniform scale change. Otherwise the neighbour angles are re-derived in world
+        space the next time a face is selected.
+        """
+        matrix = numpy.asarray(matrix, dtype=numpy.float64).reshape(4, 4)
+
+        self.transformation = matrix
+        self._inverse_transformation = None
+
+        relative = matrix[:3, :3].dot(numpy.linalg.inv(self._angle_frame))
+        if _is_similarity(relative):
+            return True
+
+        self._angles_outdated = True
+        self._regions.pop('concave', None)
+        self._regions.pop('convex', None)
+
+        return False
+
+    def _update_world_angles(self):
+        if not self._angles_outdated:
+            return
+
+        linear = self.transformation[:3, :3]
+
+        corners = self.vertices[self.triangles].astype(numpy.float64).dot(linear.T)
+        cross = numpy.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+        length = numpy.linalg.norm(cross, axis=1)
+
+        # Mirroring flips the winding, keep the normals pointing outwards
+        valid = length > 1.e-12
+        normals = numpy.zeros_like(cross)
+        normals[valid] = cross[valid] / length[valid, None] * numpy.sign(numpy.linalg.det(linear))
+
+        self._compute_adjacency_angles(normals.astype(numpy.float32), corners.mean(axis=1))
+
+        self._angle_frame = linear.copy()
+        self._angles_outdated = False
+
+    def to_local_point(self, point) -> numpy.ndarray:
+        if self._inverse_transformation is None:
+            self._inverse_transformation = numpy.linalg.inv(self.transformation)
+        point = numpy.append(numpy.asarray(point, dtype=numpy.float64), 1.)
+        return self._inverse_transformation.dot(point)[:3]
+
+    def to_local_direction(self, direction) -> numpy.ndarray:
+        if self._inverse_transformation is None:
+            self._inverse_transformation = numpy.linalg.inv(self.transformation)
+        return self._inverse_transformation[:3, :3].dot(numpy.asarray(direction, dtype=numpy.float64))
+
+    def neighbors(self, tri_id: int) -> numpy.ndarray:
+        return self.adjacency_indices[self.adjacency_indptr[tri_id]:self.adjacency_indptr[tri_id + 1]]
+
+    def _neighbor_entries(self, frontier: numpy.ndarray) -> numpy.ndarray:
+        """
+        Returns the positions in the adjacency arrays of all neighbours of the frontier triangles
+        """
+        starts = self.adjacency_indptr[frontier]
+        counts = self.adjacency_indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return numpy.zeros(0, dtype=numpy.int64)
+        offsets = numpy.repeat(starts - (numpy.cumsum(counts) - counts), counts)
+        return offsets + numpy.arange(total, dtype=numpy.int64)
+
+    def _flood_fill(self, seed: int, accept) -> numpy.ndarray:
+        visited = numpy.zeros(len(self.triangles), dtype=bool)
+        visited[seed] = True
+
+        frontier = numpy.array([seed], dtype=numpy.int64)
+
+        while len(frontier) > 0:
+            entries = self._neighbor_entries(frontier)
+            targets = self.adjacency_indices[entries]
+
+            mask = ~visited[targets]
+            mask[mask] = accept(entries[mask], targets[mask])
+
+            frontier = numpy.unique(targets[mask]).astype(numpy.int64)
+            visited[frontier] = True
+
+        return numpy.flatnonzero(visited).astype(numpy.int32)
+
+    def _flood_fill_within(self, seed: int, accept, candidates: numpy.ndarray) -> numpy.ndarray:
+        """
+        Same as _flood_fill, but the region stays within the candidates (sorted triangle ids,
+        including seed), so the work and memory are bounded by their number instead of the
+        size of the mesh
+        """
+        visited = numpy.zeros(len(candidates), dtype=bool)
+        visited[numpy.searchsorted(candidates, seed)] = True
+
+        frontier = numpy.array([seed], dtype=numpy.int64)
+
+        while len(frontier) > 0:
+            entries = self._neighbor_entries(frontier)
+            targets = self.adjacency_indices[entries]
+
+            positions = numpy.minimum(numpy.searchsorted(candidates, targets), len(candidates) - 1)
+            mask = candidates[positions] == targets
+            mask[mask] = ~visited[positions[mask]]
+            mask[mask] = accept(entries[mask], targets[mask])
+
+            frontier = numpy.unique(targets[mask]).astype(numpy.int64)
+            visited[numpy.searchsorted(candidates, frontier)] = True
+
+        return candidates[visited].astype(numpy.int32)
+
+    def _triangle_id(self, tri) -> int:
+        return int(getattr(tri, 'id', tri))
+
+    def _cached_region(self, kind: str, seed: int, accept) -> CompactFace:
+        """
+        Returns the region of the given kind containing seed, growing and caching it if needed.
+        Only valid for an accept which compares neighbouring triangles with each other, since
+        then every triangle of a region grows the same region.
+        """
+        if kind not in self._regions:
+            self._regions[kind] = (numpy.full(len(self.triangles), -1, dtype=numpy.int32), [])
+
+        labels, regions = self._regions[kind]
+
+        if labels[seed] >= 0:
+            self.region_hits += 1
+            return regions[labels[seed]]
+
+        self.region_misses += 1
+
+        face = CompactFace(self, self._flood_fill(seed, accept))
+
+        unlabeled = face.ids[labels[face.ids] < 0]
+        labels[unlabeled] = len(regions)
+        labels[seed] = len(regions)
+        regions.append(face)
+
+        return face
+
+    def statistics(self) -> dict:
+        """
+        Sizes of the mesh and of its caches, for performance reports
+        """
+        return {
+            'vertices': self.vertex_count,
+            'triangles': self.triangle_count,
+            'spatial_index_depth': self.spatial_index.depth if self.spatial_index is not None else None,
+            'cached_regions': { kind: len(regions) for kind, (labels, regions) in self._regions.items() },
+            'region_cache_hits': self.region_hits,
+            'region_cache_misses': self.region_misses
+        }
+
+    def _planar_accept(self, seed: int):
+        seed_normal = self.normals[seed]
+        cos_tolerance = math.cos(PLANAR_TOLERANCE)
+
+        def accept(entries, targets):
+            return self.normals[targets].dot(seed_normal) >= cos_tolerance
+
+        return accept
+
+    def _curved_accept(self, bend: int):
+        self._update_world_angles()
+
+        cos_planar = math.cos(PLANAR_TOLERANCE)
+        cos_curved = math.cos(CURVED_TOLERANCE)
+
+        def accept(entries, targets):
+            cos = self.adjacency_cos[entries]
+            flat = cos >= cos_planar
+            curved = (self.adjacency_bend[entries] == bend) & (cos >= cos_curved)
+            return flat | curved
+
+        return accept
+
+    def select_planar_face(self, tri) -> CompactFace:
+        seed = self._triangle_id(tri)
+
+        if not self.normals[seed].any():
+            return CompactFace(self, [seed])
+
+        # The tolerance is measured against the seed, so a region grown from another
+        # triangle of the same face can differ and is not reused
+        return CompactFace(self, self._flood_fill(seed, self._planar_accept(seed)))
+
+    def _select_curved_face(self, tri, bend: int) -> CompactFace:
+        seed = self._triangle_id(tri)
+        accept = self._curved_accept(bend)
+
+        return self._cached_region('concave' if bend > 0 else 'convex', seed, accept)
+
+    def select_concave_face(self, tri) -> CompactFace:
+        return self._select_curved_face(tri, 1)
+
+    def select_convex_face(self, tri) -> CompactFace:
+        return self._select_curved_face(tri, -1)
+
+    def face_from_ids(self, ids) -> CompactFace:
+        ids = numpy.asarray(ids, dtype=numpy.int64).reshape(-1)
+        ids = ids[(ids >= 0) & (ids < len(self.triangles))]
+        return CompactFace(self, ids)
+
+    def remap_face(self, ids, signature: dict) -> CompactFace:
+        """
+        Returns the face for saved triangle ids. If the ids no longer describe the face
+        in signature (e.g. the mesh was re-exported), the face is found again from its
+        geometry. The work done is proportional to the size of the face, not the mesh.
+        An empty face is returned if no match is found.
+        """
+        face = self.face_from_ids(ids)
+
+        if not signature:
+            return face
+
+        if _face_matches(face, signature):
+            return face
+
+        kind = signature.get('kind')
+        if kind not in ('planar', 'concave', 'convex'):
+            return CompactFace(self)
+
+        low, high = (numpy.asarray(b, dtype=numpy.float64) for b in signature['bounds'])
+        margin = REMAP_SEARCH_MARGIN * numpy.linalg.norm(high - low) + 1.e-6
+        low -= margin
+        high += margin
+
+        seed = self._find_seed(signature, low, high)
+        if seed is None:
+            return CompactFace(self)
+
+        if kind == 'planar':
+            accept = self._planar_accept(seed)
+        else:
+            accept = self._curved_accept(1 if kind == 'concave' else -1)
+
+        # The region is only grown around where the old face was, it may have grown into its neighbours on the new mesh
+        candidates = numpy.union1d(self.triangles_in_box(low, high), [seed]).astype(numpy.int64)
+        ids = self._flood_fill_within(seed, accept, candidates)
+
+        centroids = self.centroids(ids)
+        inside = numpy.all((centroids >= low) & (centroids <= high), axis=1)
+
+        return CompactFace(self, ids[inside])
+
+    def _find_seed(self, signature: dict, low: numpy.ndarray, high: numpy.ndarray) -> int:
+        seed_point = numpy.asarray(signature['seed'], dtype=numpy.float64)
+        seed_normal = numpy.asarray(signature['seed_normal'], dtype=numpy.float64)
+        cos_tolerance = math.cos(CURVED_TOLERANCE)
+
+        index = self._spatial_index()
+
+        hit = index.nearest(seed_point, numpy.linalg.norm(high - low))
+        if hit is not None and self.normals[hit[0]].dot(seed_normal) >= cos_tolerance:
+            return hit[0]
+
+        candidates = index.query_box(low, high)
+        candidates = candidates[self.normals[candidates].dot(seed_normal) >= cos_tolerance]
+        if len(candidates) == 0:
+            return None
+
+        distance = ((self.centroids(candidates) - seed_point) ** 2).sum(axis=1)
+
+        return int(candidates[numpy.argmin(distance)])
+
+
+def _face_matches(face: CompactFace, signature: dict) -> bool:
+    if len(face) == 0 or len(face) != signature['count']:
+        return False
+
+    low, high = (numpy.asarray(b) for b in signature['bounds'])
+    size = numpy.linalg.norm(high - low)
+
+    if numpy.linalg.norm(face.centroid() - signature['centroid']) > SIGNATURE_POSITION_TOLERANCE * size + 1.e-6:
+        return False
+
+    return abs(face.area() - signature['area']) <= SIGNATURE_AREA_TOLERANCE * signature['area'] + 1.e-9
+
+
+def _is_similarity(linear: numpy.ndarray) -> bool:
+    gram = linear.T.dot(linear)
+    scale = numpy.trace(gram) / 3.
+    if scale <= 0.:
+        return False
+    return numpy.allclose(gram / scale, numpy.identity(3), atol=SIMILARITY_TOLERANCE)
+
+
+def _make_vector(direction, origin) -> 'pywim.geom.Vector':
+    vector = pywim.geom.Vector(float(direction[0]), float(direction[1]), float(direction[2]))
+    vector.origin = pywim.geom.Vertex(float(origin[0]), float(origin[1]), float(origin[2]))
+    return vector
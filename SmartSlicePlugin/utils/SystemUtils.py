@@ -4,17 +4,82 @@ Created on 06.11.2019
 @author: thopiekar
 '''
 
+import importlib
+import json
 import os
 import platform
 import site
 import sys
+import time
+
+from typing import Dict
 
 from UM.Logger import Logger
 
+# Modules imported on first use, and how long loading parts of the plugin took
+_lazy_modules = {}  # Dict[str, LazyModule]
+_load_times = {}    # Dict[str, float]
+
+# Written by build-manifest.py when the plugin is packaged
+THIRD_PARTY_MANIFEST = "manifest.json"
+THIRD_PARTY_MANIFEST_VERSION = 1
+
 def registerThirdPartyModules(third_party_dir):
     third_party_dir = os.path.realpath(third_party_dir)
     Logger.log("i", "Adding 3rd-party modules from: {}".format(third_party_dir))
 
+    platform_dirs = _platformDirectories()
+
+    manifest = _readThirdPartyManifest(third_party_dir)
+    if manifest is None:
+        _addPlatformDirectories(third_party_dir, platform_dirs)
+        return
+
+    paths = []
+    for subdir in platform_dirs:
+        entry = manifest.get(subdir)
+        if entry is None:
+            continue
+
+        path = os.path.join(third_party_dir, subdir)
+
+        # .pth files are only processed by site
+        if entry.get("pth"):
+            _addSiteDirectory(path)
+            continue
+
+        bundle = entry.get("zip")
+        if bundle and os.path.isfile(os.path.join(third_party_dir, bundle)):
+            path = os.path.join(third_party_dir, bundle)
+
+        if path not in sys.path:
+            paths.append(path)
+            Logger.log("i", "Adding search path: {} ({})".format(path, ", ".join(entry.get("modules", []))))
+
+    sys.path.extend(paths)
+
+def _readThirdPartyManifest(third_party_dir):
+    """
+    The platform directories listed in the manifest, or None if there is no usable manifest
+    """
+    manifest_path = os.path.join(third_party_dir, THIRD_PARTY_MANIFEST)
+    if not os.path.isfile(manifest_path):
+        return None
+
+    try:
+        with open(manifest_path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError) as exc:
+        Logger.log("w", "Unable to read the 3rd-party module manifest: {}".format(exc))
+        return None
+
+    if manifest.get("version") != THIRD_PARTY_MANIFEST_VERSION:
+        Logger.log("w", "Unsupported 3rd-party module manifest version: {}".format(manifest.get("version")))
+        return None
+
+    return manifest.get("directories", {})
+
+def _platformDirectories():
     # Collecting platform info
     platform_info = [platform.python_implementation().lower(),
                      "{0}.{1}".format(*platform.python_version_tuple()),
@@ -28,6 +93,9 @@ def registerThirdPartyModules(third_party_dir):
     platform_dirs.reverse()
     Logger.log("d", "platform_dirs: {}".format(platform_dirs))
 
+    return platform_dirs
+
+def _addPlatformDirectories(third_party_dir, platform_dirs):
     # Looking for directories
     found_platform_dirs = []
     for subdir in platform_dirs:
@@ -37,7 +105,56 @@ def registerThirdPartyModules(third_party_dir):
 
     # Looking for modules in these directories
     for found_platform_dir in found_platform_dirs:
-        while found_platform_dir in sys.path:
-            sys.path.remove(found_platform_dir)
-        site.addsitedir(found_platform_dir)
-        Logger.log("i", "Adding search path: {}".format(found_platform_dir))
+        _addSiteDirectory(found_platform_dir)
+
+def _addSiteDirectory(directory):
+    while directory in sys.path:
+        sys.path.remove(directory)
+    site.addsitedir(directory)
+    Logger.log("i", "Adding search path: {}".format(directory))
+
+
+class LazyModule:
+    """
+    Stands in for a module until one of its attributes is used, then imports it.
+    This keeps modules which are slow to import, like pywim, out of the Cura startup.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            already_imported = self._name in sys.modules
+
+            start = time.perf_counter()
+            self._module = importlib.import_module(self._name)
+
+            if not already_imported:
+                recordLoadTime("import.{}".format(self._name), time.perf_counter() - start)
+
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+
+def lazyImport(name: str) -> LazyModule:
+    module = _lazy_modules.get(name)
+    if module is None:
+        module = LazyModule(name)
+        _lazy_modules[name] = module
+    return module
+
+
+def recordLoadTime(name: str, seconds: float):
+    _load_times[name] = seconds
+    Logger.log("d", "Smart Slice {} took {:.3f}s".format(name, seconds))
+
+
+def loadTimes() -> Dict[str, float]:
+    """
+    Time spent loading the plugin at startup, and loading the deferred parts on first use
+    """
+    return dict(_load_times)
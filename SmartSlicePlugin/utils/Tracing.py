@@ -0,0 +1,244 @@
+'''
+Lightweight timing spans for the hot paths of the plugin.
+
+A span times a block of code, either as a context manager
+
+    with Tracing.span("job.build"):
+        ...
+
+or as a decorator on a function. Finished spans are added to a latency
+histogram per span name and to a bounded list of recent spans, both of which
+can be dumped on demand. Counters keep track of events without a duration,
+like cache hits.
+
+Tracing is off by default. While it is off, span() returns a shared no-op
+object and decorated functions only pay for one attribute check, so the
+instrumentation can stay in the hot paths.
+'''
+
+import bisect
+import functools
+import json
+import threading
+import time
+
+from collections import deque
+from typing import Dict, List
+
+from UM.Logger import Logger
+
+# Upper bounds of the histogram buckets, in seconds. The last bucket is unbounded.
+BUCKET_BOUNDS = (
+    0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5,
+    1., 2., 5., 10., 30., 60., 120., 300., 600.
+)
+
+# Number of finished spans kept for dumps
+RECENT_SPANS = 500
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.
+        self.minimum = None
+        self.maximum = None
+        self.buckets = [0] * (len(BUCKET_BOUNDS) + 1)
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.minimum = seconds if self.minimum is None else min(self.minimum, seconds)
+        self.maximum = seconds if self.maximum is None else max(self.maximum, seconds)
+
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS, seconds)] += 1
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.
+
+    def percentile(self, fraction: float) -> float:
+        """
+        Upper bound of the bucket holding the given fraction of the samples, at most the maximum
+        """
+        if self.count == 0:
+            return 0.
+
+        target = fraction * self.count
+        seen = 0
+        for i, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return min(BUCKET_BOUNDS[i], self.maximum) if i < len(BUCKET_BOUNDS) else self.maximum
+
+        return self.maximum
+
+    def toDict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.mean,
+            "min": self.minimum,
+            "max": self.maximum,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": { _bucketName(i): c for i, c in enumerate(self.buckets) if c > 0 }
+        }
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+    def set(self, **attributes):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('_tracer', 'name', 'attributes', '_start', '_wall_start')
+
+    def __init__(self, tracer: 'Tracer', name: str, attributes: dict):
+        self._tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self._start = None
+        self._wall_start = None
+
+    def __enter__(self):
+        self._wall_start = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = time.perf_counter() - self._start
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        self._tracer._finish(self.name, self._wall_start, duration, self.attributes)
+        return False
+
+    def set(self, **attributes):
+        """
+        Adds attributes to the span, for example a size only known once the work is done
+        """
+        self.attributes.update(attributes)
+
+
+class Tracer:
+    def __init__(self, recent: int = RECENT_SPANS):
+        self.enabled = False
+
+        self._lock = threading.Lock()
+        self._histograms = {}               # Dict[str, LatencyHistogram]
+        self._recent = deque(maxlen=recent) # Deque[dict]
+        self._counters = {}                 # Dict[str, int]
+
+    def span(self, name: str, **attributes):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, attributes)
+
+    def traced(self, name: str = None):
+        """
+        Decorator timing every call of a function, named after the function by default
+        """
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, span_name, {}):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    def record(self, name: str, seconds: float, **attributes):
+        """
+        Records a duration which was measured elsewhere, for example a queue time reported by the API
+        """
+        if self.enabled:
+            self._finish(name, time.time() - seconds, seconds, attributes)
+
+    def count(self, name: str, amount: int = 1):
+        if self.enabled:
+            with self._lock:
+                self._counters[name] = self._counters.get(name, 0) + amount
+
+    def _finish(self, name: str, wall_start: float, duration: float, attributes: dict):
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = LatencyHistogram()
+                self._histograms[name] = histogram
+            histogram.add(duration)
+
+            self._recent.append({
+                "name": name,
+                "start": wall_start,
+                "duration": duration,
+                "thread": threading.current_thread().name,
+                "attributes": attributes
+            })
+
+    def histograms(self) -> Dict[str, dict]:
+        with self._lock:
+            return { name: h.toDict() for name, h in sorted(self._histograms.items()) }
+
+    def recentSpans(self, name: str = None) -> List[dict]:
+        with self._lock:
+            return [dict(s) for s in self._recent if name is None or s["name"] == name]
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(sorted(self._counters.items()))
+
+    def dump(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "histograms": self.histograms(),
+            "counters": self.counters(),
+            "recent": self.recentSpans()
+        }
+
+    def dumpToLog(self):
+        for name, h in self.histograms().items():
+            Logger.log("d", "Span {}: {} calls, mean {:.4f}s, p90 {:.4f}s, max {:.4f}s".format(
+                name, h["count"], h["mean"], h["p90"], h["max"]
+            ))
+
+    def dumpToFile(self, path: str):
+        with open(path, "w") as dump_file:
+            json.dump(self.dump(), dump_file, indent=2, default=str)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._recent.clear()
+            self._counters.clear()
+
+
+def _bucketName(index: int) -> str:
+    if index < len(BUCKET_BOUNDS):
+        return "<={}s".format(BUCKET_BOUNDS[index])
+    return ">{}s".format(BUCKET_BOUNDS[-1])
+
+
+# The tracer used throughout the plugin
+tracer = Tracer()
+
+span = tracer.span
+traced = tracer.traced
+record = tracer.record
+count = tracer.count
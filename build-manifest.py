@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+'''
+Writes the manifest of the bundled 3rd-party modules, read by
+SystemUtils.registerThirdPartyModules when the plugin is loaded.
+
+The manifest lists the modules in every platform directory under 3rd-party,
+so the plugin can put the matching directories on sys.path in one go instead
+of scanning them with site.addsitedir on every Cura start. With --zip the
+modules of each directory without compiled extensions are packed into a zip
+which is imported from directly.
+
+Usage: build-manifest.py <3rd-party directory> [--zip]
+'''
+
+import json
+import os
+import shutil
+import sys
+import zipfile
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+
+# Files which are part of the repository but not modules
+IGNORED = (".sh", ".pyc")
+
+EXTENSIONS = (".so", ".pyd", ".dll", ".dylib")
+
+
+def listModules(directory):
+    modules = []
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if name == "__pycache__" or name.endswith(IGNORED):
+            continue
+        if os.path.isdir(path) and os.path.isfile(os.path.join(path, "__init__.py")):
+            modules.append(name)
+        elif name.endswith(".py") or name.endswith(EXTENSIONS):
+            modules.append(name.split(".")[0])
+    return modules
+
+
+def hasExtensions(directory):
+    for root, dirs, files in os.walk(directory):
+        if any(f.endswith(EXTENSIONS) for f in files):
+            return True
+    return False
+
+
+def zipDirectory(directory, zip_path):
+    """
+    Moves all modules and package metadata of the directory into the zip
+    """
+    entries = [n for n in os.listdir(directory) if n != "__pycache__" and not n.endswith(IGNORED)]
+
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED) as bundle:
+        for name in entries:
+            path = os.path.join(directory, name)
+            if os.path.isdir(path):
+                for root, dirs, files in os.walk(path):
+                    dirs[:] = [d for d in dirs if d != "__pycache__"]
+                    for f in files:
+                        if not f.endswith(".pyc"):
+                            full_path = os.path.join(root, f)
+                            bundle.write(full_path, os.path.relpath(full_path, directory))
+            else:
+                bundle.write(path, name)
+
+    for name in entries:
+        path = os.path.join(directory, name)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        else:
+            os.remove(path)
+
+
+def main(third_party_dir, make_zip=False):
+    directories = {}
+
+    for name in sorted(os.listdir(third_party_dir)):
+        directory = os.path.join(third_party_dir, name)
+        if not os.path.isdir(directory):
+            continue
+
+        entry = {
+            "modules": listModules(directory),
+            "pth": any(f.endswith(".pth") for f in os.listdir(directory))
+        }
+
+        if make_zip and not entry["pth"] and not hasExtensions(directory) and entry["modules"]:
+            entry["zip"] = name + ".zip"
+            zipDirectory(directory, os.path.join(third_party_dir, entry["zip"]))
+
+        directories[name] = entry
+        print("{}: {}".format(name, ", ".join(entry["modules"]) or "no modules"))
+
+    with open(os.path.join(third_party_dir, MANIFEST), "w") as manifest:
+        json.dump({ "version": MANIFEST_VERSION, "directories": directories }, manifest, indent=2)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print(__doc__)
+        sys.exit(1)
+
+    main(sys.argv[1], "--zip" in sys.argv[2:])
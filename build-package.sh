@@ -2,6 +2,9 @@ mkdir build
 cd build
 mkdir files
 cp -rfv ../SmartSlicePlugin files/plugins
+# List the bundled modules, so the plugin does not have to search for them on every start.
+# With SMARTSLICE_ZIP_MODULES=1 the modules are also bundled into zips which are imported from directly.
+python3 ../build-manifest.py files/plugins/3rd-party ${SMARTSLICE_ZIP_MODULES:+--zip}
 cp -rfv ../packaging/* .
 rm -f ../SmartSlicePlugin-master.zip
 zip -rv ../SmartSlicePlugin-master.zip .